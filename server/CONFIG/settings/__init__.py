@@ -3,6 +3,7 @@ from .installed_apps import *
 from .middlewares import *
 from .cors import *
 from .db import *
+from .cache import *
 from .static import *
 from .graphiz import *
 from .email import *
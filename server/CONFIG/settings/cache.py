@@ -0,0 +1,20 @@
+import sys
+
+from decouple import config
+
+from .base import BASE_DIR
+
+# Cached data (subject matrix, grading scales, rankings, dashboard counts, quiz papers) is
+# invalidated by whichever worker commits the change, so every gunicorn worker must share
+# one cache. The file cache needs no extra service; point CACHE_BACKEND/CACHE_LOCATION at
+# Redis or Memcached when running on more than one host.
+CACHES = {
+    'default': {
+        'BACKEND': config('CACHE_BACKEND', default='django.core.cache.backends.filebased.FileBasedCache'),
+        'LOCATION': config('CACHE_LOCATION', default=str(BASE_DIR / 'cache')),
+    }
+}
+
+# tests reuse primary keys across runs; a persistent cache would leak entries between them
+if 'test' in sys.argv:
+    CACHES['default'] = {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}
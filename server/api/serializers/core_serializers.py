@@ -29,6 +29,7 @@ class ClassListSerializer(serializers.ModelSerializer):
     category_display = serializers.CharField(
         source='get_category_display', read_only=True)
     # class_capacity = serializers.SerializerMethodField(method_name='get_class_capacity')
+    seats_left = serializers.IntegerField(read_only=True)
 
     class Meta:
         model = ClassList
@@ -39,6 +40,8 @@ class ClassListSerializer(serializers.ModelSerializer):
             'division',
             'category',
             'class_capacity',
+            'active_count',
+            'seats_left',
             'category_display',
             'academic_session',
             'class_teacher',
@@ -136,10 +139,16 @@ class StudentSerializer(serializers.ModelSerializer):
     user = UserSerializer()
     # full_name = serializers.SerializerMethodField(
     #     method_name='get_student_full_name')
+    # read from the prefetched enrollment; use Student.objects.with_current_enrollment()
+    current_class_id = serializers.IntegerField(
+        source='current_class.id', read_only=True, default=None)
+    current_class = serializers.CharField(
+        source='current_class.name', read_only=True, default=None)
 
     class Meta:
         model = Student
-        fields = ['user', 'reg_no', 'school', 'session_admitted', "date_of_birth"]
+        fields = ['user', 'reg_no', 'school', 'session_admitted', "date_of_birth",
+                  'current_class_id', 'current_class']
 
 
 class StudentCreateSerializer(serializers.ModelSerializer):
@@ -11,13 +11,15 @@ from django.contrib.auth import get_user_model
 from django.test import TestCase, override_settings
 from django.core.files.uploadedfile import SimpleUploadedFile
 from rest_framework import status
-from rest_framework.test import APIClient, APITestCase
+from rest_framework.test import APIClient, APITestCase, APIRequestFactory, force_authenticate
 from rest_framework_simplejwt.tokens import RefreshToken
 
 from main.models import (
     School, Staff, Student, ClassList, 
     AcademicSession, Term, Subject, User
 )
+from api.views.other_views import DashboardView
+from api.views.export_views import ExportView
 
 # Test media root for file uploads
 MEDIA_ROOT = tempfile.mkdtemp()
@@ -446,3 +448,142 @@ class DashboardAPITests(APITestCase):
         response = self.client.get(url)
         self.assertEqual(response.status_code, status.HTTP_200_OK)
         # Add more assertions based on student dashboard data structure
+
+
+class DashboardQueryCountTests(TestCase):
+    """Dashboard helpers run a fixed number of queries however many rows they render."""
+
+    def setUp(self):
+        from main.models import ClassLevel
+        self.owner = create_test_user(role="owner")
+        self.school = School.objects.create(
+            name='Test School', owner=self.owner, email='test@example.com', phone='1234567890')
+        ClassLevel.create_default_levels(self.school)
+        self.session = AcademicSession.objects.create(
+            school=self.school, start_date=date(2024, 9, 1), end_date=date(2025, 7, 31))
+        teacher_user = create_test_user(
+            role="staff", username='teacher@example.com', email='teacher@example.com', school=self.school)
+        self.teacher = Staff.default_objects.create(
+            school=self.school, user=teacher_user, is_teaching_staff=True)
+        self.class_list = ClassList.default_objects.create(
+            school=self.school, academic_session=self.session, class_teacher=self.teacher,
+            class_level=ClassLevel.default_objects.get(school=self.school, name="JS1"))
+        self.view = DashboardView()
+
+    def _create_children(self, count, offset=0):
+        from main.models import StudentEnrollment
+        children = []
+        for i in range(offset, offset + count):
+            user = User.objects.create(
+                username=f'child{i}@example.com', email=f'child{i}@example.com',
+                first_name='Child', last_name=str(i), role='student', school=self.school)
+            children.append(Student.default_objects.create(
+                school=self.school, user=user, date_of_birth=date(2012, 1, 1)))
+        StudentEnrollment.default_objects.bulk_create([
+            StudentEnrollment(school=self.school, student=child, class_list=self.class_list,
+                              academic_session=self.session)
+            for child in children
+        ])
+        return children
+
+    def test_children_summaries_cost_two_queries(self):
+        for total in (1, 8):
+            self._create_children(total - Student.default_objects.count(),
+                                  offset=Student.default_objects.count())
+            with self.assertNumQueries(2):
+                rows = self.view._get_children_summaries(
+                    Student.default_objects.filter(school=self.school))
+            self.assertEqual(len(rows), total)
+        self.assertEqual(rows[0]['class_name'], self.class_list.name)
+        self.assertEqual(rows[0]['class_teacher'], self.teacher.user.get_full_name())
+
+    def test_student_dashboard_costs_two_queries(self):
+        child, = self._create_children(1)
+        user = User._base_manager.get(pk=child.user_id)
+        with self.assertNumQueries(2):
+            response = self.view._get_student_dashboard_data(user, self.school, {})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+    def test_announcements_cost_one_query(self):
+        from main.models import Announcement
+        for i in range(5):
+            Announcement.default_objects.create(
+                school=self.school, title=f'Notice {i}', content='...', created_by=self.owner)
+        with self.assertNumQueries(1):
+            rows = self.view._get_announcements(self.school)
+        self.assertEqual(len(rows), 5)
+        self.assertEqual(rows[0]['created_by'], self.owner.get_full_name())
+
+
+class ExportViewTests(TestCase):
+    """Exports stream rows from one projected query, however many rows there are."""
+
+    def setUp(self):
+        from main.models import ClassLevel, StudentEnrollment
+        from main.tenancy.threadlocals import set_current_school
+        self.owner = create_test_user(role="owner")
+        self.school = School.objects.create(
+            name='Test School', owner=self.owner, email='test@example.com', phone='1234567890')
+        set_current_school(self.school.pk)
+        ClassLevel.create_default_levels(self.school)
+        self.session = AcademicSession.objects.create(
+            school=self.school, start_date=date(2024, 9, 1), end_date=date(2025, 7, 31), is_current=True)
+        self.class_list = ClassList.default_objects.create(
+            school=self.school, academic_session=self.session,
+            class_level=ClassLevel.default_objects.get(school=self.school, name="JS1"))
+        users = User.objects.bulk_create([
+            User(username=f'pupil{i}@example.com', email=f'pupil{i}@example.com',
+                 first_name='Pupil', last_name=f'{i:03d}', role='student', school=self.school)
+            for i in range(120)
+        ])
+        students = Student.default_objects.bulk_create([
+            Student(school=self.school, user=user, date_of_birth=date(2012, 1, 1)) for user in users
+        ])
+        StudentEnrollment.default_objects.bulk_create([
+            StudentEnrollment(school=self.school, student=student, class_list=self.class_list,
+                              academic_session=self.session)
+            for student in students
+        ])
+        self.view = ExportView.as_view()
+        self.factory = APIRequestFactory()
+
+    def tearDown(self):
+        from main.tenancy.threadlocals import set_current_school
+        set_current_school(None)
+
+    def _export(self, dataset, extension='csv', **params):
+        request = self.factory.get(f'/api/v1/exports/{dataset}.{extension}', params)
+        force_authenticate(request, user=self.owner)
+        return self.view(request, dataset=dataset, extension=extension)
+
+    def test_students_csv_is_streamed(self):
+        response = self._export('students')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertTrue(response.streaming)
+        with self.assertNumQueries(1):
+            lines = b''.join(response.streaming_content).decode().splitlines()
+        self.assertEqual(len(lines), 121)
+        self.assertTrue(lines[0].startswith('ID,Student ID'))
+        self.assertIn('Pupil,000,pupil0@example.com,2012-01-01,JS1,A', lines[1])
+
+    def test_class_roll_and_enrollment_history(self):
+        roll = b''.join(self._export('class-roll').streaming_content).decode().splitlines()
+        self.assertEqual(len(roll), 2)
+        history = b''.join(self._export('enrollments').streaming_content).decode().splitlines()
+        self.assertEqual(len(history), 121)
+
+    def test_unknown_dataset_and_format(self):
+        self.assertEqual(self._export('grades').status_code, status.HTTP_404_NOT_FOUND)
+        self.assertEqual(self._export('students', 'pdf').status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_malformed_ids_are_rejected(self):
+        self.assertEqual(self._export('class-roll', session='abc').status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(self._export('enrollments', student='1 OR 1').status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(self._export('class-roll', session=999999).status_code, status.HTTP_404_NOT_FOUND)
+        self.assertEqual(self._export('class-roll', session=self.session.pk).status_code, status.HTTP_200_OK)
+
+    def test_students_cannot_export(self):
+        request = self.factory.get('/api/v1/exports/students.csv')
+        force_authenticate(request, user=User._base_manager.filter(role='student').first())
+        response = self.view(request, dataset='students', extension='csv')
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
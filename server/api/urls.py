@@ -9,6 +9,11 @@ from api.views.auth_views import get_school_info
 # from api.views.attendance_views import AttendanceViewSet, OvertimeViewSet, AttendanceReportView
 from api import views
 from api.views.other_views import DashboardView
+from api.views.export_views import ExportView
+from api.views.assessment_views import (
+    AssessmentSearchView, AttemptAnswersView, AttemptPaperView, QuizAnalysisView, QuizGenerateView,
+    QuizPaperView, StartAttemptView, AttemptTimeView,
+)
 
 
 router = routers.DefaultRouter()
@@ -45,6 +50,19 @@ urlpatterns = [
     
     # Dashboard
     path('dashboard/', DashboardView.as_view(), name='dashboard'),
+
+    # Exports (streamed CSV/XLSX)
+    path('exports/<slug:dataset>.<slug:extension>', ExportView.as_view(), name='export'),
+
+    # Assessments
+    path('quizzes/search', AssessmentSearchView.as_view(), name='quiz-search'),
+    path('quizzes/<int:quiz_id>/paper', QuizPaperView.as_view(), name='quiz-paper'),
+    path('quizzes/<int:quiz_id>/analysis', QuizAnalysisView.as_view(), name='quiz-analysis'),
+    path('quizzes/<int:quiz_id>/generate', QuizGenerateView.as_view(), name='quiz-generate'),
+    path('quizzes/<int:quiz_id>/attempts', StartAttemptView.as_view(), name='quiz-attempt-start'),
+    path('attempts/<int:attempt_id>/paper', AttemptPaperView.as_view(), name='attempt-paper'),
+    path('attempts/<int:attempt_id>/answers', AttemptAnswersView.as_view(), name='attempt-answers'),
+    path('attempts/<int:attempt_id>/time', AttemptTimeView.as_view(), name='attempt-time'),
     
     # Nested routes
     path('', include(academic_sessions_router.urls)),
@@ -0,0 +1,279 @@
+from django.core.exceptions import ValidationError
+from django.http import HttpResponse
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.permissions import IsAuthenticated
+from rest_framework.response import Response
+from rest_framework.views import APIView
+
+from main.assessments import search
+from main.assessments.analytics import get_analysis
+from main.assessments.attempts import start_attempt
+from main.assessments.bank import generate_quiz
+from main.assessments.ingestion import save_answers
+from main.assessments.ordering import attempt_paper
+from main.assessments.papers import get_paper_json
+from main.assessments.timer import remaining
+from main.models import QuestionBankItem, Quiz, QuizAttempt, QuizQuestion
+from main.tenancy.threadlocals import get_current_school
+
+
+class QuizPaperView(APIView):
+    """
+    Compiled paper of a published quiz: GET /api/v1/quizzes/<id>/paper[?version=<n>]
+
+    Serves the cached compact JSON as-is (no per-request serialization); defaults to the
+    quiz's current version, `?version=` returns an earlier one for pinned attempts.
+    """
+    permission_classes = [IsAuthenticated]
+
+    def get(self, request, quiz_id, *args, **kwargs):
+        school = get_current_school()
+        if not school:
+            return Response(
+                {"detail": "User is not associated with any school"},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        current = (
+            Quiz.default_objects.filter(pk=quiz_id, school=school, is_published=True, is_active=True)
+            .values_list("paper_version", flat=True).first()
+        )
+        if not current:
+            return Response({"detail": "Quiz not found"}, status=status.HTTP_404_NOT_FOUND)
+
+        version = request.query_params.get("version") or current
+        try:
+            version = int(version)
+        except (TypeError, ValueError):
+            return Response({"detail": "version must be an integer"}, status=status.HTTP_400_BAD_REQUEST)
+
+        paper = get_paper_json(quiz_id, version)
+        if paper is None:
+            return Response({"detail": f"Paper version {version} not found"},
+                            status=status.HTTP_404_NOT_FOUND)
+        response = HttpResponse(paper, content_type="application/json")
+        response["X-Paper-Version"] = str(version)
+        return response
+
+
+class StartAttemptView(APIView):
+    """
+    Start (or resume) the current student's attempt: POST /api/v1/quizzes/<id>/attempts
+
+    One eligibility query plus a conditional counter upsert; repeating the request while an
+    attempt is open returns that attempt, so double-clicks never use up an extra attempt.
+    """
+    permission_classes = [IsAuthenticated]
+
+    def post(self, request, quiz_id, *args, **kwargs):
+        student = getattr(request.user, "student_profile", None)
+        if student is None:
+            return Response({"detail": "Only students can take quizzes"}, status=status.HTTP_403_FORBIDDEN)
+        try:
+            attempt = start_attempt(quiz_id, student)
+        except ValidationError as e:
+            code = {"quiz": status.HTTP_404_NOT_FOUND,
+                    "school": status.HTTP_404_NOT_FOUND,
+                    "not_assigned": status.HTTP_403_FORBIDDEN,
+                    "not_available": status.HTTP_409_CONFLICT,
+                    "max_attempts": status.HTTP_409_CONFLICT}.get(e.code, status.HTTP_400_BAD_REQUEST)
+            return Response({"detail": " ".join(e.messages)}, status=code)
+        return Response({"id": attempt.pk, "paperVersion": attempt.paper_version,
+                         "startedAt": attempt.started_at.isoformat(), "status": attempt.status},
+                        status=status.HTTP_201_CREATED)
+
+
+class AttemptAnswersView(APIView):
+    """
+    Autosave answers of the current student's in-progress attempt: PUT /api/v1/attempts/<id>/answers
+    Body: {"answers": [{"question": <id>, "options": [<id>, ...], "text": "..."}, ...]}
+
+    Idempotent; unchanged answers are not rewritten, so clients may resend their whole sheet.
+    """
+    permission_classes = [IsAuthenticated]
+
+    def put(self, request, attempt_id, *args, **kwargs):
+        student = getattr(request.user, "student_profile", None)
+        if student is None:
+            return Response({"detail": "Only students can answer quizzes"}, status=status.HTTP_403_FORBIDDEN)
+        answers = request.data.get("answers") if isinstance(request.data, dict) else None
+        if not isinstance(answers, list):
+            return Response({"detail": "'answers' must be a list"}, status=status.HTTP_400_BAD_REQUEST)
+        try:
+            summary = save_answers(attempt_id, answers, student_id=student.pk)
+        except ValidationError as e:
+            code = {"attempt": status.HTTP_404_NOT_FOUND,
+                    "attempt_closed": status.HTTP_409_CONFLICT}.get(e.code, status.HTTP_400_BAD_REQUEST)
+            return Response({"detail": " ".join(e.messages)}, status=code)
+        return Response(summary)
+
+
+class AttemptPaperView(APIView):
+    """
+    The paper of the current student's attempt, in that attempt's order: GET /api/v1/attempts/<id>/paper
+
+    Reads the pinned (cached) paper and applies the attempt's seeded shuffle; reloading shows the same order.
+    """
+    permission_classes = [IsAuthenticated]
+
+    def get(self, request, attempt_id, *args, **kwargs):
+        student = getattr(request.user, "student_profile", None)
+        if student is None:
+            return Response({"detail": "Only students can open attempts"}, status=status.HTTP_403_FORBIDDEN)
+        attempt = (
+            QuizAttempt.default_objects.filter(pk=attempt_id, student=student, is_active=True)
+            .only("quiz_id", "paper_version", "seed").first()
+        )
+        paper = attempt_paper(attempt) if attempt else None
+        if paper is None:
+            return Response({"detail": "Attempt not found"}, status=status.HTTP_404_NOT_FOUND)
+        return Response(paper)
+
+
+class AttemptTimeView(APIView):
+    """
+    Time left on the current student's attempt: GET /api/v1/attempts/<id>/time
+
+    One indexed read; clients poll it to correct their local countdown. `remaining` is seconds
+    (null for untimed quizzes); attempts past their deadline are auto-submitted by the sweeper.
+    """
+    permission_classes = [IsAuthenticated]
+
+    def get(self, request, attempt_id, *args, **kwargs):
+        student = getattr(request.user, "student_profile", None)
+        if student is None:
+            return Response({"detail": "Only students can open attempts"}, status=status.HTTP_403_FORBIDDEN)
+        now = timezone.now()
+        try:
+            timing = remaining(attempt_id, student_id=student.pk, now=now)
+        except ValidationError as e:
+            return Response({"detail": " ".join(e.messages)}, status=status.HTTP_404_NOT_FOUND)
+        return Response({
+            "status": timing["status"],
+            "deadline": timing["deadline"].isoformat() if timing["deadline"] else None,
+            "remaining": timing["remaining"],
+            "serverTime": now.isoformat(),
+        })
+
+
+class QuizAnalysisView(APIView):
+    """
+    Item analysis of a quiz for teachers: GET /api/v1/quizzes/<id>/analysis
+
+    Difficulty, discrimination, distractor picks, score distribution and Cronbach's alpha,
+    computed with NumPy from one answer query and cached until the next graded submission.
+    """
+    permission_classes = [IsAuthenticated]
+
+    def get(self, request, quiz_id, *args, **kwargs):
+        user = request.user
+        if not (user.is_admin or user.is_school_staff or user.is_superadmin):
+            return Response({"detail": "Only school staff can view quiz analysis"},
+                            status=status.HTTP_403_FORBIDDEN)
+        school = get_current_school()
+        if not school:
+            return Response(
+                {"detail": "User is not associated with any school"},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        if not Quiz.default_objects.filter(pk=quiz_id, school=school, is_active=True).exists():
+            return Response({"detail": "Quiz not found"}, status=status.HTTP_404_NOT_FOUND)
+        return Response(get_analysis(quiz_id))
+
+
+class AssessmentSearchView(APIView):
+    """
+    Quiz picker / question bank search for teachers: GET /api/v1/quizzes/search?q=<text>[&limit=<n>]
+
+    Ranked FTS5 matches within the current school (the last word matches as a prefix):
+    quizzes by title, description and subject; quiz and bank questions by text and explanation.
+    """
+    permission_classes = [IsAuthenticated]
+
+    def get(self, request, *args, **kwargs):
+        user = request.user
+        if not (user.is_admin or user.is_school_staff or user.is_superadmin):
+            return Response({"detail": "Only school staff can search quizzes"},
+                            status=status.HTTP_403_FORBIDDEN)
+        school = get_current_school()
+        if not school:
+            return Response(
+                {"detail": "User is not associated with any school"},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        query = (request.query_params.get("q") or "").strip()
+        try:
+            limit = min(max(int(request.query_params.get("limit", 20)), 1), search.SEARCH_LIMIT)
+        except (TypeError, ValueError):
+            return Response({"detail": "limit must be an integer"}, status=status.HTTP_400_BAD_REQUEST)
+        if not query:
+            return Response({"quizzes": [], "questions": []})
+
+        quizzes = Quiz.default_objects.filter(school=school, is_active=True).search(query, school=school)
+        questions = QuizQuestion.default_objects.filter(school=school, is_active=True, quiz__is_active=True)
+        bank = QuestionBankItem.default_objects.filter(school=school, is_active=True)
+        match = search.match_expression(school.pk, query)
+        if not search.fts_available():
+            questions = questions.filter(text__icontains=query)
+            bank = bank.filter(text__icontains=query)
+        elif match is None:
+            questions, bank = questions.none(), bank.none()
+        else:
+            questions = search.filter_ranked(questions, search.QUESTION_TABLE, search.QUESTION_WEIGHTS, match)
+            bank = search.filter_ranked(bank, search.BANK_TABLE, search.BANK_WEIGHTS, match)
+        question_rows = list(questions.values("id", "quiz_id", "text")[:limit])
+        bank_rows = list(bank.values("id", "subject_id", "difficulty", "text")[:limit])
+        return Response({
+            "quizzes": list(quizzes.values("id", "title", "subject__name", "is_published")[:limit]),
+            "questions": question_rows,
+            "bank": bank_rows,
+        })
+
+
+class QuizGenerateView(APIView):
+    """
+    Add questions sampled from the school's question bank: POST /api/v1/quizzes/<id>/generate
+    Body: {"count": <n>, "subject"?: <id>, "difficulty"?: <1-3 or [..]>, "tags"?: [...], "seed"?: <int>}
+
+    Questions are placed by reference, so reusing a bank item never copies its content.
+    """
+    permission_classes = [IsAuthenticated]
+
+    def post(self, request, quiz_id, *args, **kwargs):
+        user = request.user
+        if not (user.is_admin or user.is_school_staff or user.is_superadmin):
+            return Response({"detail": "Only school staff can edit quizzes"},
+                            status=status.HTTP_403_FORBIDDEN)
+        school = get_current_school()
+        if not school:
+            return Response(
+                {"detail": "User is not associated with any school"},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        quiz = Quiz.default_objects.filter(pk=quiz_id, school=school, is_active=True).first()
+        if quiz is None:
+            return Response({"detail": "Quiz not found"}, status=status.HTTP_404_NOT_FOUND)
+        data = request.data if isinstance(request.data, dict) else {}
+        try:
+            count = int(data.get("count"))
+            seed = None if data.get("seed") is None else int(data["seed"])
+            subject = None if data.get("subject") is None else int(data["subject"])
+            difficulty = data.get("difficulty")
+            if difficulty is not None:
+                difficulty = [int(level) for level in difficulty] if isinstance(difficulty, list) else int(difficulty)
+        except (TypeError, ValueError):
+            return Response({"detail": "count, subject, difficulty and seed must be integers"},
+                            status=status.HTTP_400_BAD_REQUEST)
+        tags = data.get("tags") or []
+        if count < 1 or not isinstance(tags, list):
+            return Response({"detail": "count must be positive and tags a list"},
+                            status=status.HTTP_400_BAD_REQUEST)
+        try:
+            placed = generate_quiz(quiz, count, subject=subject, difficulty=difficulty,
+                                   tags=[str(tag) for tag in tags], seed=seed)
+        except ValidationError as e:
+            code = status.HTTP_409_CONFLICT if e.code == "bank_exhausted" else status.HTTP_400_BAD_REQUEST
+            return Response({"detail": " ".join(e.messages)}, status=code)
+        return Response({"added": [{"id": q.pk, "bankItem": q.bank_item_id, "order": q.order} for q in placed]},
+                        status=status.HTTP_201_CREATED)
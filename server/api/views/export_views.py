@@ -0,0 +1,133 @@
+from django.http import StreamingHttpResponse
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.permissions import IsAuthenticated
+from rest_framework.response import Response
+from rest_framework.views import APIView
+
+from main.models import AcademicSession, Student
+from main.reports import exports
+from main.tenancy.threadlocals import get_current_school
+
+
+class ExportView(APIView):
+    """
+    Stream an export as CSV or XLSX: GET /api/v1/exports/<dataset>.<csv|xlsx>
+
+    Datasets: students, staff, class-roll (?session=<id>, defaults to the current session)
+    and enrollments (?student=<id> for one student's history).
+    Rows are read with `.iterator()` over `values_list` projections, so memory stays flat.
+    CSV streams row by row. XLSX is built in a temp file before its first byte is sent, so large
+    XLSX exports wait for the whole workbook (time to first byte grows with the row count).
+    """
+    permission_classes = [IsAuthenticated]
+
+    CONTENT_TYPES = {
+        'csv': 'text/csv',
+        'xlsx': 'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet',
+    }
+
+    def get(self, request, dataset, extension, *args, **kwargs):
+        user = request.user
+        if not (user.is_admin or user.is_superadmin):
+            return Response(
+                {"detail": "Only school administrators can export data"},
+                status=status.HTTP_403_FORBIDDEN
+            )
+
+        school = get_current_school()
+        if not school:
+            return Response(
+                {"detail": "User is not associated with any school"},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        if extension not in self.CONTENT_TYPES:
+            return Response(
+                {"detail": f"Unsupported export format '{extension}'"},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        builder = {
+            'students': self._students,
+            'staff': self._staff,
+            'class-roll': self._class_roll,
+            'enrollments': self._enrollments,
+        }.get(dataset)
+        if builder is None:
+            return Response(
+                {"detail": f"Unknown export '{dataset}'"},
+                status=status.HTTP_404_NOT_FOUND
+            )
+        result = builder(request, school)
+        if isinstance(result, Response):
+            return result
+        header, rows = result
+
+        if extension == 'xlsx':
+            try:
+                import openpyxl  # noqa: F401
+            except ImportError:
+                return Response(
+                    {"detail": "XLSX export is not available on this server; use CSV"},
+                    status=status.HTTP_501_NOT_IMPLEMENTED
+                )
+            content = exports.iter_xlsx(header, rows, title=dataset)
+        else:
+            content = exports.iter_csv(header, rows)
+
+        filename = f"{dataset}-{timezone.now():%Y%m%d}.{extension}"
+        response = StreamingHttpResponse(content, content_type=self.CONTENT_TYPES[extension])
+        response['Content-Disposition'] = f'attachment; filename="{filename}"'
+        return response
+
+    # -------- datasets --------
+    def _students(self, request, school):
+        return exports.students_dataset(school.pk)
+
+    def _staff(self, request, school):
+        return exports.staff_dataset(school.pk)
+
+    @staticmethod
+    def _id_param(request, name):
+        """(id or None, error Response or None) for an optional numeric query parameter."""
+        value = request.query_params.get(name)
+        if not value:
+            return None, None
+        try:
+            return int(value), None
+        except ValueError:
+            return None, Response(
+                {"detail": f"{name} must be an integer id"},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+    def _class_roll(self, request, school):
+        sessions = AcademicSession.default_objects.filter(school=school)
+        session_id, error = self._id_param(request, 'session')
+        if error:
+            return error
+        session = (
+            sessions.filter(pk=session_id).first() if session_id
+            else sessions.filter(is_current=True).first()
+        )
+        if not session:
+            return Response(
+                {"detail": "Academic session not found"},
+                status=status.HTTP_404_NOT_FOUND
+            )
+        return exports.class_roll_dataset(session)
+
+    def _enrollments(self, request, school):
+        student_id, error = self._id_param(request, 'student')
+        if error:
+            return error
+        student = None
+        if student_id:
+            student = Student.default_objects.filter(pk=student_id, school=school).first()
+            if not student:
+                return Response(
+                    {"detail": "Student not found"},
+                    status=status.HTTP_404_NOT_FOUND
+                )
+        return exports.enrollment_history_dataset(school.pk, student=student)
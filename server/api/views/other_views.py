@@ -467,7 +467,7 @@ class StudentViewSet(ModelViewSet):
             )
 
     def get_queryset(self):
-        qs = Student.objects.all()
+        qs = Student.objects.select_related('user').with_current_enrollment()
         class_filter = self.request.query_params.get('class', None)
         if class_filter:
             qs = qs.filter(school_class__name__icontains=class_filter)
@@ -656,25 +656,11 @@ class DashboardView(APIView):
         )
 
     def _get_admin_dashboard_data(self, user, school, base_data):
-        from main.models import Student, Staff, ClassList, AcademicSession, Subject
-        
+        from main.reports.dashboard import get_admin_stats
+
         try:
-            # Get current academic session
-            current_session = AcademicSession.objects.filter(
-                school=school,
-                is_current=True
-            ).first()
-            
-            # Get basic stats
-            stats = {
-                'total_students': Student.objects.filter(school=school).count(),
-                'total_staff': Staff.objects.filter(school=school).count(),
-                'total_classes': ClassList.objects.filter(
-                    academic_session=current_session,
-                ).count() if current_session else 0,
-                'total_subjects': Subject.objects.filter(school=school).count(),
-                'current_session': current_session.name if current_session else 'Not Set',
-            }
+            # One aggregate query per stats generation; signals bump the version on changes
+            stats = get_admin_stats(school.pk)
 
             # Merge with base data and return
             data = {**base_data, **stats}
@@ -709,7 +695,7 @@ class DashboardView(APIView):
                 class_teacher=staff,
                 academic_session=current_session,
                 school=school
-            )
+            ).select_related('class_level')
 
             # Get today's schedule
             today = datetime.datetime.now().date()
@@ -736,7 +722,7 @@ class DashboardView(APIView):
                     'id': sc.id,
                     'name': sc.name,
                     'section': sc.division,
-                    'student_count': sc.enrollments.filter(is_active=True).count()
+                    'student_count': sc.active_count
                 } for sc in staff_classes],
                 'todays_schedule': [{
                     'id': s.id,
@@ -746,7 +732,7 @@ class DashboardView(APIView):
                     'end_time': s.end_time
                 } for s in todays_schedule],
                 'assignments_to_grade': assignments_to_grade,
-                'total_students': sum(sc.enrollments.filter(is_active=True).count() for sc in staff_classes)
+                'total_students': sum(sc.active_count for sc in staff_classes)
             }
 
             serializer = StaffDashboardSerializer(data=data)
@@ -767,11 +753,14 @@ class DashboardView(APIView):
             today = datetime.datetime.now().date()
             day_of_week = today.weekday()
             
-            # Get current enrollment
-            current_enrollment = StudentEnrollment.objects.filter(
+            # Get current enrollment (class teacher joined in the same query)
+            current_enrollment = StudentEnrollment.default_objects.filter(
                 student=student,
+                school=school,
                 is_active=True
-            ).select_related('class_list').first()
+            ).select_related(
+                'class_list__class_level', 'class_list__class_teacher__user'
+            ).order_by('-enrollment_date', '-id').first()
             
             if not current_enrollment:
                 return Response(
@@ -825,26 +814,12 @@ class DashboardView(APIView):
             )
 
     def _get_parent_dashboard_data(self, user, school, base_data):
-        from main.models import Student, StudentEnrollment
-        
+        from main.models import Student
+
         try:
             parent = user.parent_profile
-            children = Student.objects.filter(parent=parent, school=school)
-            
-            children_data = []
-            for child in children:
-                current_enrollment = StudentEnrollment.objects.filter(
-                    student=child,
-                    is_active=True
-                ).select_related('class_list').first()
-                
-                if current_enrollment:
-                    children_data.append({
-                        'id': child.id,
-                        'name': child.user.get_full_name(),
-                        'class_name': current_enrollment.class_list.name if current_enrollment.class_list else 'N/A',
-                        'class_teacher': current_enrollment.class_list.class_teacher.user.get_full_name() if current_enrollment.class_list and current_enrollment.class_list.class_teacher else 'Not Assigned',
-                    })
+            children = Student.default_objects.filter(parent=parent, school=school, is_active=True)
+            children_data = self._get_children_summaries(children)
 
             data = {
                 **base_data,
@@ -861,6 +836,25 @@ class DashboardView(APIView):
                 status=status.HTTP_500_INTERNAL_SERVER_ERROR
             )
 
+    def _get_children_summaries(self, children):
+        """
+        One row per enrolled child, built from two queries however many children there are.
+        Why: resolving each child's enrollment and class teacher lazily costs several queries per child.
+        """
+        children = children.select_related('user').with_current_enrollment('class_list__class_teacher__user')
+        children_data = []
+        for child in children:
+            current_enrollment = child.current_enrollment
+            if current_enrollment:
+                class_list = current_enrollment.class_list
+                children_data.append({
+                    'id': child.id,
+                    'name': child.user.get_full_name(),
+                    'class_name': class_list.name if class_list else 'N/A',
+                    'class_teacher': class_list.class_teacher.user.get_full_name() if class_list and class_list.class_teacher else 'Not Assigned',
+                })
+        return children_data
+
     def _get_upcoming_events(self, school):
         """Helper to get upcoming events for the school"""
         from event.models import Event
@@ -892,14 +886,14 @@ class DashboardView(APIView):
         try:
             now = timezone.now()
             
-            announcements = Announcement.objects.filter(
+            announcements = Announcement.default_objects.filter(
                 is_published=True,
                 publish_date__lte=now,
                 school=school
             ).filter(
                 # Either no expire date or expire_date is in the future
-                models.Q(expire_date__isnull=True) | models.Q(expire_date__gte=now.date())
-            ).order_by('-publish_date')[:5]  # Get 5 most recent announcements
+                Q(expire_date__isnull=True) | Q(expire_date__gte=now.date())
+            ).select_related('created_by').order_by('-publish_date')[:5]  # Get 5 most recent announcements
 
             return [{
                 'id': a.id,
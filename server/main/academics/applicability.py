@@ -0,0 +1,70 @@
+# ==============================================
+# File: main/academics/applicability.py
+# Purpose: Per-school subject applicability matrix (category × department)
+# ==============================================
+from __future__ import annotations
+
+from typing import Iterable
+
+from django.core.cache import cache
+
+from main.common.oncommit import cache_set, invalidate_on_commit
+
+MATRIX_CACHE_KEY = "subject_matrix:{school_id}"
+MATRIX_CACHE_TIMEOUT = 60 * 60 * 24
+
+
+def subject_applies(categories: Iterable[str], departments: Iterable[str], category: str, department: str) -> bool:
+    """
+    Single source of truth for subject applicability.
+    `[]` means "all"; a GENERAL department entry applies to every department.
+    """
+    cats_ok = (not categories) or (category in categories)
+    depts_ok = (
+        (not departments)
+        or (department in departments)
+        or ("GENERAL" in departments)
+    )
+    return cats_ok and depts_ok
+
+
+def build_matrix(school_id: int) -> dict[tuple[str, str], tuple[int, ...]]:
+    """
+    Compute {(category, department): (subject ids…)} from the school's active subjects in one query.
+    Why: JSON `__contains` lookups are evaluated row by row on SQLite; this does it once per school.
+    """
+    from main.models import ClassLevel, Subject  # lazy import to avoid circulars
+
+    rows = list(
+        Subject.default_objects.filter(school_id=school_id, is_active=True)
+        .order_by("name")
+        .values_list("id", "applicable_categories", "applicable_departments")
+    )
+    matrix: dict[tuple[str, str], tuple[int, ...]] = {}
+    for category, _ in ClassLevel.CLASS_CATEGORIES:
+        for department, _ in ClassLevel.DEPARTMENT_CHOICES:
+            matrix[(category, department)] = tuple(
+                pk for pk, cats, depts in rows
+                if subject_applies(cats or [], depts or [], category, department)
+            )
+    return matrix
+
+
+def get_matrix(school_id: int) -> dict[tuple[str, str], tuple[int, ...]]:
+    """Cached matrix for a school; rebuilt lazily after invalidation."""
+    key = MATRIX_CACHE_KEY.format(school_id=school_id)
+    matrix = cache.get(key)
+    if matrix is None:
+        matrix = build_matrix(school_id)
+        cache_set(key, matrix, MATRIX_CACHE_TIMEOUT)
+    return matrix
+
+
+def applicable_subject_ids(school_id: int, category: str, department: str) -> tuple[int, ...]:
+    """Subject ids applicable to a (category, department) pair; in-memory after the first call."""
+    return get_matrix(school_id).get((category, department), ())
+
+
+def invalidate_matrix(school_id: int) -> None:
+    """Drop the cached matrix once the surrounding transaction commits."""
+    invalidate_on_commit(MATRIX_CACHE_KEY.format(school_id=school_id))
@@ -0,0 +1,188 @@
+# ==============================================
+# File: main/academics/grading.py
+# Purpose: Per-school grading scales compiled to sorted thresholds (bisect / searchsorted lookup)
+# ==============================================
+from __future__ import annotations
+
+from bisect import bisect_right
+from dataclasses import dataclass
+from typing import Iterable, Optional, Sequence
+
+from django.core.cache import cache
+from django.core.exceptions import ValidationError
+
+from main.common.oncommit import cache_set, invalidate_on_commit
+
+SCALES_CACHE_KEY = "grading_scales:{school_id}"
+SCALES_CACHE_TIMEOUT = 60 * 60 * 24
+
+# Band lists as stored in `GradingScale.bands`: {"min", "grade", "point"?, "remark"?}.
+# The lowest band (min 0) is the fail band.
+PRESETS: dict[str, list[dict]] = {
+    "default": [
+        {"min": 90, "grade": "A+", "point": 4.0, "remark": "Excellent"},
+        {"min": 85, "grade": "A", "point": 4.0, "remark": "Excellent"},
+        {"min": 80, "grade": "A-", "point": 3.75, "remark": "Very good"},
+        {"min": 75, "grade": "B+", "point": 3.5, "remark": "Very good"},
+        {"min": 70, "grade": "B", "point": 3.0, "remark": "Good"},
+        {"min": 65, "grade": "B-", "point": 2.75, "remark": "Good"},
+        {"min": 60, "grade": "C+", "point": 2.5, "remark": "Credit"},
+        {"min": 55, "grade": "C", "point": 2.0, "remark": "Credit"},
+        {"min": 50, "grade": "C-", "point": 1.75, "remark": "Credit"},
+        {"min": 45, "grade": "D", "point": 1.0, "remark": "Pass"},
+        {"min": 0, "grade": "F", "point": 0.0, "remark": "Fail"},
+    ],
+    # points are "higher is better" like every scale (GPA, quality points); WAEC's own aggregate
+    # (A1 = 1 … F9 = 9, lower is better) is the digit in the grade, not the point
+    "waec": [
+        {"min": 75, "grade": "A1", "point": 8, "remark": "Excellent"},
+        {"min": 70, "grade": "B2", "point": 7, "remark": "Very good"},
+        {"min": 65, "grade": "B3", "point": 6, "remark": "Good"},
+        {"min": 60, "grade": "C4", "point": 5, "remark": "Credit"},
+        {"min": 55, "grade": "C5", "point": 4, "remark": "Credit"},
+        {"min": 50, "grade": "C6", "point": 3, "remark": "Credit"},
+        {"min": 45, "grade": "D7", "point": 2, "remark": "Pass"},
+        {"min": 40, "grade": "E8", "point": 1, "remark": "Pass"},
+        {"min": 0, "grade": "F9", "point": 0, "remark": "Fail"},
+    ],
+    "primary": [
+        {"min": 70, "grade": "A", "point": 5, "remark": "Excellent"},
+        {"min": 60, "grade": "B", "point": 4, "remark": "Very good"},
+        {"min": 50, "grade": "C", "point": 3, "remark": "Good"},
+        {"min": 40, "grade": "D", "point": 2, "remark": "Fair"},
+        {"min": 0, "grade": "F", "point": 0, "remark": "Fail"},
+    ],
+}
+DEFAULT_PRESET = "default"
+
+
+@dataclass(frozen=True)
+class CompiledScale:
+    """
+    Bands as parallel tuples sorted by ascending floor.
+    Why: grading is one `bisect` per score (or one `searchsorted` per array) instead of an if/elif ladder.
+    """
+    name: str
+    floors: tuple[float, ...]
+    grades: tuple[str, ...]
+    points: tuple[float, ...]
+    remarks: tuple[str, ...]
+
+    def index(self, score) -> int:
+        """Band index for `score`; scores below every floor fall into the fail band (0)."""
+        return max(bisect_right(self.floors, float(score)) - 1, 0)
+
+    def grade(self, score) -> str:
+        return self.grades[self.index(score)]
+
+    def point(self, score) -> float:
+        return self.points[self.index(score)]
+
+    def remark(self, score) -> str:
+        return self.remarks[self.index(score)]
+
+    def is_fail(self, score) -> bool:
+        return self.index(score) == 0
+
+    def point_for_grade(self, grade: str) -> float:
+        """Point of a stored letter grade (unknown grades → 0)."""
+        try:
+            return self.points[self.grades.index(grade)]
+        except ValueError:
+            return 0.0
+
+    def indices_many(self, scores: Iterable):
+        """Band index per score in one vectorized call (a list when NumPy is unavailable)."""
+        try:
+            import numpy as np
+        except ImportError:  # optional dependency
+            return [self.index(score) for score in scores]
+        values = np.asarray(list(scores), dtype=float)
+        return np.maximum(np.searchsorted(self.floors, values, side="right") - 1, 0)
+
+    def grade_many(self, scores: Iterable) -> list[str]:
+        return [self.grades[i] for i in self.indices_many(scores)]
+
+
+def compile_bands(bands: Sequence[dict], name: str = "") -> CompiledScale:
+    """Validate a band list and compile it; raises ValidationError(code="grading_scale")."""
+    if not bands:
+        raise ValidationError("A grading scale needs at least one band", code="grading_scale")
+    try:
+        rows = sorted(
+            (float(band["min"]), str(band["grade"]), float(band.get("point", 0)), str(band.get("remark", "")))
+            for band in bands
+        )
+    except (KeyError, TypeError, ValueError) as e:
+        raise ValidationError(
+            "Each band needs a numeric 'min' and a 'grade' (optional 'point', 'remark')",
+            code="grading_scale") from e
+    floors = tuple(row[0] for row in rows)
+    if floors[0] != 0:
+        raise ValidationError("The lowest band must start at 0", code="grading_scale")
+    if len(set(floors)) != len(floors):
+        raise ValidationError("Band minimums must be distinct", code="grading_scale")
+    return CompiledScale(
+        name=name,
+        floors=floors,
+        grades=tuple(row[1] for row in rows),
+        points=tuple(row[2] for row in rows),
+        remarks=tuple(row[3] for row in rows),
+    )
+
+
+DEFAULT_SCALE = compile_bands(PRESETS[DEFAULT_PRESET], name=DEFAULT_PRESET)
+
+
+def _settings_bands(value) -> Optional[tuple[str, Sequence[dict]]]:
+    """`School.settings["grading_scale"]` may name a preset or hold a band list."""
+    if isinstance(value, str) and value in PRESETS:
+        return value, PRESETS[value]
+    if isinstance(value, list):
+        return "school settings", value
+    return None
+
+
+def build_scales(school_id: int) -> dict[Optional[int], CompiledScale]:
+    """
+    {class_level_id (None = school default): compiled scale} for a school.
+    `GradingScale` rows win; `School.settings["grading_scale"]` supplies the default otherwise.
+    """
+    from main.models import GradingScale, School  # lazy import to avoid circulars
+
+    scales = {
+        level_id: compile_bands(bands, name=name)
+        for level_id, name, bands in GradingScale.default_objects.filter(
+            school_id=school_id, is_active=True
+        ).values_list("class_level_id", "name", "bands")
+    }
+    if None not in scales:
+        school_settings = School.objects.filter(pk=school_id).values_list("settings", flat=True).first()
+        configured = _settings_bands((school_settings or {}).get("grading_scale"))
+        if configured:
+            scales[None] = compile_bands(configured[1], name=configured[0])
+    return scales
+
+
+def get_scales(school_id: int) -> dict[Optional[int], CompiledScale]:
+    """Cached compiled scales for a school; rebuilt lazily after invalidation."""
+    key = SCALES_CACHE_KEY.format(school_id=school_id)
+    scales = cache.get(key)
+    if scales is None:
+        scales = build_scales(school_id)
+        cache_set(key, scales, SCALES_CACHE_TIMEOUT)
+    return scales
+
+
+def pick_scale(scales: dict[Optional[int], CompiledScale], class_level_id: Optional[int] = None) -> CompiledScale:
+    """Level-specific scale, else the school default, else the built-in default."""
+    return scales.get(class_level_id) or scales.get(None) or DEFAULT_SCALE
+
+
+def scale_for(school_id: int, class_level_id: Optional[int] = None) -> CompiledScale:
+    return pick_scale(get_scales(school_id), class_level_id)
+
+
+def invalidate_scales(school_id: int) -> None:
+    """Drop the cached scales once the surrounding transaction commits."""
+    invalidate_on_commit(SCALES_CACHE_KEY.format(school_id=school_id))
@@ -0,0 +1,201 @@
+# ==============================================
+# File: main/academics/promotion.py
+# Purpose: Set-based end-of-year promotion (plan in memory, apply in bulk)
+# ==============================================
+from __future__ import annotations
+
+from collections import Counter
+from typing import Iterable, Optional
+
+from django.core.exceptions import ValidationError
+from django.db import transaction
+from django.utils import timezone
+
+
+class PromotionPlanner:
+    """
+    Promote a batch of enrollments into `target_session` with a fixed number of queries.
+
+    - The next-level map is built once per school (level_order + department → ClassLevel).
+    - JS3 → SS1 needs a department per student (`department_assignments[student_id]`).
+    - Students in `hold_back` repeat their current level in the target session.
+    - Seats are balanced across divisions: each student goes to the division with most seats left.
+    - A student may appear once per batch; repeats raise ValidationError(code="duplicate_enrollment").
+    - `apply` claims the planned seats with the same conditional UPDATE as `StudentEnrollment.enroll`;
+      if an admission took one since planning, nothing is written (ValidationError(code="capacity")).
+
+    Usage:
+        report = PromotionPlanner(target_session, department_assignments).run(enrollments)
+        # report = {"promoted": [...], "held_back": [...], "failed": [...]}
+    """
+
+    def __init__(self, target_session, department_assignments: Optional[dict] = None,
+                 hold_back: Optional[Iterable[int]] = None):
+        self.target_session = target_session
+        self.department_assignments = department_assignments or {}
+        self.hold_back = set(hold_back or ())
+        self.moves: list[dict] = []
+        self.failed: list[dict] = []
+
+    # -------- planning --------
+    def _level_map(self, school_id) -> dict[tuple[int, str], object]:
+        from main.models import ClassLevel
+        return {
+            (lvl.level_order, lvl.department): lvl
+            for lvl in ClassLevel.default_objects.filter(school_id=school_id, is_active=True)
+        }
+
+    def _target_level(self, enrollment, level_map):
+        """Return (level, error) for one enrollment."""
+        current = enrollment.class_list.class_level
+        if enrollment.student_id in self.hold_back:
+            return current, None
+        if current.name == "JS3":
+            department = self.department_assignments.get(enrollment.student_id)
+            if not department:
+                return None, "Moving to SS1 requires selecting a department (SCIENCE/ART/COMMERCIAL/SCIENCE_TECH)"
+        else:
+            department = current.department
+        level = level_map.get((current.level_order + 1, department))
+        if level is None:
+            return None, f"No next level found for promotion from {current.full_name}"
+        return level, None
+
+    def _seat_map(self, levels) -> dict[int, list[list]]:
+        """
+        {level_id: [[seats_left, division, class_list], ...]} for the target session.
+        Missing classes are created (division A) so every planned level has somewhere to go.
+        """
+        from main.models import ClassList
+
+        classes = list(ClassList.default_objects.filter(
+            academic_session=self.target_session, class_level__in=levels, is_active=True))
+        present = {cl.class_level_id for cl in classes}
+        missing = [lvl for lvl in levels if lvl.pk not in present]
+        if missing:
+            classes.extend(ClassList.create_for_session(
+                self.target_session, class_levels=missing, divisions=["A"]))
+
+        seats: dict[int, list[list]] = {}
+        for cl in classes:
+            seats.setdefault(cl.class_level_id, []).append([cl.seats_left(), cl.division, cl])
+        return seats
+
+    def plan(self, enrollments) -> "PromotionPlanner":
+        """Resolve a target class for every enrollment without writing anything."""
+        enrollments = list(
+            enrollments.select_related("class_list__class_level")
+            if hasattr(enrollments, "select_related") else enrollments
+        )
+        if not enrollments:
+            return self
+        per_student = Counter(enrollment.student_id for enrollment in enrollments)
+        repeated = sorted(student_id for student_id, n in per_student.items() if n > 1)
+        if repeated:
+            raise ValidationError(f"Students listed more than once: {repeated}", code="duplicate_enrollment")
+        level_map = self._level_map(enrollments[0].school_id)
+
+        targets = []
+        for enrollment in enrollments:
+            level, error = self._target_level(enrollment, level_map)
+            if error:
+                self.failed.append({"student_id": enrollment.student_id, "reason": error})
+            else:
+                targets.append((enrollment, level))
+
+        levels = list({level.pk: level for _, level in targets}.values())
+        seats = self._seat_map(levels) if levels else {}
+
+        for enrollment, level in targets:
+            options = seats.get(level.pk, [])
+            best = max(options, key=lambda o: (o[0], -ord(o[1])), default=None)
+            if best is None or best[0] <= 0:
+                self.failed.append({
+                    "student_id": enrollment.student_id,
+                    "reason": f"No seats left in {level.full_name} for {self.target_session.name}",
+                })
+                continue
+            best[0] -= 1
+            self.moves.append({
+                "enrollment": enrollment,
+                "class_list": best[2],
+                "held_back": enrollment.student_id in self.hold_back,
+            })
+        return self
+
+    # -------- applying --------
+    @transaction.atomic
+    def apply(self) -> dict[str, list]:
+        """Write the plan with a handful of bulk statements (plus one seat claim per target class)."""
+        from main.models import ClassList, StudentEnrollment
+        from main.assessments.audience import schedule_sync
+        from main.reports.summaries import apply_promoted_deltas
+
+        report = {"promoted": [], "held_back": [], "failed": list(self.failed)}
+        if not self.moves:
+            return report
+
+        now = timezone.now()
+        session = self.target_session
+        student_ids = [m["enrollment"].student_id for m in self.moves]
+        promoted_ids = [m["enrollment"].pk for m in self.moves if not m["held_back"]]
+        held_ids = [m["enrollment"].pk for m in self.moves if m["held_back"]]
+
+        # close source enrollments (counters are decremented per class)
+        StudentEnrollment.default_objects.filter(pk__in=promoted_ids).update(
+            promoted=True, promotion_date=now.date())
+        apply_promoted_deltas(Counter(
+            m["enrollment"].class_list_id for m in self.moves
+            if not m["held_back"] and not m["enrollment"].promoted
+        ))
+        StudentEnrollment.deactivate(StudentEnrollment.default_objects.filter(pk__in=promoted_ids + held_ids))
+
+        # one active enrollment per student per session: close any existing one in the target session
+        StudentEnrollment.deactivate(StudentEnrollment.default_objects.filter(
+            academic_session=session, student_id__in=student_ids))
+
+        # seats were counted without a lock while planning; claim them atomically now
+        for class_list_id, seats in Counter(m["class_list"].pk for m in self.moves).items():
+            if not ClassList.claim_seat(class_list_id, seats):
+                full = next(m["class_list"] for m in self.moves if m["class_list"].pk == class_list_id)
+                raise ValidationError(
+                    f"{full.name} has fewer than {seats} seat(s) left since the promotion was planned; plan again",
+                    code="capacity")
+
+        # reactivate rows that already exist for (student, class_list), insert the rest
+        wanted = {(m["enrollment"].student_id, m["class_list"].pk) for m in self.moves}
+        existing = dict(
+            ((student_id, class_list_id), pk)
+            for pk, student_id, class_list_id in StudentEnrollment.default_objects.filter(
+                student_id__in=student_ids, class_list__academic_session=session
+            ).values_list("pk", "student_id", "class_list_id")
+            if (student_id, class_list_id) in wanted
+        )
+        if existing:
+            StudentEnrollment.default_objects.filter(pk__in=existing.values()).update(
+                is_active=True, left_at=None, updated_at=now)
+        StudentEnrollment.default_objects.bulk_create([
+            StudentEnrollment(
+                school_id=m["enrollment"].school_id,
+                student_id=m["enrollment"].student_id,
+                class_list=m["class_list"],
+                academic_session=session,
+                is_active=True,
+            )
+            for m in self.moves
+            if (m["enrollment"].student_id, m["class_list"].pk) not in existing
+        ])
+        # bulk writes send no signals; re-derive the students' quiz audience on commit
+        schedule_sync(students=student_ids)
+
+        for m in self.moves:
+            row = {
+                "student_id": m["enrollment"].student_id,
+                "from_class_id": m["enrollment"].class_list_id,
+                "to_class_id": m["class_list"].pk,
+            }
+            report["held_back" if m["held_back"] else "promoted"].append(row)
+        return report
+
+    def run(self, enrollments) -> dict[str, list]:
+        return self.plan(enrollments).apply()
@@ -0,0 +1,51 @@
+# ==============================================
+# File: main/academics/signals.py
+# Purpose: Keep academic caches in sync with their source rows
+# ==============================================
+from __future__ import annotations
+
+from django.db.models.signals import post_delete, post_save, pre_delete
+from django.dispatch import receiver
+
+from main.academics.applicability import invalidate_matrix
+from main.academics.grading import invalidate_scales
+
+
+# app_label.ModelName style avoids import cycle
+@receiver(post_save, sender="main.Subject")
+@receiver(post_delete, sender="main.Subject")
+def _invalidate_subject_matrix(sender, instance, **kwargs):
+    """Subject create/update/soft-delete/hard-delete changes the school's applicability matrix."""
+    if instance.school_id:
+        invalidate_matrix(instance.school_id)
+
+
+@receiver(post_save, sender="main.GradingScale")
+@receiver(post_delete, sender="main.GradingScale")
+def _invalidate_grading_scales(sender, instance, **kwargs):
+    """Any scale change recompiles the school's cached scales on next use."""
+    if instance.school_id:
+        invalidate_scales(instance.school_id)
+
+
+@receiver(post_save, sender="main.School")
+def _invalidate_school_grading_settings(sender, instance, **kwargs):
+    """`School.settings["grading_scale"]` may supply the default scale."""
+    invalidate_scales(instance.pk)
+
+
+@receiver(pre_delete, sender="main.StudentEnrollment")
+def _snapshot_enrollment_seat(sender, instance, **kwargs):
+    """A deferred-field instance has no load-time snapshot; read it while the row still exists."""
+    instance._counted_class_id, instance._counted_promoted_class_id = instance._counted_before()
+
+
+@receiver(post_delete, sender="main.StudentEnrollment")
+def _release_enrollment_seat(sender, instance, **kwargs):
+    """Hard deletes (incl. cascades from Student) bypass `StudentEnrollment.save`; release the seat and promotion tally here."""
+    if getattr(instance, "_counted_class_id", None):
+        from main.models import ClassList
+        ClassList.bump_active_counts({instance._counted_class_id: -1})
+    if getattr(instance, "_counted_promoted_class_id", None):
+        from main.reports.summaries import apply_promoted_deltas
+        apply_promoted_deltas({instance._counted_promoted_class_id: -1})
@@ -13,6 +13,9 @@ class MainConfig(AppConfig):
     def ready(self):
         # Import signal handlers
         from main.tenancy import signals  # noqa: F401
+        from main.academics import signals as academic_signals  # noqa: F401
+        from main.reports import signals as report_signals  # noqa: F401
+        from main.assessments import signals as assessment_signals  # noqa: F401
 
     # def ready(self):
     #     import main.signals
@@ -0,0 +1,201 @@
+# ==============================================
+# File: main/assessments/analytics.py
+# Purpose: Item analysis (difficulty, discrimination, distractors, score distribution, Cronbach's alpha) with NumPy
+# ==============================================
+from __future__ import annotations
+
+import json
+import math
+from typing import Optional
+
+from django.core.cache import cache
+from django.db.models import FloatField, TextField
+from django.db.models.functions import Cast
+
+from main.common.oncommit import cache_set, invalidate_on_commit
+
+ANALYSIS_CACHE_KEY = "quiz_analysis:{quiz_id}"
+ANALYSIS_CACHE_TIMEOUT = 60 * 60
+# upper/lower groups for discrimination and distractor analysis (Kelley's 27%)
+GROUP_FRACTION = 0.27
+ANALYZED_STATUSES = ("submitted", "graded")
+
+
+def _round(value, digits: int = 3) -> Optional[float]:
+    value = float(value)
+    return None if math.isnan(value) else round(value, digits)
+
+
+def _option_ids(raw: Optional[str]) -> tuple:
+    """Option ids from the stored JSON text; single picks (the common case) skip the JSON parser."""
+    if not raw or raw == "[]":
+        return ()
+    if "," not in raw:
+        return (int(raw.strip("[] ")),)
+    return tuple(json.loads(raw))
+
+
+def _flags(difficulty, discrimination, options) -> list[str]:
+    flags = []
+    if difficulty is not None and difficulty < 0.2:
+        flags.append("too_hard")
+    if difficulty is not None and difficulty > 0.9:
+        flags.append("too_easy")
+    if discrimination is not None and discrimination < 0.2:
+        flags.append("low_discrimination")
+    if any(not o["correct"] and o["upper"] > o["lower"] for o in options):
+        flags.append("misleading_distractor")
+    return flags
+
+
+def analyze_quiz(quiz_id: int) -> dict:
+    """
+    Item statistics for the closed attempts of a quiz, from one attempt query and one answer query
+    plus the cached paper. An attempt submitted blank still counts, with every item omitted.
+
+    difficulty      share of the item's points earned (p-value; higher = easier)
+    discrimination  upper-27% minus lower-27% difficulty (by total score)
+    point_biserial  correlation of the item with the total of the *other* items
+    options         per-option picks overall / upper / lower group (distractor analysis)
+    alpha           Cronbach's alpha over the item scores
+    """
+    import numpy as np
+    from main.assessments.papers import get_paper_json
+    from main.models import Quiz, QuizAnswer, QuizAttempt
+
+    version = Quiz.default_objects.filter(pk=quiz_id).values_list("paper_version", flat=True).first()
+    raw = get_paper_json(quiz_id, version) if version else None
+    paper = json.loads(raw) if raw else {"questions": []}
+    questions = paper["questions"]
+    col_of = {q["id"]: j for j, q in enumerate(questions)}
+    points = np.array([q["points"] for q in questions], dtype=float)
+    # keyed per question: bank placements carry QuestionBankOption ids, inline questions QuizOption ids,
+    # and the two tables number independently
+    option_col = {(q["id"], o["id"]): (j, k) for j, q in enumerate(questions) for k, o in enumerate(q["options"])}
+
+    closed = QuizAttempt.default_objects.filter(
+        quiz_id=quiz_id, status__in=ANALYZED_STATUSES, is_active=True).order_by("pk").values_list("pk", flat=True)
+    row_of = {attempt_id: i for i, attempt_id in enumerate(closed.iterator(chunk_size=5000))}
+    rows = QuizAnswer.default_objects.filter(
+        attempt__quiz_id=quiz_id, attempt__status__in=ANALYZED_STATUSES, attempt__is_active=True,
+        is_active=True,
+    ).annotate(
+        # raw JSON text and floats skip the per-row JSONField/Decimal converters (most of the cost at 100k rows)
+        selected_json=Cast("selected_option_ids", TextField()),
+        earned=Cast("points_awarded", FloatField()),
+    ).values_list("attempt_id", "question_id", "selected_json", "earned")
+
+    cells, picks = [], []
+    for attempt_id, question_id, selected, awarded in rows.iterator(chunk_size=5000):
+        i = row_of.get(attempt_id)
+        if i is None:  # attempt closed after the attempt query
+            continue
+        j = col_of.get(question_id)
+        if j is None:  # question removed after the attempt was taken
+            continue
+        selected = _option_ids(selected)
+        cells.append((i, j, awarded, bool(selected) or awarded > 0))
+        for option_id in selected or ():
+            cell = option_col.get((question_id, option_id))
+            if cell is not None:
+                picks.append((i, cell[0], cell[1]))
+
+    n, k = len(row_of), len(questions)
+    summary = {"quiz": quiz_id, "version": version, "attempts": n, "items": k,
+               "alpha": None, "scores": None, "questions": []}
+    if not n or not k:
+        return summary
+
+    # attempts × items matrix of earned points; unanswered = 0
+    earned = np.zeros((n, k))
+    answered = np.zeros((n, k), dtype=bool)
+    if cells:
+        i, j, value, given = (np.array(column) for column in zip(*cells))
+        i, j = i.astype(int), j.astype(int)
+        earned[i, j] = value
+        answered[i, j] = given.astype(bool)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        item = np.where(points > 0, earned / points, 0.0)  # 0..1 per item
+    totals = earned.sum(axis=1)
+    max_total = float(points.sum())
+
+    order = np.argsort(totals, kind="stable")
+    size = max(int(math.ceil(n * GROUP_FRACTION)), 1)
+    lower, upper = order[:size], order[-size:]
+    difficulty = item.mean(axis=0)
+    discrimination = item[upper].mean(axis=0) - item[lower].mean(axis=0)
+
+    # corrected item-total correlation: the item is left out of the total it is compared with
+    rest = totals[:, None] - earned
+    with np.errstate(divide="ignore", invalid="ignore"):
+        item_c, rest_c = item - item.mean(axis=0), rest - rest.mean(axis=0)
+        point_biserial = (item_c * rest_c).sum(axis=0) / np.sqrt(
+            (item_c ** 2).sum(axis=0) * (rest_c ** 2).sum(axis=0))
+
+    alpha = None
+    if k > 1 and n > 1:
+        total_var = totals.var(ddof=1)
+        if total_var > 0:
+            alpha = _round(k / (k - 1) * (1 - earned.var(axis=0, ddof=1).sum() / total_var))
+
+    # option pick counts: overall and within the upper/lower groups
+    width = max((len(q["options"]) for q in questions), default=0) or 1
+    counts = np.zeros((3, k, width), dtype=int)
+    if picks:
+        pi, pj, pk = (np.array(column, dtype=int) for column in zip(*picks))
+        in_upper = np.isin(pi, upper)
+        in_lower = np.isin(pi, lower)
+        np.add.at(counts[0], (pj, pk), 1)
+        np.add.at(counts[1], (pj[in_upper], pk[in_upper]), 1)
+        np.add.at(counts[2], (pj[in_lower], pk[in_lower]), 1)
+    omitted = n - answered.sum(axis=0)
+
+    percent = totals / max_total * 100 if max_total else np.zeros(n)
+    histogram, edges = np.histogram(percent, bins=10, range=(0, 100))
+    summary["alpha"] = alpha
+    summary["scores"] = {
+        "mean": _round(totals.mean(), 2), "median": _round(np.median(totals), 2),
+        "std": _round(totals.std(ddof=1) if n > 1 else 0.0, 2),
+        "min": _round(totals.min(), 2), "max": _round(totals.max(), 2), "max_possible": max_total,
+        "histogram": {"bins": [int(e) for e in edges], "counts": histogram.tolist()},
+    }
+
+    correct = _correct_options(quiz_id, version)
+    for j, question in enumerate(questions):
+        options = [
+            {"id": option["id"], "text": option["text"], "correct": (question["id"], option["id"]) in correct,
+             "count": int(counts[0, j, c]), "upper": int(counts[1, j, c]), "lower": int(counts[2, j, c])}
+            for c, option in enumerate(question["options"])
+        ]
+        d, disc = _round(difficulty[j]), _round(discrimination[j])
+        summary["questions"].append({
+            "id": question["id"], "order": j + 1, "kind": question["kind"], "points": question["points"],
+            "difficulty": d, "discrimination": disc, "point_biserial": _round(point_biserial[j]),
+            "omitted": int(omitted[j]), "options": options, "flags": _flags(d, disc, options),
+        })
+    return summary
+
+
+def _correct_options(quiz_id: int, version: int) -> set[tuple[int, int]]:
+    """(question id, option id) of every correct option."""
+    from main.assessments.marking import get_answer_key
+
+    return {
+        (question_id, option_id)
+        for question_id, (_, _, correct) in get_answer_key(quiz_id, version).items() for option_id in correct
+    }
+
+
+def get_analysis(quiz_id: int) -> dict:
+    """Cached analysis; recomputed lazily after new submissions invalidate it."""
+    key = ANALYSIS_CACHE_KEY.format(quiz_id=quiz_id)
+    analysis = cache.get(key)
+    if analysis is None:
+        analysis = analyze_quiz(quiz_id)
+        cache_set(key, analysis, ANALYSIS_CACHE_TIMEOUT)
+    return analysis
+
+
+def invalidate_analysis(quiz_id: int) -> None:
+    """Drop the cached analysis once the surrounding transaction commits."""
+    invalidate_on_commit(ANALYSIS_CACHE_KEY.format(quiz_id=quiz_id))
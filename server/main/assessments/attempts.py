@@ -0,0 +1,128 @@
+# ==============================================
+# File: main/assessments/attempts.py
+# Purpose: Attempt starts: one-query eligibility check and a conditional-upsert attempt counter
+# ==============================================
+from __future__ import annotations
+
+from typing import Optional
+
+from django.core.exceptions import ValidationError
+from django.db import IntegrityError, connection, transaction
+from django.db.models import Exists, F, OuterRef, Subquery, Value
+from django.db.models.functions import Coalesce, Greatest
+from django.utils import timezone
+
+from main.assessments.timer import expire, is_expired
+
+
+def eligibility(quiz_id: int, student, now=None) -> Optional[dict]:
+    """
+    Everything an attempt start depends on, in one query: the quiz's school, publication and
+    window, attempt limit and paper version, whether the student is in its audience (see
+    `QuizAudience`) and how many attempts they have used. None when the quiz does not exist.
+    """
+    from main.models import Quiz, QuizAttemptCounter, QuizAudience
+
+    row = (
+        Quiz.default_objects.filter(pk=quiz_id, is_active=True)
+        .annotate(
+            in_audience=Exists(QuizAudience.default_objects.filter(
+                quiz=OuterRef("pk"), student=student, is_active=True)),
+            used=Coalesce(Subquery(QuizAttemptCounter.default_objects.filter(
+                quiz=OuterRef("pk"), student=student).values("used")[:1]), Value(0)),
+        )
+        .values("school_id", "is_published", "start_time", "end_time", "max_attempts", "paper_version",
+                "is_global", "in_audience", "used")
+        .first()
+    )
+    if row is None:
+        return None
+    now = now or timezone.now()
+    row["is_available"] = (
+        row["is_published"]
+        and (row["start_time"] is None or row["start_time"] <= now)
+        and (row["end_time"] is None or now <= row["end_time"])
+    )
+    row["is_assigned"] = row["school_id"] == student.school_id and (row["is_global"] or row["in_audience"])
+    return row
+
+
+def check_eligibility(quiz_id: int, student, existing: bool = False, now=None) -> dict:
+    """
+    Raise ValidationError unless `student` may start (or, with `existing`, keep) an attempt.
+    Codes: "quiz", "school", "not_assigned", "not_available", "max_attempts". Returns the eligibility row.
+    """
+    row = eligibility(quiz_id, student, now)
+    if row is None:
+        raise ValidationError("Quiz not found", code="quiz")
+    if row["school_id"] != getattr(student, "school_id", None):
+        raise ValidationError("Student and quiz must belong to the same school", code="school")
+    if not row["is_assigned"]:
+        raise ValidationError("Quiz is not assigned to this student or their class", code="not_assigned")
+    if not row["is_available"]:
+        raise ValidationError("Quiz is not currently available", code="not_available")
+    # an existing attempt is already counted in `used`
+    if row["used"] - (1 if existing else 0) >= (row["max_attempts"] or 1):
+        raise ValidationError("Maximum number of attempts reached", code="max_attempts")
+    return row
+
+
+def claim_attempt(school_id: int, quiz_id: int, student_id: int, limit: Optional[int]) -> bool:
+    """
+    Take one of the student's attempts in a single statement; False when none are left.
+    The first attempt inserts the counter row; later ones update it only while `used < limit`.
+    Concurrent claims serialize on the counter row, so the limit holds under any interleaving.
+    """
+    from main.models import QuizAttemptCounter
+
+    table = QuizAttemptCounter._meta.db_table
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f"INSERT INTO {table} (school_id, quiz_id, student_id, used) VALUES (%s, %s, %s, 1) "
+            f"ON CONFLICT (quiz_id, student_id) DO UPDATE SET used = {table}.used + 1 "
+            f"WHERE {table}.used < %s",
+            [school_id, quiz_id, student_id, max(limit or 1, 1)],
+        )
+        return cursor.rowcount == 1
+
+
+def release_attempts(quiz_id: int, student_id: int, count: int = 1) -> None:
+    """Give back attempts (a deleted attempt no longer counts against the limit)."""
+    from main.models import QuizAttemptCounter
+
+    QuizAttemptCounter.default_objects.filter(quiz_id=quiz_id, student_id=student_id).update(
+        used=Greatest(F("used") - count, 0))
+
+
+@transaction.atomic
+def start_attempt(quiz_id: int, student):
+    """
+    Start (or resume) the student's attempt: one eligibility query, then the claim and insert.
+    Idempotent: with an attempt already in progress (a double-click, a reconnect) that attempt
+    is returned and no attempt is used up; one that has run past its deadline is auto-submitted first.
+    Raises ValidationError (codes as `check_eligibility`).
+    """
+    from main.models import QuizAttempt
+
+    try:
+        row = check_eligibility(quiz_id, student)
+        attempt = QuizAttempt(school_id=row["school_id"], quiz_id=quiz_id, student=student,
+                              paper_version=row["paper_version"])
+        with transaction.atomic():
+            attempt.save()
+        return attempt
+    except (IntegrityError, ValidationError) as e:
+        # the limit (or `uniq_active_attempt`) was hit by the attempt that is still open
+        if isinstance(e, ValidationError) and e.code != "max_attempts":
+            raise
+        current = QuizAttempt.default_objects.filter(
+            quiz_id=quiz_id, student=student, status="in_progress", is_active=True).first()
+        if current is None:
+            if isinstance(e, ValidationError):
+                raise
+            raise ValidationError("Attempt could not be started", code="conflict") from e
+        if is_expired(current.deadline):
+            # timed out but not swept yet: close it now, then start afresh (or hit the limit)
+            expire([current.pk], quiz_id)
+            return start_attempt(quiz_id, student)
+        return current
@@ -0,0 +1,132 @@
+# ==============================================
+# File: main/assessments/audience.py
+# Purpose: Materialized (quiz, student) eligibility rows kept in sync with assignments and enrollments
+# ==============================================
+from __future__ import annotations
+
+from typing import Iterable, Optional
+
+from django.db import transaction
+from django.db.models import Exists, OuterRef, Q
+
+from main.common.oncommit import CommitBatch
+
+# (quiz_id, student_id) → school_id
+Pairs = dict[tuple[int, int], int]
+
+
+def _desired(quiz_ids: Optional[list[int]] = None, student_ids: Optional[list[int]] = None) -> Pairs:
+    """
+    Who should see what, for the given quizzes or students (2 queries):
+    directly assigned students + students actively enrolled in an assigned class.
+    """
+    from main.models import Quiz
+
+    assigned = Quiz.assigned_students.through.objects.all()
+    # one filter() call, so both conditions apply to the same enrollment row
+    enrolled = {"classlist__enrollments__is_active": True}
+    if quiz_ids is not None:
+        assigned = assigned.filter(quiz_id__in=quiz_ids)
+        enrolled["quiz_id__in"] = quiz_ids
+    if student_ids is not None:
+        assigned = assigned.filter(student_id__in=student_ids)
+        enrolled["classlist__enrollments__student_id__in"] = student_ids
+    by_class = Quiz.class_lists.through.objects.filter(**enrolled)
+    pairs: Pairs = {}
+    for quiz_id, student_id, school_id in assigned.values_list("quiz_id", "student_id", "quiz__school_id"):
+        pairs[(quiz_id, student_id)] = school_id
+    for quiz_id, student_id, school_id in by_class.values_list(
+            "quiz_id", "classlist__enrollments__student_id", "quiz__school_id"):
+        pairs[(quiz_id, student_id)] = school_id
+    return pairs
+
+
+def _reconcile(desired: Pairs, scope: Q) -> tuple[int, int]:
+    """
+    Make the active rows inside `scope` equal `desired`: upsert what is missing, deactivate the rest.
+    Rows are flagged rather than deleted so churn never goes through per-row delete signals.
+    """
+    from main.models import QuizAudience
+
+    current = {
+        (quiz_id, student_id): pk
+        for pk, quiz_id, student_id in QuizAudience.default_objects.filter(scope, is_active=True)
+        .values_list("pk", "quiz_id", "student_id")
+    }
+    grant = [
+        QuizAudience(school_id=school_id, quiz_id=quiz_id, student_id=student_id, is_active=True)
+        for (quiz_id, student_id), school_id in desired.items()
+        if (quiz_id, student_id) not in current
+    ]
+    revoke = [pk for pair, pk in current.items() if pair not in desired]
+    if grant:
+        QuizAudience.default_objects.bulk_create(
+            grant, update_conflicts=True, unique_fields=["quiz", "student"], update_fields=["is_active"],
+            batch_size=1000)
+    if revoke:
+        QuizAudience.default_objects.filter(pk__in=revoke).update(is_active=False)
+    return len(grant), len(revoke)
+
+
+@transaction.atomic
+def sync_quizzes(quiz_ids: Iterable[int]) -> tuple[int, int]:
+    """Recompute the audience of whole quizzes (after assignment changes); returns (granted, revoked)."""
+    from main.models import Quiz
+
+    quiz_ids = list(quiz_ids)
+    if not quiz_ids:
+        return 0, 0
+    changed = _reconcile(_desired(quiz_ids=quiz_ids), Q(quiz_id__in=quiz_ids))
+    # a quiz with no class or student assignments is open to the whole school
+    Quiz.default_objects.filter(pk__in=quiz_ids).update(is_global=~Exists(
+        Quiz.class_lists.through.objects.filter(quiz_id=OuterRef("pk"))
+    ) & ~Exists(
+        Quiz.assigned_students.through.objects.filter(quiz_id=OuterRef("pk"))
+    ))
+    return changed
+
+
+@transaction.atomic
+def sync_students(student_ids: Iterable[int]) -> tuple[int, int]:
+    """Recompute every quiz row of some students (after enrollment changes); returns (granted, revoked)."""
+    student_ids = list(student_ids)
+    if not student_ids:
+        return 0, 0
+    return _reconcile(_desired(student_ids=student_ids), Q(student_id__in=student_ids))
+
+
+def rebuild(school_id: Optional[int] = None, batch_size: int = 500) -> tuple[int, int]:
+    """Recompute every quiz (of one school) in batches; used after bulk imports or by the rebuild command."""
+    from main.models import Quiz
+
+    quizzes = Quiz.default_objects.all()
+    if school_id is not None:
+        quizzes = quizzes.filter(school_id=school_id)
+    pks = list(quizzes.order_by("pk").values_list("pk", flat=True))
+    granted = revoked = 0
+    for start in range(0, len(pks), batch_size):
+        g, r = sync_quizzes(pks[start:start + batch_size])
+        granted, revoked = granted + g, revoked + r
+    return granted, revoked
+
+
+# -------- incremental trigger --------
+def schedule_sync(quizzes: Iterable[int] = (), students: Iterable[int] = ()) -> None:
+    """
+    Queue an audience sync for quizzes and/or students; runs once on commit.
+    Why: adding 40 students to a quiz one by one, or a class promotion, is one sync per transaction.
+    """
+    with _sync.collect() as (quiz_ids, student_ids):
+        quiz_ids.update(quizzes)
+        student_ids.update(students)
+
+
+def _sync_batch(batch: tuple[set[int], set[int]]) -> None:
+    quizzes, students = batch
+    if quizzes:
+        sync_quizzes(quizzes)
+    if students:
+        sync_students(students)
+
+
+_sync = CommitBatch(lambda: (set(), set()), _sync_batch)
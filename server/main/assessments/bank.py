@@ -0,0 +1,111 @@
+# ==============================================
+# File: main/assessments/bank.py
+# Purpose: Per-school question bank: place bank items in quizzes, sample items to generate a quiz
+# ==============================================
+from __future__ import annotations
+
+import random
+from typing import Iterable, Optional, Union
+
+from django.core.exceptions import ValidationError
+from django.db import transaction
+from django.db.models import Exists, Max, OuterRef
+from django.utils.text import slugify
+
+
+def candidate_ids(school_id: int, subject_id: int, difficulty: Union[int, Iterable[int], None] = None,
+                  tags: Iterable[str] = (), exclude: Iterable[int] = ()) -> list[int]:
+    """
+    Ids of active bank items matching subject, difficulty (one level or several) and any of `tags`.
+    An index-only read of (subject, is_active, difficulty) with a tag probe per
+    candidate; no item rows are loaded.
+    """
+    from main.models import QuestionBankItem, QuestionBankTag
+
+    items = QuestionBankItem.default_objects.filter(school_id=school_id, subject_id=subject_id, is_active=True)
+    if difficulty is not None:
+        levels = [difficulty] if isinstance(difficulty, int) else list(difficulty)
+        items = items.filter(difficulty__in=levels)
+    tags = [slugify(tag) for tag in tags if slugify(tag)]
+    if tags:
+        # probe the (item, name) unique index per candidate, so the item index still drives the scan
+        items = items.filter(Exists(QuestionBankTag.default_objects.filter(item=OuterRef("pk"), name__in=tags)))
+    exclude = list(exclude)
+    if exclude:
+        items = items.exclude(pk__in=exclude)
+    # sorted in Python: an ORDER BY pk would steer SQLite to the plain subject index and row lookups
+    return sorted(items.order_by().values_list("pk", flat=True))
+
+
+def sample_items(school_id: int, subject_id: int, count: int, difficulty=None, tags: Iterable[str] = (),
+                 exclude: Iterable[int] = (), seed: Optional[int] = None) -> list[int]:
+    """`count` distinct matching item ids drawn uniformly (reproducibly with `seed`)."""
+    ids = candidate_ids(school_id, subject_id, difficulty, tags, exclude)
+    if len(ids) < count:
+        raise ValidationError(
+            f"Only {len(ids)} matching question(s) in the bank; {count} requested", code="bank_exhausted")
+    return random.Random(seed).sample(ids, count)
+
+
+@transaction.atomic
+def add_to_quiz(quiz, item_ids: Iterable[int], points=None) -> list:
+    """
+    Append bank items to `quiz` as placement rows (order after the current last question).
+    Points default to each item's own. An item appears at most once per quiz: repeats, in
+    `item_ids` or already placed, raise ValidationError(code="bank_item_duplicate").
+    Returns the created `QuizQuestion` rows.
+    """
+    from main.models import QuestionBankItem, QuizQuestion
+    from main.assessments.papers import schedule_republish
+    from main.assessments.search import schedule_index
+
+    item_ids = list(item_ids)
+    placed = set(QuizQuestion.default_objects.filter(
+        quiz=quiz, is_active=True, bank_item_id__in=item_ids).values_list("bank_item_id", flat=True))
+    repeated = sorted(placed | {pk for pk in item_ids if item_ids.count(pk) > 1})
+    if repeated:
+        raise ValidationError(f"Question bank item(s) already in this quiz: {repeated}", code="bank_item_duplicate")
+    items = QuestionBankItem.default_objects.filter(
+        pk__in=item_ids, school_id=quiz.school_id, is_active=True).in_bulk()
+    missing = [pk for pk in item_ids if pk not in items]
+    if missing:
+        raise ValidationError(f"Unknown question bank item(s): {missing}", code="bank_item")
+    start = QuizQuestion.default_objects.filter(quiz=quiz).aggregate(last=Max("order"))["last"]
+    start = -1 if start is None else start
+    placed = QuizQuestion.default_objects.bulk_create([
+        QuizQuestion(school_id=quiz.school_id, quiz=quiz, bank_item_id=pk,
+                     points=items[pk].points if points is None else points, order=start + 1 + n)
+        for n, pk in enumerate(item_ids)
+    ])
+    # bulk_create sends no signals
+    schedule_republish(quiz.pk)
+    schedule_index(questions=[q.pk for q in placed])
+    return placed
+
+
+@transaction.atomic
+def generate_quiz(quiz, count: int, subject=None, difficulty=None, tags: Iterable[str] = (),
+                  seed: Optional[int] = None, points=None) -> list:
+    """
+    Add `count` bank questions sampled by subject (the quiz's by default), difficulty and tags.
+    Items the quiz already uses are skipped. Raises ValidationError(code="bank_exhausted")
+    when the bank has fewer matches than requested.
+    """
+    from main.models import QuizQuestion
+
+    used = QuizQuestion.default_objects.filter(
+        quiz=quiz, is_active=True, bank_item__isnull=False).values_list("bank_item_id", flat=True)
+    subject_id = getattr(subject, "pk", subject) or quiz.subject_id
+    ids = sample_items(quiz.school_id, subject_id, count, difficulty=difficulty, tags=tags,
+                       exclude=used, seed=seed)
+    return add_to_quiz(quiz, ids, points=points)
+
+
+def quizzes_using(item_ids: Iterable[int]) -> list[int]:
+    """Ids of quizzes with an active placement of any of `item_ids`."""
+    from main.models import QuizQuestion
+
+    return list(
+        QuizQuestion.default_objects.filter(bank_item_id__in=list(item_ids), is_active=True)
+        .order_by().values_list("quiz_id", flat=True).distinct()
+    )
@@ -0,0 +1,88 @@
+# ==============================================
+# File: main/assessments/ingestion.py
+# Purpose: Batched, idempotent answer autosave for in-progress attempts (changed rows only, one upsert)
+# ==============================================
+from __future__ import annotations
+
+from typing import Iterable, Optional
+
+from django.core.exceptions import ValidationError
+from django.db import transaction
+from django.utils import timezone
+
+from main.assessments.marking import get_answer_key
+from main.assessments.papers import get_option_ids
+from main.assessments.timer import is_expired
+
+
+def _normalize(raw: dict) -> tuple[int, list[int], str]:
+    """(question_id, sorted option ids, text) from {"question", "options"?, "text"?}."""
+    try:
+        question_id = int(raw["question"])
+        options = sorted({int(option) for option in raw.get("options") or ()})
+    except (KeyError, TypeError, ValueError) as e:
+        raise ValidationError("Each answer needs a 'question' id and optional 'options' ids / 'text'",
+                              code="answer") from e
+    return question_id, options, str(raw.get("text") or "")
+
+
+@transaction.atomic
+def save_answers(attempt_id: int, answers: Iterable[dict], student_id: Optional[int] = None) -> dict:
+    """
+    Upsert a batch of answers into an in-progress attempt.
+
+    Idempotent: the batch is coalesced per question (last entry wins), compared with what is
+    stored, and only new or changed answers are written, in one INSERT … ON CONFLICT UPDATE.
+    Re-sending the same autosave writes nothing. The attempt row itself is never rewritten.
+    Answers to questions not on the attempt's paper, or naming options the question does not offer,
+    are rejected (their question ids listed in "rejected") and leave the stored answer as it was.
+    Costs 3 queries (attempt, stored answers, upsert) with warm answer-key and paper caches.
+    Returns {"received", "written", "unchanged", "rejected"}; raises ValidationError with code
+    "attempt" (missing / not the student's) or "attempt_closed" (submitted, or past its deadline).
+    """
+    from main.models import QuizAnswer, QuizAttempt
+
+    attempt = (
+        QuizAttempt.default_objects.filter(pk=attempt_id, is_active=True)
+        .values("quiz_id", "school_id", "student_id", "status", "paper_version", "deadline").first()
+    )
+    if attempt is None or (student_id is not None and attempt["student_id"] != student_id):
+        raise ValidationError("Attempt not found", code="attempt")
+    if attempt["status"] != "in_progress":
+        raise ValidationError("Attempt has already been submitted", code="attempt_closed")
+    if is_expired(attempt["deadline"]):
+        raise ValidationError("Time is up for this attempt", code="attempt_closed")
+
+    questions = get_answer_key(attempt["quiz_id"], attempt["paper_version"])
+    offered = get_option_ids(attempt["quiz_id"], attempt["paper_version"])
+    incoming, received, rejected = {}, 0, []
+    for raw in answers:
+        received += 1
+        question_id, options, text = _normalize(raw)
+        if question_id not in questions or not offered.get(question_id, frozenset()).issuperset(options):
+            rejected.append(question_id)
+            continue
+        incoming[question_id] = (options, text)
+    if not incoming:
+        return {"received": received, "written": 0, "unchanged": 0, "rejected": rejected}
+
+    stored = {
+        question_id: (sorted(selected or ()), text)
+        for question_id, selected, text in QuizAnswer.default_objects.filter(
+            attempt_id=attempt_id, question_id__in=list(incoming)
+        ).values_list("question_id", "selected_option_ids", "text_answer")
+    }
+    now = timezone.now()
+    changed = [
+        QuizAnswer(school_id=attempt["school_id"], attempt_id=attempt_id, question_id=question_id,
+                   selected_option_ids=options, text_answer=text, created_at=now, updated_at=now)
+        for question_id, (options, text) in incoming.items()
+        if stored.get(question_id) != (options, text)
+    ]
+    if changed:
+        QuizAnswer.default_objects.bulk_create(
+            changed, update_conflicts=True, unique_fields=["attempt", "question"],
+            update_fields=["selected_option_ids", "text_answer", "updated_at", "is_active"],
+        )
+    return {"received": received, "written": len(changed),
+            "unchanged": len(incoming) - len(changed), "rejected": rejected}
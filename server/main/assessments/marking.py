@@ -0,0 +1,164 @@
+# ==============================================
+# File: main/assessments/marking.py
+# Purpose: Batch auto-marking of quiz attempts against a cached per-version answer key
+# ==============================================
+from __future__ import annotations
+
+from decimal import Decimal
+from typing import Callable, Iterable, Optional
+
+from django.core.cache import cache
+from django.db import transaction
+from django.utils import timezone
+
+from main.assessments.analytics import invalidate_analysis
+
+ANSWER_KEY_CACHE_KEY = "quiz_answer_key:{quiz_id}:v{version}"
+# keys are immutable per (quiz, version); a correction publishes a new version
+ANSWER_KEY_CACHE_TIMEOUT = 60 * 60 * 24 * 7
+AUTO_MARKED_KINDS = frozenset({"single", "multiple", "true_false"})
+GRADED_STATUSES = ("submitted", "graded")
+ZERO = Decimal("0")
+
+
+def _parse_key(raw: dict) -> dict[int, tuple[str, Decimal, frozenset]]:
+    return {
+        int(question_id): (entry["kind"], Decimal(entry["points"]), frozenset(entry["correct"]))
+        for question_id, entry in raw.items()
+    }
+
+
+def get_answer_key(quiz_id: int, version: Optional[int] = None) -> dict[int, tuple[str, Decimal, frozenset]]:
+    """
+    {question_id: (kind, points, correct option ids)} for a paper version (default: the quiz's current one).
+    A cache hit once warm (plus one small read of `Quiz.paper_version` when no version is given);
+    unpublished quizzes are compiled live (2 queries).
+    Marking uses the current key so a correction applies to every attempt on regrade.
+    """
+    from main.assessments.papers import compile_quiz
+    from main.models import Quiz, QuizPaper
+
+    if version is None:
+        version = Quiz.default_objects.filter(pk=quiz_id).values_list("paper_version", flat=True).first()
+    if not version:
+        return _parse_key(compile_quiz(Quiz.default_objects.get(pk=quiz_id))[1])
+    key = ANSWER_KEY_CACHE_KEY.format(quiz_id=quiz_id, version=version)
+    answer_key = cache.get(key)
+    if answer_key is None:
+        raw = (
+            QuizPaper.default_objects.filter(quiz_id=quiz_id, version=version)
+            .values_list("answer_key", flat=True).first()
+        )
+        # papers compiled before keys were stored carry an empty key: compile it live
+        answer_key = _parse_key(raw or compile_quiz(Quiz.default_objects.get(pk=quiz_id))[1])
+        cache.set(key, answer_key, ANSWER_KEY_CACHE_TIMEOUT)
+    return answer_key
+
+
+def _outcome(question_id: int, selected, answer_key) -> Optional[tuple[bool, Decimal]]:
+    """(is_correct, points) for an auto-marked question, None for manual kinds / unknown questions."""
+    entry = answer_key.get(question_id)
+    if entry is None or entry[0] not in AUTO_MARKED_KINDS:
+        return None
+    _, points, correct = entry
+    is_correct = bool(correct) and frozenset(selected or ()) == correct
+    return is_correct, points if is_correct else ZERO
+
+
+def mark(answer, answer_key) -> bool:
+    """
+    Mark one `QuizAnswer` in memory; returns True when is_correct/points_awarded changed.
+    Manually marked kinds (short_answer/essay) and questions missing from the key are left untouched.
+    """
+    outcome = _outcome(answer.question_id, answer.selected_option_ids, answer_key)
+    if outcome is None or (answer.is_correct, Decimal(answer.points_awarded)) == outcome:
+        return False
+    answer.is_correct, answer.points_awarded = outcome
+    return True
+
+
+def _update_grouped(queryset, groups: dict[tuple, list[int]], fields: tuple[str, ...], chunk: int = 900) -> None:
+    """
+    One `UPDATE … WHERE pk IN (…)` per distinct value tuple.
+    Why: marks and scores take few distinct values, so this is a handful of indexed statements,
+    where `bulk_update` would send a CASE with a branch per row.
+    """
+    for values, pks in groups.items():
+        for start in range(0, len(pks), chunk):
+            queryset.filter(pk__in=pks[start:start + chunk]).update(**dict(zip(fields, values)))
+
+
+@transaction.atomic
+def grade_attempts(attempts: Iterable, answer_key=None) -> dict:
+    """
+    Mark every answer of `attempts` (of one quiz) and write scores, in one transaction.
+    Answers are read as one projection, marked in memory, and only changed ones are written
+    (grouped by outcome); submitted attempts become "graded". Returns {"attempts", "answers", "changed"}.
+    """
+    from main.models import QuizAnswer, QuizAttempt
+
+    attempts = list(attempts)
+    if not attempts:
+        return {"attempts": 0, "answers": 0, "changed": 0}
+    if answer_key is None:
+        answer_key = get_answer_key(attempts[0].quiz_id)
+
+    rows = QuizAnswer.default_objects.filter(attempt__in=[a.pk for a in attempts], is_active=True).values_list(
+        "pk", "attempt_id", "question_id", "selected_option_ids", "is_correct", "points_awarded")
+    changed: dict[tuple, list[int]] = {}
+    scores, total, changed_count = {attempt.pk: ZERO for attempt in attempts}, 0, 0
+    for pk, attempt_id, question_id, selected, is_correct, points in rows:
+        total += 1
+        outcome = _outcome(question_id, selected, answer_key)
+        if outcome is not None and outcome != (is_correct, points):
+            changed.setdefault(outcome, []).append(pk)
+            changed_count += 1
+            points = outcome[1]
+        scores[attempt_id] += points
+    _update_grouped(QuizAnswer.default_objects, changed, ("is_correct", "points_awarded"))
+
+    outcomes: dict[tuple, list[int]] = {}
+    for attempt in attempts:
+        status = "graded" if attempt.status == "submitted" else attempt.status
+        if (attempt.score, attempt.status) != (scores[attempt.pk], status):
+            attempt.score, attempt.status = scores[attempt.pk], status
+            outcomes.setdefault((attempt.score, status), []).append(attempt.pk)
+    _update_grouped(QuizAttempt.default_objects, outcomes, ("score", "status"))
+    invalidate_analysis(attempts[0].quiz_id)
+    return {"attempts": len(attempts), "answers": total, "changed": changed_count}
+
+
+def grade_attempt(attempt) -> dict:
+    return grade_attempts([attempt])
+
+
+def submit_attempt(attempt, now=None) -> dict:
+    """Close an in-progress attempt and grade it immediately."""
+    attempt.status, attempt.submitted_at = "submitted", now or timezone.now()
+    with transaction.atomic():
+        attempt.save(update_fields=["status", "submitted_at"])
+        return grade_attempt(attempt)
+
+
+def grade_quiz(quiz, statuses: Iterable[str] = GRADED_STATUSES, batch_size: int = 500,
+               progress: Optional[Callable[[int, int], None]] = None) -> dict:
+    """
+    (Re)grade every closed attempt of `quiz` in batches; the key is loaded once for the whole run.
+    Each batch is its own transaction, so a large regrade never holds one long write lock.
+    """
+    from main.models import QuizAttempt
+
+    answer_key = get_answer_key(quiz.pk)
+    pks = list(
+        QuizAttempt.default_objects.filter(quiz=quiz, status__in=list(statuses), is_active=True)
+        .order_by("pk").values_list("pk", flat=True)
+    )
+    summary = {"attempts": 0, "answers": 0, "changed": 0}
+    for start in range(0, len(pks), batch_size):
+        batch = QuizAttempt.default_objects.filter(pk__in=pks[start:start + batch_size]).only(
+            "pk", "quiz_id", "status", "score")
+        for name, value in grade_attempts(batch, answer_key).items():
+            summary[name] += value
+        if progress:
+            progress(summary["attempts"], len(pks))
+    return summary
@@ -0,0 +1,85 @@
+# ==============================================
+# File: main/assessments/ordering.py
+# Purpose: Per-attempt question/option order derived from a stored seed (deterministic, O(n), nothing stored per question)
+# ==============================================
+from __future__ import annotations
+
+import json
+import secrets
+from typing import Optional, Sequence
+
+_MASK = (1 << 64) - 1
+
+
+def new_seed() -> int:
+    """Fresh attempt seed (fits a signed 64-bit column)."""
+    return secrets.randbits(63)
+
+
+class SplitMix64:
+    """
+    Tiny deterministic PRNG (SplitMix64).
+    Why: `random.Random` makes no cross-version promise for `shuffle`/`randrange`; an order a student
+    saw must be reproducible forever from the seed alone.
+    """
+    __slots__ = ("state",)
+
+    def __init__(self, seed: int):
+        self.state = seed & _MASK
+
+    def next(self) -> int:
+        self.state = (self.state + 0x9E3779B97F4A7C15) & _MASK
+        z = self.state
+        z = ((z ^ (z >> 30)) * 0xBF58476D1CE4E5B9) & _MASK
+        z = ((z ^ (z >> 27)) * 0x94D049BB133111EB) & _MASK
+        return z ^ (z >> 31)
+
+    def below(self, n: int) -> int:
+        """Uniform integer in [0, n) (rejection sampling, no modulo bias)."""
+        limit = _MASK - (_MASK + 1) % n
+        while True:
+            value = self.next()
+            if value <= limit:
+                return value % n
+
+
+def shuffled(items: Sequence, seed: int) -> list:
+    """Fisher–Yates shuffle of a copy of `items`; same seed + same items → same order."""
+    items = list(items)
+    rng = SplitMix64(seed)
+    for i in range(len(items) - 1, 0, -1):
+        j = rng.below(i + 1)
+        items[i], items[j] = items[j], items[i]
+    return items
+
+
+def _sub_seed(seed: int, salt: int) -> int:
+    # per-question stream: editing one question never reshuffles another's options
+    return SplitMix64(seed ^ (salt * 0xD1B54A32D192ED03 & _MASK)).next()
+
+
+def order_paper(paper: dict, seed: int) -> dict:
+    """
+    The paper as this attempt sees it: questions and/or options shuffled when the quiz asks for it.
+    Pure function of (paper, seed); the compiled paper itself is not modified.
+    """
+    header = paper["quiz"]
+    questions = paper["questions"]
+    if header.get("randomizeQuestions"):
+        questions = shuffled(questions, seed)
+    if header.get("randomizeOptions"):
+        questions = [
+            {**question, "options": shuffled(question["options"], _sub_seed(seed, question["id"]))}
+            for question in questions
+        ]
+    return {**paper, "questions": questions}
+
+
+def attempt_paper(attempt) -> Optional[dict]:
+    """The pinned paper of `attempt` in its own order (a cache read plus O(n) shuffling)."""
+    from main.assessments.papers import paper_for_attempt
+
+    paper = paper_for_attempt(attempt)
+    if paper is None:
+        return None
+    return order_paper(json.loads(paper), attempt.seed)
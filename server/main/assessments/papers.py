@@ -0,0 +1,157 @@
+# ==============================================
+# File: main/assessments/papers.py
+# Purpose: Compile published quizzes into immutable, versioned papers served from cache
+# ==============================================
+from __future__ import annotations
+
+import hashlib
+import json
+from typing import Optional
+
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import Prefetch
+
+from main.common.oncommit import CommitBatch
+
+PAPER_CACHE_KEY = "quiz_paper:{quiz_id}:v{version}"
+# a (quiz, version) paper never changes, so entries only age out
+PAPER_CACHE_TIMEOUT = 60 * 60 * 24 * 7
+
+
+def _dumps(payload: dict) -> str:
+    """Compact, key-sorted JSON: the stored/served form and the input to the digest."""
+    return json.dumps(payload, separators=(",", ":"), sort_keys=True)
+
+
+def compile_quiz(quiz) -> tuple[dict, dict]:
+    """
+    (payload, answer key) for the active questions/options of `quiz`, in delivery order
+    (2 queries; a third for the options of question-bank placements).
+    The payload is what students see; the key ({question_id: {kind, points, correct}}) never leaves the server.
+    """
+    from main.models import QuestionBankOption, QuizOption, QuizQuestion
+
+    questions = list(
+        QuizQuestion.default_objects.filter(quiz=quiz, is_active=True)
+        .select_related("bank_item")
+        .order_by("order", "id")
+        .prefetch_related(
+            Prefetch("options",
+                     queryset=QuizOption.default_objects.filter(is_active=True).order_by("order", "id")),
+            Prefetch("bank_item__options",
+                     queryset=QuestionBankOption.default_objects.filter(is_active=True).order_by("order", "id")),
+        )
+    )
+    payload = {"quiz": quiz.paper_header(), "questions": [q.to_public_dict() for q in questions]}
+    answer_key = {
+        str(q.pk): {"kind": q.content.kind, "points": str(q.points),
+                    "correct": [o.pk for o in q.content.options.all() if o.is_correct]}
+        for q in questions
+    }
+    return payload, answer_key
+
+
+@transaction.atomic
+def publish(quiz):
+    """
+    Compile `quiz` into a paper and mark it published; returns the current `QuizPaper`.
+    An unchanged quiz keeps its version; any content change creates version + 1.
+    Earlier versions are kept so in-progress attempts can finish on the paper they started.
+    """
+    from main.models import Quiz, QuizPaper
+
+    # row lock: concurrent publishes of one quiz must not race for the same version number
+    quiz = Quiz.default_objects.select_for_update().get(pk=quiz.pk)
+    payload, answer_key = compile_quiz(quiz)
+    # the key is part of the digest: correcting an answer is a new version too
+    digest = hashlib.sha256(_dumps({"payload": payload, "key": answer_key}).encode()).hexdigest()
+
+    paper = QuizPaper.default_objects.filter(quiz=quiz).order_by("-version").first()
+    if paper is None or paper.digest != digest:
+        paper = QuizPaper.default_objects.create(
+            school_id=quiz.school_id, quiz=quiz, version=(paper.version + 1 if paper else 1),
+            digest=digest, payload=payload, answer_key=answer_key,
+        )
+    if not quiz.is_published or quiz.paper_version != paper.version:
+        # queryset update: no post_save, so publishing never re-triggers a republish
+        Quiz.default_objects.filter(pk=quiz.pk).update(is_published=True, paper_version=paper.version)
+    return paper
+
+
+def get_paper_json(quiz_id: int, version: Optional[int] = None) -> Optional[str]:
+    """
+    Compact JSON of a compiled paper (the quiz's current one when `version` is None).
+    A cache read once warm; None if the quiz was never published or the version does not exist.
+    """
+    from main.models import Quiz, QuizPaper
+
+    if version is None:
+        version = Quiz.default_objects.filter(pk=quiz_id).values_list("paper_version", flat=True).first()
+        if not version:
+            return None
+    key = PAPER_CACHE_KEY.format(quiz_id=quiz_id, version=version)
+    paper = cache.get(key)
+    if paper is None:
+        payload = (
+            QuizPaper.default_objects.filter(quiz_id=quiz_id, version=version)
+            .values_list("payload", flat=True).first()
+        )
+        if payload is None:
+            return None
+        paper = _dumps(payload)
+        cache.set(key, paper, PAPER_CACHE_TIMEOUT)
+    return paper
+
+
+def get_option_ids(quiz_id: int, version: Optional[int] = None) -> dict[int, frozenset]:
+    """
+    {question_id: ids of the options offered} from a paper version (default: the quiz's current one).
+    Parsed from the cached paper; an unpublished quiz is compiled live (2 queries).
+    """
+    from main.models import Quiz
+
+    paper = get_paper_json(quiz_id, version or None)
+    payload = json.loads(paper) if paper is not None else compile_quiz(Quiz.default_objects.get(pk=quiz_id))[0]
+    return {
+        question["id"]: frozenset(option["id"] for option in question["options"])
+        for question in payload["questions"]
+    }
+
+
+def paper_for_attempt(attempt) -> Optional[str]:
+    """The paper an attempt is pinned to (falls back to the quiz's current paper)."""
+    return get_paper_json(attempt.quiz_id, attempt.paper_version or None)
+
+
+# -------- republish after edits --------
+def schedule_republish(quiz_id: int) -> None:
+    """
+    Recompile a published quiz once the surrounding transaction commits.
+    Why: editing 60 questions in one request produces one new version, not 60.
+    """
+    with _republish.collect() as (quiz_ids, _):
+        quiz_ids.add(quiz_id)
+
+
+def schedule_republish_question(question_id: int) -> None:
+    """
+    Recompile the quiz of a question once the surrounding transaction commits.
+    Why: option saves know only their question; the quizzes are resolved in one query on commit,
+    not one question load per option.
+    """
+    with _republish.collect() as (_, question_ids):
+        question_ids.add(question_id)
+
+
+def _republish_batch(batch: tuple[set[int], set[int]]) -> None:
+    from main.models import Quiz, QuizQuestion
+
+    quiz_ids, question_ids = batch
+    if question_ids:
+        quiz_ids |= set(QuizQuestion.default_objects.filter(pk__in=question_ids).values_list("quiz_id", flat=True))
+    for quiz in Quiz.default_objects.filter(pk__in=quiz_ids, is_published=True, is_active=True):
+        publish(quiz)
+
+
+_republish = CommitBatch(lambda: (set(), set()), _republish_batch)
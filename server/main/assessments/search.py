@@ -0,0 +1,246 @@
+# ==============================================
+# File: main/assessments/search.py
+# Purpose: SQLite FTS5 index over quizzes, quiz questions and the question bank (per-school, bm25, prefix match)
+# ==============================================
+from __future__ import annotations
+
+import re
+from typing import Iterable, Optional
+
+from django.db import connection, transaction
+from django.db.models.expressions import RawSQL
+
+from main.common.oncommit import CommitBatch
+
+QUIZ_TABLE = "main_quiz_search"
+QUESTION_TABLE = "main_quizquestion_search"
+BANK_TABLE = "main_questionbankitem_search"
+SEARCH_LIMIT = 100
+# bm25 column weights (scope, …, title, body): a title hit outranks a description/subject hit
+QUIZ_WEIGHTS = (0.0, 10.0, 2.0)
+QUESTION_WEIGHTS = (0.0, 0.0, 10.0, 1.0)
+BANK_WEIGHTS = (0.0, 0.0, 10.0, 1.0)
+
+# Index tables are created by migrations 0010 (quiz, question) and 0011 (bank item).
+# rowid = quiz / question pk, so single rows are replaced by key without scanning the index;
+# `scope` holds one "s<school_id>" token so the per-school filter is part of the MATCH itself.
+# prefix='2 3 4' keeps dedicated prefix indexes for the short stems a picker sends while typing.
+COLUMNS = {QUIZ_TABLE: ("scope", "title", "body"),
+           QUESTION_TABLE: ("scope", "quiz_id", "text", "explanation"),
+           BANK_TABLE: ("scope", "subject_id", "text", "explanation")}
+
+_TOKEN = re.compile(r"\w+", re.UNICODE)
+
+
+def fts_available(using=None) -> bool:
+    """True when the database is SQLite and the index tables exist (see migration 0010)."""
+    conn = using or connection
+    if conn.vendor != "sqlite":
+        return False
+    # remembered per database file: the test runner swaps NAME on the same connection object
+    name = conn.settings_dict["NAME"]
+    known = getattr(conn, "_assessment_fts", {})
+    if name not in known:
+        with conn.cursor() as cursor:
+            cursor.execute("SELECT count(*) FROM sqlite_master WHERE name = %s", [QUIZ_TABLE])
+            known[name] = bool(cursor.fetchone()[0])
+        conn._assessment_fts = known
+    return known[name]
+
+
+def match_expression(school_id: int, text: str) -> Optional[str]:
+    """
+    FTS5 query for user input: every word must match, the last one as a prefix
+    ("alg equ" → algebra equations). Words are quoted so operators in the input are inert.
+    """
+    tokens = _TOKEN.findall(text or "")
+    if not tokens:
+        return None
+    terms = [f'"{token}"' for token in tokens[:-1]] + [f'"{tokens[-1]}"*']
+    return f'scope:"s{school_id}" AND ({" ".join(terms)})'
+
+
+def _ranked(table: str, weights: tuple, match: str, limit: int, columns: str = "rowid") -> list:
+    """Best `limit` rows of the whole match set by bm25."""
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f"SELECT {columns} FROM {table} WHERE {table} MATCH %s "
+            f"ORDER BY bm25({table}, {', '.join(map(str, weights))}) LIMIT %s",
+            [match, limit],
+        )
+        return cursor.fetchall()
+
+
+def search_quizzes(school_id: int, text: str, limit: int = SEARCH_LIMIT) -> list[int]:
+    """Quiz ids of the school best matching `text` (title, description, subject), best first."""
+    match = match_expression(school_id, text)
+    if match is None:
+        return []
+    return [row[0] for row in _ranked(QUIZ_TABLE, QUIZ_WEIGHTS, match, limit)]
+
+
+def search_questions(school_id: int, text: str, limit: int = SEARCH_LIMIT) -> list[tuple[int, int]]:
+    """(question id, quiz id) of the school's questions best matching `text`, best first."""
+    match = match_expression(school_id, text)
+    if match is None:
+        return []
+    return [(pk, int(quiz_id)) for pk, quiz_id in
+            _ranked(QUESTION_TABLE, QUESTION_WEIGHTS, match, limit, columns="rowid, quiz_id")]
+
+
+def search_bank(school_id: int, text: str, limit: int = SEARCH_LIMIT) -> list[tuple[int, int]]:
+    """(bank item id, subject id) of the school's question bank best matching `text`, best first."""
+    match = match_expression(school_id, text)
+    if match is None:
+        return []
+    return [(pk, int(subject_id)) for pk, subject_id in
+            _ranked(BANK_TABLE, BANK_WEIGHTS, match, limit, columns="rowid, subject_id")]
+
+
+def filter_ranked(queryset, table: str, weights: tuple, match: str):
+    """
+    `queryset` narrowed to every row matching `match` and ordered by bm25, best first.
+    The match is a subquery of the same SQL, so the caller's filters and slicing apply to the
+    full match set rather than to a pre-cut top N.
+    """
+    model = queryset.model
+    pk = f'"{model._meta.db_table}"."{model._meta.pk.column}"'
+    score = RawSQL(
+        f"(SELECT bm25({table}, {', '.join(map(str, weights))}) FROM {table} "
+        f"WHERE {table} MATCH %s AND rowid = {pk})",
+        [match],
+    )
+    return queryset.filter(pk__in=RawSQL(f"SELECT rowid FROM {table} WHERE {table} MATCH %s", [match])).order_by(
+        score, "-pk")
+
+
+# -------- index maintenance --------
+def _quiz_rows(queryset) -> list[tuple]:
+    return [
+        (pk, f"s{school_id}", title, " ".join(filter(None, (description, subject))))
+        for pk, school_id, title, description, subject in queryset.values_list(
+            "pk", "school_id", "title", "description", "subject__name")
+    ]
+
+
+def _question_rows(queryset) -> list[tuple]:
+    return [
+        (pk, f"s{school_id}", quiz_id, text, explanation)
+        for pk, school_id, quiz_id, text, explanation in queryset.values_list(
+            "pk", "school_id", "quiz_id", "text", "explanation")
+    ]
+
+
+def _bank_rows(queryset) -> list[tuple]:
+    return [
+        (pk, f"s{school_id}", subject_id, text, explanation)
+        for pk, school_id, subject_id, text, explanation in queryset.values_list(
+            "pk", "school_id", "subject_id", "text", "explanation")
+    ]
+
+
+def _write(table: str, delete_ids: Iterable[int], rows: list[tuple]) -> None:
+    """Delete rows by rowid, then insert `rows` as (rowid, *columns) tuples."""
+    delete_ids = list(delete_ids)
+    with connection.cursor() as cursor:
+        for start in range(0, len(delete_ids), 500):
+            chunk = delete_ids[start:start + 500]
+            cursor.execute(f"DELETE FROM {table} WHERE rowid IN ({', '.join(['%s'] * len(chunk))})", chunk)
+        if rows:
+            columns = COLUMNS[table]
+            cursor.executemany(
+                f"INSERT INTO {table} (rowid, {', '.join(columns)}) "
+                f"VALUES ({', '.join(['%s'] * (len(columns) + 1))})",
+                rows,
+            )
+
+
+def index_quizzes(quiz_ids: Iterable[int]) -> int:
+    """Replace the index rows of `quiz_ids`; inactive or deleted quizzes just drop out. Returns rows written."""
+    from main.models import Quiz
+
+    quiz_ids = list(quiz_ids)
+    if not quiz_ids or not fts_available():
+        return 0
+    rows = _quiz_rows(Quiz.default_objects.filter(pk__in=quiz_ids, is_active=True))
+    _write(QUIZ_TABLE, quiz_ids, rows)
+    return len(rows)
+
+
+def index_questions(question_ids: Iterable[int]) -> int:
+    """Replace the index rows of `question_ids`; inactive or deleted questions just drop out."""
+    from main.models import QuizQuestion
+
+    question_ids = list(question_ids)
+    if not question_ids or not fts_available():
+        return 0
+    rows = _question_rows(QuizQuestion.default_objects.filter(pk__in=question_ids, is_active=True))
+    _write(QUESTION_TABLE, question_ids, rows)
+    return len(rows)
+
+
+def index_bank_items(item_ids: Iterable[int]) -> int:
+    """Replace the index rows of question bank items; inactive or deleted items just drop out."""
+    from main.models import QuestionBankItem
+
+    item_ids = list(item_ids)
+    if not item_ids or not fts_available():
+        return 0
+    rows = _bank_rows(QuestionBankItem.default_objects.filter(pk__in=item_ids, is_active=True))
+    _write(BANK_TABLE, item_ids, rows)
+    return len(rows)
+
+
+@transaction.atomic
+def rebuild(school_id: Optional[int] = None) -> tuple[int, int, int]:
+    """
+    Re-index every active quiz, question and bank item (of one school, or all).
+    Returns (quizzes, questions, bank items).
+    """
+    from main.models import QuestionBankItem, Quiz, QuizQuestion
+
+    if not fts_available():
+        return 0, 0, 0
+    sources = {
+        QUIZ_TABLE: (Quiz, _quiz_rows),
+        QUESTION_TABLE: (QuizQuestion, _question_rows),
+        BANK_TABLE: (QuestionBankItem, _bank_rows),
+    }
+    written = []
+    for table, (model, rows_of) in sources.items():
+        queryset = model.default_objects.filter(is_active=True)
+        with connection.cursor() as cursor:
+            if school_id is None:
+                cursor.execute(f"DELETE FROM {table}")
+            else:
+                cursor.execute(f"DELETE FROM {table} WHERE {table} MATCH %s", [f'scope:"s{school_id}"'])
+                queryset = queryset.filter(school_id=school_id)
+        rows = rows_of(queryset)
+        _write(table, (), rows)
+        with connection.cursor() as cursor:
+            cursor.execute(f"INSERT INTO {table}({table}) VALUES ('optimize')")
+        written.append(len(rows))
+    return tuple(written)
+
+
+# -------- incremental trigger --------
+def schedule_index(quizzes: Iterable[int] = (), questions: Iterable[int] = (),
+                   bank_items: Iterable[int] = ()) -> None:
+    """
+    Queue quizzes, questions and/or bank items for re-indexing; runs once on commit.
+    Why: importing a 200-question paper re-indexes those rows in one pass instead of 200.
+    """
+    with _reindex.collect() as (quiz_ids, question_ids, bank_item_ids):
+        quiz_ids.update(quizzes)
+        question_ids.update(questions)
+        bank_item_ids.update(bank_items)
+
+
+def _index_batch(batch: tuple[set[int], set[int], set[int]]) -> None:
+    quizzes, questions, bank_items = batch
+    index_quizzes(quizzes)
+    index_questions(questions)
+    index_bank_items(bank_items)
+
+
+_reindex = CommitBatch(lambda: (set(), set(), set()), _index_batch)
@@ -0,0 +1,124 @@
+# ==============================================
+# File: main/assessments/signals.py
+# Purpose: Recompile published quiz papers, re-derive quiz audiences, re-index search and move attempt
+#          deadlines after changes
+#          (including question bank edits, which reach every quiz placing the item)
+# ==============================================
+from __future__ import annotations
+
+from django.db.models.signals import m2m_changed, post_delete, post_save
+from django.dispatch import receiver
+
+from main.assessments.attempts import release_attempts
+from main.assessments.audience import schedule_sync
+from main.assessments.bank import quizzes_using
+from main.assessments.papers import schedule_republish, schedule_republish_question
+from main.assessments.search import schedule_index
+from main.assessments.timer import refresh_deadlines
+
+
+# app_label.ModelName style avoids import cycle
+@receiver(post_save, sender="main.Quiz")
+def _republish_quiz(sender, instance, **kwargs):
+    """Saving a published quiz (or publishing it via `save`) compiles a paper on commit."""
+    if instance.is_published:
+        schedule_republish(instance.pk)
+
+
+@receiver(post_save, sender="main.Quiz")
+def _refresh_attempt_deadlines(sender, instance, created=False, update_fields=None, **kwargs):
+    """A changed duration or end time moves the deadline of attempts already running."""
+    if created or (update_fields is not None and not {"duration_minutes", "end_time"} & set(update_fields)):
+        return
+    refresh_deadlines(instance)
+
+
+@receiver(post_save, sender="main.QuizQuestion")
+@receiver(post_delete, sender="main.QuizQuestion")
+def _republish_question(sender, instance, **kwargs):
+    if instance.quiz_id:
+        schedule_republish(instance.quiz_id)
+
+
+@receiver(post_save, sender="main.QuizOption")
+@receiver(post_delete, sender="main.QuizOption")
+def _republish_option(sender, instance, **kwargs):
+    if instance.question_id:
+        schedule_republish_question(instance.question_id)
+
+
+@receiver(post_save, sender="main.QuestionBankItem")
+@receiver(post_delete, sender="main.QuestionBankItem")
+def _republish_bank_item(sender, instance, created=False, **kwargs):
+    """One bank edit, every quiz placing the item recompiles (published ones only, on commit)."""
+    schedule_index(bank_items=[instance.pk])
+    if not created:
+        for quiz_id in quizzes_using([instance.pk]):
+            schedule_republish(quiz_id)
+
+
+@receiver(post_save, sender="main.QuestionBankOption")
+@receiver(post_delete, sender="main.QuestionBankOption")
+def _republish_bank_option(sender, instance, **kwargs):
+    if instance.item_id:
+        for quiz_id in quizzes_using([instance.item_id]):
+            schedule_republish(quiz_id)
+
+
+@receiver(post_save, sender="main.QuizAttempt")
+@receiver(post_delete, sender="main.QuizAttempt")
+def _release_attempt(sender, instance, **kwargs):
+    """A deleted attempt (e.g. reset by a teacher) no longer counts against `max_attempts`."""
+    if "created" in kwargs:
+        # soft delete saves only the deletion fields
+        if "is_active" not in (kwargs.get("update_fields") or ()) or instance.is_active:
+            return
+    elif not instance.is_active:
+        return  # already released when it was soft-deleted
+    release_attempts(instance.quiz_id, instance.student_id)
+
+
+@receiver(m2m_changed, sender="main.Quiz_class_lists")
+@receiver(m2m_changed, sender="main.Quiz_assigned_students")
+def _sync_quiz_audience(sender, instance, action, reverse, pk_set, **kwargs):
+    """Assignment changes from either side (quiz.class_lists.add / class_list.quizzes.add) resync the quizzes."""
+    if reverse:
+        # instance is the class/student: the affected quizzes are pk_set, or all of them on clear
+        if action == "pre_clear":
+            schedule_sync(quizzes=instance.quizzes.values_list("pk", flat=True)
+                          if sender.__name__ == "Quiz_class_lists"
+                          else instance.assigned_quizzes.values_list("pk", flat=True))
+        elif action in ("post_add", "post_remove"):
+            schedule_sync(quizzes=pk_set)
+    elif action in ("post_add", "post_remove", "post_clear"):
+        schedule_sync(quizzes=[instance.pk])
+
+
+@receiver(post_save, sender="main.StudentEnrollment")
+@receiver(post_delete, sender="main.StudentEnrollment")
+def _sync_student_audience(sender, instance, **kwargs):
+    """Enrolling, transferring or withdrawing a student changes which class quizzes they see."""
+    if instance.student_id:
+        schedule_sync(students=[instance.student_id])
+
+
+@receiver(post_save, sender="main.Quiz")
+@receiver(post_delete, sender="main.Quiz")
+def _index_quiz(sender, instance, **kwargs):
+    schedule_index(quizzes=[instance.pk])
+
+
+@receiver(post_save, sender="main.QuizQuestion")
+@receiver(post_delete, sender="main.QuizQuestion")
+def _index_question(sender, instance, **kwargs):
+    schedule_index(questions=[instance.pk])
+
+
+@receiver(post_save, sender="main.Subject")
+def _index_subject_quizzes(sender, instance, update_fields=None, **kwargs):
+    """Quizzes are also found by subject name; a rename re-indexes the subject's quizzes."""
+    if kwargs.get("created") or (update_fields is not None and "name" not in update_fields):
+        return
+    from main.models import Quiz
+
+    schedule_index(quizzes=Quiz.default_objects.filter(subject=instance).values_list("pk", flat=True))
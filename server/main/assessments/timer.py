@@ -0,0 +1,118 @@
+# ==============================================
+# File: main/assessments/timer.py
+# Purpose: Server-side attempt deadlines: remaining time, and a batched sweeper that auto-submits expired attempts
+# ==============================================
+from __future__ import annotations
+
+from datetime import datetime, timedelta
+from typing import Iterable, Optional
+
+from django.core.exceptions import ValidationError
+from django.db import transaction
+from django.db.models import F, Value
+from django.db.models.functions import Least
+from django.utils import timezone
+
+from main.assessments.marking import get_answer_key, grade_attempts
+
+# autosaves sent just before the deadline may arrive a little after it
+GRACE = timedelta(seconds=30)
+SWEEP_BATCH = 500
+
+
+def deadline_for(started_at: datetime, duration_minutes: Optional[int], end_time: Optional[datetime]):
+    """When an attempt started at `started_at` must close: its duration or the quiz window, whichever is first."""
+    ends = [end_time] if end_time else []
+    if duration_minutes:
+        ends.append(started_at + timedelta(minutes=duration_minutes))
+    return min(ends) if ends else None
+
+
+def refresh_deadlines(quiz) -> int:
+    """
+    Recompute the deadline of every open attempt of `quiz` (after its duration or end time changed)
+    in one UPDATE. Returns the number of attempts updated.
+    """
+    from main.models import QuizAttempt
+
+    ends = [Value(quiz.end_time)] if quiz.end_time else []
+    if quiz.duration_minutes:
+        ends.append(F("started_at") + timedelta(minutes=quiz.duration_minutes))
+    if not ends:
+        deadline = None
+    else:
+        deadline = ends[0] if len(ends) == 1 else Least(*ends)
+    return QuizAttempt.default_objects.filter(quiz_id=quiz.pk, status="in_progress").update(deadline=deadline)
+
+
+def remaining(attempt_id: int, student_id: Optional[int] = None, now=None) -> dict:
+    """
+    {"status", "deadline", "remaining"} for one attempt in a single indexed read; `remaining`
+    is whole seconds (never negative), or None for an untimed attempt. Raises ValidationError
+    (code "attempt") when the attempt is missing or not the student's.
+    """
+    from main.models import QuizAttempt
+
+    row = (
+        QuizAttempt.default_objects.filter(pk=attempt_id, is_active=True)
+        .values("student_id", "status", "deadline").first()
+    )
+    if row is None or (student_id is not None and row["student_id"] != student_id):
+        raise ValidationError("Attempt not found", code="attempt")
+    now = now or timezone.now()
+    left = None
+    if row["deadline"] is not None:
+        left = 0 if row["status"] != "in_progress" else max(int((row["deadline"] - now).total_seconds()), 0)
+    return {"status": row["status"], "deadline": row["deadline"], "remaining": left}
+
+
+def is_expired(deadline: Optional[datetime], now=None) -> bool:
+    """True once `deadline` (plus `GRACE`) has passed."""
+    return deadline is not None and (now or timezone.now()) > deadline + GRACE
+
+
+def expire(attempt_ids: Iterable[int], quiz_id: int, answer_key=None) -> int:
+    """
+    Auto-submit and grade open attempts of one quiz, stamped as submitted at their deadline.
+    One UPDATE closes them all; attempts the student submitted meanwhile are left alone.
+    Returns the number of attempts closed.
+    """
+    from main.models import QuizAttempt
+
+    attempt_ids = list(attempt_ids)
+    with transaction.atomic():
+        closed = QuizAttempt.default_objects.filter(pk__in=attempt_ids, status="in_progress").update(
+            status="submitted", submitted_at=F("deadline"))
+        if closed:
+            attempts = QuizAttempt.default_objects.filter(pk__in=attempt_ids, status="submitted").only(
+                "pk", "quiz_id", "status", "score")
+            grade_attempts(attempts, answer_key=answer_key or get_answer_key(quiz_id))
+    return closed
+
+
+def sweep(now=None, batch_size: int = SWEEP_BATCH) -> int:
+    """
+    Close every attempt whose deadline (plus `GRACE`) has passed, across all schools.
+    Each batch is one read of the (status, deadline) index, then one UPDATE and one grading pass
+    per quiz in the batch (answer keys are loaded once per sweep), so a school-wide exam ending
+    at the same minute costs a few queries per `batch_size` attempts, not per attempt.
+    Returns the number of attempts closed.
+    """
+    from main.models import QuizAttempt
+
+    cutoff = (now or timezone.now()) - GRACE
+    total, keys = 0, {}
+    while True:
+        batch = list(
+            QuizAttempt.default_objects.filter(status="in_progress", deadline__lte=cutoff)
+            .order_by("deadline").values_list("pk", "quiz_id")[:batch_size]
+        )
+        if not batch:
+            return total
+        by_quiz: dict[int, list[int]] = {}
+        for pk, quiz_id in batch:
+            by_quiz.setdefault(quiz_id, []).append(pk)
+        for quiz_id, pks in by_quiz.items():
+            if quiz_id not in keys:
+                keys[quiz_id] = get_answer_key(quiz_id)
+            total += expire(pks, quiz_id, answer_key=keys[quiz_id])
@@ -0,0 +1,85 @@
+# ==============================================
+# File: main/common/oncommit.py
+# Purpose: Work deferred to transaction commit: batched triggers and cache invalidation
+# ==============================================
+from __future__ import annotations
+
+import threading
+from contextlib import contextmanager
+from typing import Callable, Generic, Iterator, TypeVar
+
+from django.core.cache import cache
+from django.db import transaction
+
+T = TypeVar("T")
+
+
+class CommitBatch(Generic[T]):
+    """
+    Work collected during a transaction and handled in one `flush(batch)` after it commits.
+    Why: 200 saves in one request (a paper import, a promotion) cost one flush, not 200.
+
+        _batch = CommitBatch(set, _sync)
+        with _batch.collect() as quiz_ids:
+            quiz_ids.add(quiz.pk)
+    """
+
+    def __init__(self, factory: Callable[[], T], flush: Callable[[T], None]):
+        self._factory = factory
+        self._flush = flush
+        self._local = threading.local()
+
+    @contextmanager
+    def collect(self) -> Iterator[T]:
+        """This thread's pending batch (built by `factory`), flushed once the transaction commits."""
+        batch = getattr(self._local, "batch", None)
+        if batch is None:
+            batch = self._local.batch = self._factory()
+        yield batch
+        # registered after the additions: outside a transaction on_commit runs immediately.
+        # The first callback to run drains the batch; the rest find it empty.
+        transaction.on_commit(self.flush)
+
+    def flush(self) -> None:
+        batch, self._local.batch = getattr(self._local, "batch", None), None
+        if batch:
+            self._flush(batch)
+
+
+def invalidate_on_commit(*keys: str) -> None:
+    """
+    Drop cache entries now and again once the surrounding transaction commits.
+
+    Why: the first delete lets the rest of this transaction read its own writes; the second
+    drops anything a concurrent reader re-cached from the pre-commit rows. Until the commit,
+    `cache_set` does not publish these keys from this transaction's uncommitted rows.
+    """
+    cache.delete_many(keys)
+    if not transaction.get_connection().in_atomic_block:
+        return  # autocommit: the write is already visible to every worker
+
+    def _drop():
+        _drop.done = True
+        cache.delete_many(keys)
+
+    _drop.cache_keys, _drop.done = frozenset(keys), False
+    transaction.on_commit(_drop)
+
+
+def is_invalidated(key: str) -> bool:
+    """
+    True while the open transaction has invalidated `key` and not committed yet.
+    Read from the connection's pending on-commit callbacks, so a rolled-back savepoint takes
+    its invalidations with it.
+    """
+    pending = transaction.get_connection().run_on_commit
+    return any(key in getattr(func, "cache_keys", ()) and not func.done for _, func, *_ in pending)
+
+
+def cache_set(key: str, value, timeout) -> None:
+    """
+    `cache.set`, skipped while `is_invalidated(key)`: a value built from uncommitted rows must
+    not reach other workers (a rollback would leave it cached).
+    """
+    if not is_invalidated(key):
+        cache.set(key, value, timeout)
@@ -0,0 +1,77 @@
+import statistics
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from django.core.cache import cache
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from rest_framework.test import APIRequestFactory, force_authenticate
+
+from api.views.other_views import DashboardView
+from main.models import School, User, ADMIN
+from main.reports.dashboard import STATS_CACHE_KEY, get_version
+from main.tenancy.threadlocals import set_current_school
+
+
+def percentile(samples, pct):
+    ordered = sorted(samples)
+    index = max(int(round(pct / 100 * len(ordered))) - 1, 0)
+    return ordered[index]
+
+
+class Command(BaseCommand):
+    help = "Measure admin DashboardView latency (p50/p95) under N concurrent admins"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--school", type=int, required=True,
+                            help="School id whose dashboard is loaded")
+        parser.add_argument("--admins", type=int, default=100,
+                            help="Concurrent admins (threads)")
+        parser.add_argument("--requests", type=int, default=5,
+                            help="Dashboard loads per admin")
+
+    def handle(self, *args, **options):
+        school = School.objects.filter(pk=options["school"]).first()
+        if school is None:
+            raise CommandError(f"School {options['school']} does not exist")
+        user = User.objects.filter(school=school, role=ADMIN).first() or school.owner
+        if user is None:
+            raise CommandError("School has no admin or owner user to load the dashboard as")
+
+        view = DashboardView.as_view()
+        factory = APIRequestFactory()
+
+        def load_dashboards(_):
+            set_current_school(school.pk)
+            timings = []
+            try:
+                for _ in range(options["requests"]):
+                    request = factory.get("/api/dashboard/")
+                    force_authenticate(request, user=user)
+                    started = time.perf_counter()
+                    response = view(request)
+                    timings.append((time.perf_counter() - started) * 1000)
+                    if response.status_code != 200:
+                        raise CommandError(f"Dashboard returned {response.status_code}: {response.data}")
+            finally:
+                connection.close()
+            return timings
+
+        def run(label, cold):
+            if cold:
+                cache.delete(STATS_CACHE_KEY.format(school_id=school.pk, version=get_version(school.pk)))
+            started = time.perf_counter()
+            with ThreadPoolExecutor(max_workers=options["admins"]) as pool:
+                timings = [t for batch in pool.map(load_dashboards, range(options["admins"])) for t in batch]
+            elapsed = time.perf_counter() - started
+            self.stdout.write(
+                f"{label}: {len(timings)} loads in {elapsed:.2f}s "
+                f"({len(timings) / elapsed:.0f}/s)  p50={statistics.median(timings):.1f}ms  "
+                f"p95={percentile(timings, 95):.1f}ms  max={max(timings):.1f}ms"
+            )
+
+        self.stdout.write(
+            f"Dashboard benchmark: school={school.pk} admins={options['admins']} "
+            f"requests/admin={options['requests']}")
+        run("cold cache", cold=True)
+        run("warm cache", cold=False)
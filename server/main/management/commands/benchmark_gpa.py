@@ -0,0 +1,67 @@
+import random
+import time
+from collections import defaultdict
+
+from django.core.management.base import BaseCommand, CommandError
+
+from main.academics.grading import DEFAULT_SCALE
+from main.result.gpa import gpa_arrays, grade_arrays, grade_for, point_for
+
+
+class Command(BaseCommand):
+    help = "Time re-grading + CGPA for N course registrations: per-row Python ladder vs NumPy"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--registrations", type=int, default=50000)
+        parser.add_argument("--students", type=int, default=5000)
+        parser.add_argument("--repeats", type=int, default=3)
+
+    def handle(self, *args, **options):
+        try:
+            import numpy  # noqa: F401
+        except ImportError as e:
+            raise CommandError("This benchmark requires numpy") from e
+
+        rng = random.Random(0)
+        count = options["registrations"]
+        student_ids = [rng.randrange(options["students"]) for _ in range(count)]
+        totals = [round(rng.uniform(20, 100), 2) for _ in range(count)]
+        credits = [rng.choice((1, 2, 3, 4)) for _ in range(count)]
+
+        def per_row():
+            quality, credit_sum = defaultdict(float), defaultdict(float)
+            for student_id, total, credit in zip(student_ids, totals, credits):
+                quality[student_id] += credit * point_for(grade_for(total))
+                credit_sum[student_id] += credit
+            return {s: round(quality[s] / credit_sum[s], 2) for s in quality}
+
+        def vectorized():
+            _, _, quality = grade_arrays(totals, credits)
+            uniques, gpa = gpa_arrays(student_ids, credits, quality)
+            return dict(zip(uniques.tolist(), gpa.tolist()))
+
+        timings = {}
+        for label, fn in (("python", per_row), ("numpy", vectorized)):
+            best = None
+            for _ in range(options["repeats"]):
+                started = time.perf_counter()
+                result = fn()
+                elapsed = (time.perf_counter() - started) * 1000
+                best = elapsed if best is None else min(best, elapsed)
+            timings[label] = (best, result)
+
+        python_ms, expected = timings["python"]
+        numpy_ms, actual = timings["numpy"]
+        # summation order differs, so a value sitting on a rounding edge may differ by 0.01
+        if expected.keys() != actual.keys() or any(
+                abs(expected[s] - actual[s]) > 0.0101 for s in expected):
+            raise CommandError("NumPy CGPA does not match the per-row computation")
+
+        index, _, _ = grade_arrays(totals, credits)
+        if [DEFAULT_SCALE.grades[i] for i in index] != [grade_for(total) for total in totals]:
+            raise CommandError("NumPy grades do not match the per-row ladder")
+
+        self.stdout.write(
+            f"{count} registrations / {len(expected)} students: python={python_ms:.1f}ms "
+            f"numpy={numpy_ms:.1f}ms ({python_ms / numpy_ms:.1f}x)"
+        )
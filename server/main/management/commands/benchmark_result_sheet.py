@@ -0,0 +1,46 @@
+import random
+import statistics
+import tempfile
+import time
+from decimal import Decimal
+
+from django.core.management.base import BaseCommand
+from django.test import override_settings
+
+from main.result.rendering import render_and_cache, render_result_sheet
+
+
+class Command(BaseCommand):
+    help = "Time result-sheet PDF rendering for an N-student course (cold render vs stored sheet)"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--students", type=int, default=200)
+        parser.add_argument("--repeats", type=int, default=5)
+
+    def handle(self, *args, **options):
+        rng = random.Random(0)
+        rows = []
+        for i in range(options["students"]):
+            total = Decimal(rng.randint(20, 100))
+            passed = total >= 45
+            rows.append((f"STU{i:05d}", f"Student {i}", total, "B" if passed else "F",
+                         Decimal("3.00") if passed else Decimal("0.00"), "PASS" if passed else "FAIL"))
+        meta = {"semester": "First", "session": "2024/2025", "lecturer": "Benchmark Lecturer", "level": "Bachloar"}
+
+        renders = []
+        for _ in range(options["repeats"]):
+            started = time.perf_counter()
+            pdf = render_result_sheet(meta, rows)
+            renders.append((time.perf_counter() - started) * 1000)
+
+        # stored sheets go to a throwaway MEDIA_ROOT, not the real one
+        with tempfile.TemporaryDirectory() as media, override_settings(MEDIA_ROOT=media):
+            render_and_cache(0, meta, rows)  # store the sheet
+            started = time.perf_counter()
+            render_and_cache(0, meta, rows)
+            hit = (time.perf_counter() - started) * 1000
+
+        self.stdout.write(
+            f"{options['students']} students: render median={statistics.median(renders):.1f}ms "
+            f"max={max(renders):.1f}ms size={len(pdf) / 1024:.0f}KiB; stored hit={hit:.2f}ms"
+        )
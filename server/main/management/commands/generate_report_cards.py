@@ -0,0 +1,63 @@
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from main.models import ClassList, ClassLevel, School, Term
+from main.reports.report_cards import generate_report_cards
+
+
+class Command(BaseCommand):
+    help = ("Render term report cards for a class, level or whole school across a process pool "
+            "into a zip (one PDF per student) or a merged PDF; re-run to resume after a crash")
+
+    def add_arguments(self, parser):
+        scope = parser.add_mutually_exclusive_group(required=True)
+        scope.add_argument("--class", dest="class_id", type=int, help="ClassList id")
+        scope.add_argument("--level", dest="level_id", type=int, help="ClassLevel id")
+        scope.add_argument("--school", dest="school_id", type=int, help="School id (every class)")
+        parser.add_argument("--term", type=int,
+                            help="Term id (defaults to the school's current term)")
+        parser.add_argument("--output", required=True,
+                            help="Destination .zip or .pdf file")
+        parser.add_argument("--workers", type=int, default=None,
+                            help="Worker processes (defaults to the CPU count)")
+
+    def handle(self, *args, **options):
+        school_id = options["school_id"]
+        if options["class_id"] is not None:
+            school_id = ClassList.default_objects.filter(
+                pk=options["class_id"]).values_list("school_id", flat=True).first()
+        elif options["level_id"] is not None:
+            school_id = ClassLevel.default_objects.filter(
+                pk=options["level_id"]).values_list("school_id", flat=True).first()
+        if school_id is None or not School.objects.filter(pk=school_id).exists():
+            raise CommandError("Class, level or school not found")
+
+        terms = Term.default_objects.filter(school_id=school_id).select_related(
+            "school", "academic_session")
+        term = (terms.filter(pk=options["term"]) if options["term"]
+                else terms.filter(is_current=True)).first()
+        if term is None:
+            raise CommandError("Term not found (pass --term if the school has no current term)")
+
+        started = time.perf_counter()
+
+        def progress(done, total, student_id):
+            if student_id is None:
+                self.stdout.write(f"Resuming: {done}/{total} already rendered")
+            elif done == total or done % 25 == 0:
+                self.stdout.write(f"{done}/{total} report cards rendered")
+
+        try:
+            summary = generate_report_cards(
+                term, options["output"],
+                class_id=options["class_id"], level_id=options["level_id"],
+                workers=options["workers"], progress=progress,
+            )
+        except (RuntimeError, ValueError) as e:
+            raise CommandError(str(e)) from e
+
+        self.stdout.write(self.style.SUCCESS(
+            f"Wrote {summary['total']} report card(s) to {summary['output']} "
+            f"({summary['rendered']} rendered, {summary['resumed']} resumed) "
+            f"in {time.perf_counter() - started:.1f}s"))
@@ -0,0 +1,193 @@
+import random
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import OperationalError, connection
+
+from main.assessments.ingestion import save_answers
+from main.assessments.papers import publish
+from main.reports.dashboard import bump_version
+from main.models import (
+    AcademicSession, Quiz, QuizAttempt, QuizOption, QuizQuestion, School, Student, Subject, User,
+)
+
+
+def percentile(samples, pct):
+    ordered = sorted(samples)
+    index = max(int(round(pct / 100 * len(ordered))) - 1, 0)
+    return ordered[index]
+
+
+class Command(BaseCommand):
+    help = ("Replay a timed exam's autosave traffic (N students × Q questions over M minutes) through "
+            "the answer ingestion path from concurrent workers, each on its own connection; reports "
+            "p50/p99 latency, lock retries and DB write rate. The throwaway exam is deleted afterwards")
+
+    def add_arguments(self, parser):
+        parser.add_argument("--school", type=int, required=True,
+                            help="School id to create the throwaway exam in")
+        parser.add_argument("--students", type=int, default=500)
+        parser.add_argument("--questions", type=int, default=50)
+        parser.add_argument("--minutes", type=int, default=30, help="Exam length (simulated)")
+        parser.add_argument("--autosave", type=int, default=10,
+                            help="Client autosave interval in seconds (sends the whole sheet when dirty)")
+        parser.add_argument("--change-rate", type=float, default=0.15,
+                            help="Probability a student later changes an answer")
+        parser.add_argument("--workers", type=int, default=16,
+                            help="Concurrent clients; each replays its students' autosaves in order")
+        parser.add_argument("--seed", type=int, default=0)
+
+    def handle(self, *args, **options):
+        school = School.objects.filter(pk=options["school"]).first()
+        if school is None:
+            raise CommandError(f"School {options['school']} does not exist")
+        session = AcademicSession.default_objects.filter(school=school).order_by("-is_current", "-pk").first()
+        if session is None:
+            raise CommandError("School has no academic session")
+
+        if connection.vendor == "sqlite" and connection.is_in_memory_db():
+            raise CommandError("Run against a file database: workers need their own connections to one database")
+        if options["workers"] < 1:
+            raise CommandError("--workers must be at least 1")
+
+        # committed, so every worker connection sees it; removed in `_teardown`
+        quiz, attempts, options_of = self._setup(school, session, options)
+        try:
+            ticks = self._schedule(attempts, options_of, options)
+            self.stdout.write(f"Replaying {len(ticks)} autosaves from {len(attempts)} students "
+                              f"on {options['workers']} workers…")
+            started = time.perf_counter()
+            results = self._replay(ticks, options["workers"])
+            elapsed = time.perf_counter() - started
+        finally:
+            self._teardown(school, quiz, attempts)
+
+        timings = [ms for worker in results for ms in worker["timings"]]
+        written = sum(worker["written"] for worker in results)
+        statements = sum(worker["statements"] for worker in results)
+        sent = sum(worker["sent"] for worker in results)
+        retries = sum(worker["retries"] for worker in results)
+        seconds = options["minutes"] * 60
+        self.stdout.write(
+            f"autosaves={len(timings)} in {elapsed:.1f}s ({len(timings) / elapsed:.0f}/s) "
+            f"p50={percentile(timings, 50):.2f}ms p99={percentile(timings, 99):.2f}ms "
+            f"max={max(timings):.2f}ms lock retries={retries}"
+        )
+        self.stdout.write(
+            f"answers sent={sent} rows written={written} ({100 * (1 - written / sent):.0f}% skipped as unchanged); "
+            f"over a {options['minutes']}-minute exam: {written / seconds:.1f} rows/s, "
+            f"{statements / seconds:.1f} write statements/s"
+        )
+
+    def _replay(self, ticks, workers):
+        """
+        Run `ticks` from `workers` threads. Each student belongs to one worker, so a student's
+        autosaves keep their order; latency includes any retries after a locked database.
+        """
+        queues = [[] for _ in range(workers)]
+        for _, attempt_id, sheet in ticks:
+            queues[attempt_id % workers].append((attempt_id, sheet))
+        barrier = threading.Barrier(workers)
+
+        def run(queue):
+            stats = {"timings": [], "written": 0, "statements": 0, "sent": 0, "retries": 0}
+            barrier.wait()
+            try:
+                for attempt_id, sheet in queue:
+                    started, backoff = time.perf_counter(), 0.001
+                    while True:
+                        try:
+                            summary = save_answers(attempt_id, sheet)
+                            break
+                        except OperationalError:
+                            # SQLite serializes writers; back off and resend, as a client would
+                            stats["retries"] += 1
+                            time.sleep(random.uniform(0, backoff))
+                            backoff = min(backoff * 2, 0.1)
+                    stats["timings"].append((time.perf_counter() - started) * 1000)
+                    stats["written"] += summary["written"]
+                    stats["statements"] += bool(summary["written"])
+                    stats["sent"] += len(sheet)
+            finally:
+                connection.close()
+            return stats
+
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            return list(pool.map(run, queues))
+
+    def _teardown(self, school, quiz, attempt_ids):
+        """Delete the throwaway exam and its students."""
+        user_ids = list(Student.default_objects.filter(
+            quiz_attempts__pk__in=attempt_ids).values_list("user_id", flat=True))
+        quiz.hard_delete()  # cascades to attempts and answers
+        User.objects.filter(pk__in=user_ids).delete()
+        bump_version(school.pk)
+
+    def _setup(self, school, session, options):
+        """Throwaway quiz (4 options per question) + students with in-progress attempts."""
+        subject = Subject.default_objects.get_or_create(school=school, name="Load test")[0]
+        quiz = Quiz.default_objects.create(school=school, academic_session=session, subject=subject,
+                                           title=f"Load test {uuid.uuid4().hex[:8]}")
+        questions = QuizQuestion.default_objects.bulk_create([
+            QuizQuestion(school=school, quiz=quiz, text=f"Q{n}", order=n) for n in range(options["questions"])
+        ])
+        created = QuizOption.default_objects.bulk_create([
+            QuizOption(school=school, question=q, text=f"O{k}", order=k, is_correct=k == 0)
+            for q in questions for k in range(4)
+        ])
+        options_of = {}
+        for option in created:
+            options_of.setdefault(option.question_id, []).append(option.pk)
+        paper = publish(quiz)
+
+        token = uuid.uuid4().hex[:8]
+        users = User.objects.bulk_create([
+            User(username=f"lt-{token}-{i}@example.com", email=f"lt-{token}-{i}@example.com",
+                 role="student", school=school)
+            for i in range(options["students"])
+        ])
+        students = Student.default_objects.bulk_create([
+            Student(school=school, user=user, date_of_birth=date(2010, 1, 1)) for user in users
+        ])
+        bump_version(school.pk)  # bulk_create sends no signals; keep the dashboard counts honest
+        attempts = QuizAttempt.default_objects.bulk_create([
+            QuizAttempt(school=school, quiz=quiz, student=student, paper_version=paper.version)
+            for student in students
+        ])
+        return quiz, [a.pk for a in attempts], options_of
+
+    def _schedule(self, attempt_ids, options_of, options):
+        """Every dirty autosave tick of every student, in simulated time order."""
+        rng = random.Random(options["seed"])
+        seconds = options["minutes"] * 60
+        interval = options["autosave"]
+        ticks = []
+        for attempt_id in attempt_ids:
+            events = []
+            for question_id, choices in options_of.items():
+                at = rng.uniform(0, seconds)
+                events.append((at, question_id, rng.choice(choices)))
+                if rng.random() < options["change_rate"]:
+                    events.append((rng.uniform(at, seconds), question_id, rng.choice(choices)))
+            events.sort()
+            sheet, dirty, index = {}, False, 0
+            phase = rng.uniform(0, interval)
+            tick = phase
+            while tick <= seconds + interval:
+                while index < len(events) and events[index][0] <= tick:
+                    _, question_id, option_id = events[index]
+                    sheet[question_id] = option_id
+                    dirty, index = True, index + 1
+                if dirty:
+                    ticks.append((tick, attempt_id, [
+                        {"question": question_id, "options": [option_id]}
+                        for question_id, option_id in sheet.items()
+                    ]))
+                    dirty = False
+                tick += interval
+        ticks.sort(key=lambda t: t[0])
+        return ticks
@@ -0,0 +1,16 @@
+from django.core.management.base import BaseCommand
+
+from main.assessments.audience import rebuild
+
+
+class Command(BaseCommand):
+    help = "Recompute the materialized QuizAudience rows from quiz assignments and active enrollments"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--school", type=int,
+                            help="Only rebuild quizzes of this school id")
+
+    def handle(self, *args, **options):
+        granted, revoked = rebuild(school_id=options["school"])
+        self.stdout.write(self.style.SUCCESS(
+            f"Quiz audience rebuilt: {granted} row(s) granted, {revoked} revoked"))
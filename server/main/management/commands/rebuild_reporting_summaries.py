@@ -0,0 +1,16 @@
+from django.core.management.base import BaseCommand
+
+from main.reports.summaries import rebuild
+
+
+class Command(BaseCommand):
+    help = "Recompute DepartmentSummary reporting rows from StudentEnrollment"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--school", type=int,
+                            help="Only rebuild summaries of this school id")
+
+    def handle(self, *args, **options):
+        written = rebuild(school_id=options["school"])
+        self.stdout.write(self.style.SUCCESS(
+            f"Rebuilt {written} department summary row(s)"))
@@ -0,0 +1,20 @@
+from django.core.management.base import BaseCommand
+
+from main.assessments.search import fts_available, rebuild
+
+
+class Command(BaseCommand):
+    help = "Rebuild the FTS5 search index over quizzes, quiz questions and the question bank"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--school", type=int,
+                            help="Only re-index this school id")
+
+    def handle(self, *args, **options):
+        if not fts_available():
+            self.stdout.write(self.style.WARNING(
+                "Search index unavailable on this database; QuizQuerySet.search uses icontains"))
+            return
+        quizzes, questions, bank_items = rebuild(school_id=options["school"])
+        self.stdout.write(self.style.SUCCESS(
+            f"Search index rebuilt: {quizzes} quiz(zes), {questions} question(s), {bank_items} bank item(s)"))
@@ -0,0 +1,44 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.db.models import Count, Q
+
+from main.models import ClassList
+
+
+class Command(BaseCommand):
+    help = "Recompute ClassList.active_count from StudentEnrollment rows and report drift"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--school", type=int,
+                            help="Only reconcile classes of this school id")
+        parser.add_argument("--dry-run", action="store_true",
+                            help="Report drift without writing corrected counts")
+
+    def handle(self, *args, **options):
+        qs = ClassList.default_objects.all()
+        if options["school"]:
+            qs = qs.filter(school_id=options["school"])
+
+        with transaction.atomic():
+            rows = qs.select_for_update().annotate(
+                actual=Count("enrollments", filter=Q(enrollments__is_active=True))
+            ).values_list("id", "active_count", "actual")
+            drifted = [(pk, stored, actual)
+                       for pk, stored, actual in rows if stored != actual]
+
+            for pk, stored, actual in drifted:
+                self.stdout.write(
+                    f"ClassList {pk}: stored={stored} actual={actual} drift={stored - actual:+d}")
+                if not options["dry_run"]:
+                    ClassList.default_objects.filter(
+                        pk=pk).update(active_count=actual)
+
+        if not drifted:
+            self.stdout.write(self.style.SUCCESS(
+                "All enrollment counts are in sync"))
+        elif options["dry_run"]:
+            self.stdout.write(self.style.WARNING(
+                f"{len(drifted)} class(es) drifted; re-run without --dry-run to fix"))
+        else:
+            self.stdout.write(self.style.SUCCESS(
+                f"Fixed {len(drifted)} drifted class(es)"))
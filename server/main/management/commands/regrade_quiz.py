@@ -0,0 +1,34 @@
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from main.assessments.marking import GRADED_STATUSES, grade_quiz
+from main.models import Quiz
+
+
+class Command(BaseCommand):
+    help = ("Re-mark every submitted/graded attempt of a quiz against its current answer key "
+            "(e.g. after correcting a key); answers are marked in memory and bulk-updated")
+
+    def add_arguments(self, parser):
+        parser.add_argument("quiz_id", type=int)
+        parser.add_argument("--batch-size", type=int, default=500,
+                            help="Attempts per transaction (default 500)")
+        parser.add_argument("--include-in-progress", action="store_true",
+                            help="Also re-mark attempts that have not been submitted")
+
+    def handle(self, *args, **options):
+        quiz = Quiz.default_objects.filter(pk=options["quiz_id"]).first()
+        if quiz is None:
+            raise CommandError("Quiz not found")
+        statuses = GRADED_STATUSES + (("in_progress",) if options["include_in_progress"] else ())
+
+        def progress(done, total):
+            self.stdout.write(f"{done}/{total} attempts graded")
+
+        started = time.perf_counter()
+        summary = grade_quiz(quiz, statuses=statuses, batch_size=options["batch_size"], progress=progress)
+        self.stdout.write(self.style.SUCCESS(
+            f"Graded {summary['attempts']} attempts ({summary['answers']} answers, "
+            f"{summary['changed']} changed) in {time.perf_counter() - started:.2f}s"
+        ))
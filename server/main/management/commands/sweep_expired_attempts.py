@@ -0,0 +1,29 @@
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from main.assessments.timer import SWEEP_BATCH, sweep
+
+
+class Command(BaseCommand):
+    help = ("Auto-submit and grade every quiz attempt past its deadline (duration or quiz end time); "
+            "run it every minute from cron, or keep it running with --interval")
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=SWEEP_BATCH,
+                            help=f"Attempts read per batch (default {SWEEP_BATCH})")
+        parser.add_argument("--interval", type=int, default=0,
+                            help="Keep sweeping every N seconds instead of exiting after one pass")
+
+    def handle(self, *args, **options):
+        if options["batch_size"] < 1:
+            raise CommandError("--batch-size must be at least 1")
+        while True:
+            started = time.perf_counter()
+            closed = sweep(batch_size=options["batch_size"])
+            if closed or not options["interval"]:
+                self.stdout.write(self.style.SUCCESS(
+                    f"Closed {closed} expired attempt(s) in {time.perf_counter() - started:.2f}s"))
+            if not options["interval"]:
+                return
+            time.sleep(options["interval"])
@@ -0,0 +1,29 @@
+# Generated by Django 5.0.7 on 2026-10-18 23:11
+
+from django.db import migrations, models
+from django.db.models import Count, Q
+
+
+def backfill_active_count(apps, schema_editor):
+    ClassList = apps.get_model('main', 'ClassList')
+    rows = ClassList._base_manager.annotate(
+        actual=Count('enrollments', filter=Q(enrollments__is_active=True))
+    ).filter(actual__gt=0).values_list('id', 'actual')
+    for pk, actual in rows:
+        ClassList._base_manager.filter(pk=pk).update(active_count=actual)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('main', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='classlist',
+            name='active_count',
+            field=models.PositiveIntegerField(default=0, editable=False, help_text='Denormalized number of active enrollments; kept in sync by StudentEnrollment'),
+        ),
+        migrations.RunPython(backfill_active_count, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,22 @@
+# Generated by Django 5.0.7 on 2026-10-18 23:13
+
+import django.db.models.manager
+import main.models
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('main', '0002_classlist_active_count'),
+    ]
+
+    operations = [
+        migrations.AlterModelManagers(
+            name='student',
+            managers=[
+                ('default_objects', django.db.models.manager.Manager()),
+                ('objects', main.models.StudentManager()),
+            ],
+        ),
+    ]
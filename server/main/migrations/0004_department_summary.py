@@ -0,0 +1,62 @@
+# Generated by Django 5.0.7 on 2026-10-18 23:34
+
+import django.db.models.deletion
+import django.db.models.manager
+import main.tenancy.managers
+from django.db import migrations, models
+from django.db.models import Count, Q
+
+
+def backfill_department_summaries(apps, schema_editor):
+    StudentEnrollment = apps.get_model('main', 'StudentEnrollment')
+    DepartmentSummary = apps.get_model('main', 'DepartmentSummary')
+    rows = StudentEnrollment._base_manager.order_by().values(
+        'school_id', 'academic_session_id', 'class_list__class_level__department'
+    ).annotate(
+        active=Count('pk', filter=Q(is_active=True)),
+        promoted=Count('pk', filter=Q(promoted=True)),
+    )
+    DepartmentSummary._base_manager.bulk_create([
+        DepartmentSummary(
+            school_id=row['school_id'],
+            academic_session_id=row['academic_session_id'],
+            department=row['class_list__class_level__department'],
+            active_students=row['active'],
+            promoted=row['promoted'],
+        )
+        for row in rows
+    ])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('main', '0003_student_managers'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='DepartmentSummary',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('department', models.CharField(choices=[('GENERAL', 'General'), ('ART', 'Art Class'), ('SCIENCE', 'Science Class'), ('COMMERCIAL', 'Commercial Class'), ('SCIENCE_TECH', 'Science & Technology Class'), ('TECHNICAL', 'Technical Class')], max_length=20)),
+                ('active_students', models.PositiveIntegerField(default=0)),
+                ('promoted', models.PositiveIntegerField(default=0)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('academic_session', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='department_summaries', to='main.academicsession')),
+                ('school', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='department_summaries', to='main.school')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['school', 'academic_session'], name='main_depart_school__d59bd1_idx')],
+            },
+            managers=[
+                ('default_objects', django.db.models.manager.Manager()),
+                ('objects', main.tenancy.managers.TenantManager()),
+            ],
+        ),
+        migrations.AddConstraint(
+            model_name='departmentsummary',
+            constraint=models.UniqueConstraint(fields=('academic_session', 'department'), name='uniq_department_summary_per_session'),
+        ),
+        migrations.RunPython(backfill_department_summaries, migrations.RunPython.noop),
+    ]
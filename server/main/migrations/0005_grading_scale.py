@@ -0,0 +1,46 @@
+# Generated by Django 5.0.7 on 2026-10-18 23:50
+
+import django.db.models.deletion
+import django.db.models.manager
+import main.tenancy.managers
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('main', '0004_department_summary'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='GradingScale',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('created_at', models.DateTimeField(auto_now_add=True, db_index=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('is_active', models.BooleanField(db_index=True, default=True)),
+                ('deleted_at', models.DateTimeField(blank=True, null=True)),
+                ('name', models.CharField(max_length=50)),
+                ('bands', models.JSONField(default=list)),
+                ('class_level', models.ForeignKey(blank=True, help_text='Leave empty for the school-wide default scale', null=True, on_delete=django.db.models.deletion.CASCADE, related_name='grading_scales', to='main.classlevel')),
+                ('created_by', models.ForeignKey(blank=True, help_text='User who created this record', null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='created_%(class)ss', to=settings.AUTH_USER_MODEL)),
+                ('deleted_by', models.ForeignKey(blank=True, help_text='User who deleted this record', null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='deleted_%(class)ss', to=settings.AUTH_USER_MODEL)),
+                ('school', models.ForeignKey(help_text='The school this item belongs to', on_delete=django.db.models.deletion.CASCADE, related_name='school_%(class)ss', to='main.school')),
+                ('updated_by', models.ForeignKey(blank=True, help_text='User who last updated this record', null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='updated_%(class)ss', to=settings.AUTH_USER_MODEL)),
+            ],
+            managers=[
+                ('default_objects', django.db.models.manager.Manager()),
+                ('objects', main.tenancy.managers.TenantManager()),
+            ],
+        ),
+        migrations.AddConstraint(
+            model_name='gradingscale',
+            constraint=models.UniqueConstraint(fields=('school', 'class_level'), name='uniq_grading_scale_per_level'),
+        ),
+        migrations.AddConstraint(
+            model_name='gradingscale',
+            constraint=models.UniqueConstraint(condition=models.Q(('class_level__isnull', True)), fields=('school',), name='uniq_default_grading_scale_per_school'),
+        ),
+    ]
@@ -0,0 +1,233 @@
+# Generated by Django 5.0.7 on 2026-10-19 00:01
+
+import django.core.validators
+import django.db.models.deletion
+import django.db.models.manager
+import main.models
+import main.tenancy.managers
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('main', '0005_grading_scale'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Quiz',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('created_at', models.DateTimeField(auto_now_add=True, db_index=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('is_active', models.BooleanField(db_index=True, default=True)),
+                ('deleted_at', models.DateTimeField(blank=True, null=True)),
+                ('title', models.CharField(max_length=200)),
+                ('slug', models.SlugField(blank=True, max_length=250)),
+                ('description', models.TextField(blank=True)),
+                ('instructions', models.TextField(blank=True)),
+                ('category', models.CharField(choices=[('assignment', 'Assignment'), ('exam', 'Exam'), ('practice', 'Practice Quiz'), ('homework', 'Homework'), ('test', 'Class Test')], default='practice', max_length=20)),
+                ('difficulty', models.CharField(choices=[('easy', 'Easy'), ('medium', 'Medium'), ('hard', 'Hard')], default='medium', max_length=10)),
+                ('total_marks', models.PositiveIntegerField(default=0)),
+                ('pass_mark_percentage', models.PositiveIntegerField(default=50, validators=[django.core.validators.MinValueValidator(0), django.core.validators.MaxValueValidator(100)])),
+                ('duration_minutes', models.PositiveIntegerField(blank=True, null=True)),
+                ('max_attempts', models.PositiveIntegerField(default=1, validators=[django.core.validators.MinValueValidator(1)])),
+                ('start_time', models.DateTimeField(blank=True, null=True)),
+                ('end_time', models.DateTimeField(blank=True, null=True)),
+                ('randomize_questions', models.BooleanField(default=False)),
+                ('randomize_options', models.BooleanField(default=False)),
+                ('show_results_immediately', models.BooleanField(default=True)),
+                ('show_correct_answers', models.BooleanField(default=True)),
+                ('allow_review', models.BooleanField(default=True)),
+                ('is_published', models.BooleanField(default=False)),
+                ('paper_version', models.PositiveIntegerField(default=0, help_text='Current compiled paper (0 = never published)')),
+                ('academic_session', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='quizzes', to='main.academicsession')),
+                ('assigned_students', models.ManyToManyField(blank=True, related_name='assigned_quizzes', to='main.student')),
+                ('class_lists', models.ManyToManyField(blank=True, related_name='quizzes', to='main.classlist')),
+                ('created_by', models.ForeignKey(blank=True, help_text='User who created this record', null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='created_%(class)ss', to=settings.AUTH_USER_MODEL)),
+                ('deleted_by', models.ForeignKey(blank=True, help_text='User who deleted this record', null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='deleted_%(class)ss', to=settings.AUTH_USER_MODEL)),
+                ('school', models.ForeignKey(help_text='The school this item belongs to', on_delete=django.db.models.deletion.CASCADE, related_name='school_%(class)ss', to='main.school')),
+                ('subject', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='quizzes', to='main.subject')),
+                ('term', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='quizzes', to='main.term')),
+                ('updated_by', models.ForeignKey(blank=True, help_text='User who last updated this record', null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='updated_%(class)ss', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'ordering': ['-created_at'],
+            },
+            managers=[
+                ('objects', main.models.QuizManager()),
+            ],
+        ),
+        migrations.CreateModel(
+            name='QuizAttempt',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('created_at', models.DateTimeField(auto_now_add=True, db_index=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('is_active', models.BooleanField(db_index=True, default=True)),
+                ('deleted_at', models.DateTimeField(blank=True, null=True)),
+                ('paper_version', models.PositiveIntegerField(blank=True, help_text='Paper the attempt was started on (pinned at creation)', null=True)),
+                ('started_at', models.DateTimeField(auto_now_add=True)),
+                ('submitted_at', models.DateTimeField(blank=True, null=True)),
+                ('score', models.DecimalField(decimal_places=2, default=0, max_digits=8)),
+                ('status', models.CharField(default='in_progress', max_length=12)),
+                ('meta', models.JSONField(blank=True, default=dict)),
+                ('created_by', models.ForeignKey(blank=True, help_text='User who created this record', null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='created_%(class)ss', to=settings.AUTH_USER_MODEL)),
+                ('deleted_by', models.ForeignKey(blank=True, help_text='User who deleted this record', null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='deleted_%(class)ss', to=settings.AUTH_USER_MODEL)),
+                ('quiz', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='attempts', to='main.quiz')),
+                ('school', models.ForeignKey(help_text='The school this item belongs to', on_delete=django.db.models.deletion.CASCADE, related_name='school_%(class)ss', to='main.school')),
+                ('student', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='quiz_attempts', to='main.student')),
+                ('updated_by', models.ForeignKey(blank=True, help_text='User who last updated this record', null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='updated_%(class)ss', to=settings.AUTH_USER_MODEL)),
+            ],
+            managers=[
+                ('default_objects', django.db.models.manager.Manager()),
+                ('objects', main.tenancy.managers.TenantManager()),
+            ],
+        ),
+        migrations.CreateModel(
+            name='QuizPaper',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('version', models.PositiveIntegerField()),
+                ('digest', models.CharField(help_text='sha256 of the payload', max_length=64)),
+                ('payload', models.JSONField()),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('quiz', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='papers', to='main.quiz')),
+                ('school', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='quiz_papers', to='main.school')),
+            ],
+            managers=[
+                ('default_objects', django.db.models.manager.Manager()),
+                ('objects', main.tenancy.managers.TenantManager()),
+            ],
+        ),
+        migrations.CreateModel(
+            name='QuizQuestion',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('created_at', models.DateTimeField(auto_now_add=True, db_index=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('is_active', models.BooleanField(db_index=True, default=True)),
+                ('deleted_at', models.DateTimeField(blank=True, null=True)),
+                ('kind', models.CharField(choices=[('single', 'Single Choice'), ('multiple', 'Multiple Choice'), ('true_false', 'True/False'), ('short_answer', 'Short Answer'), ('essay', 'Essay')], default='single', max_length=12)),
+                ('text', models.TextField()),
+                ('points', models.DecimalField(decimal_places=2, default=1, max_digits=6)),
+                ('order', models.PositiveIntegerField(default=0)),
+                ('explanation', models.TextField(blank=True)),
+                ('image', models.ImageField(blank=True, null=True, upload_to='quiz/questions/%Y/%m/%d/')),
+                ('is_required', models.BooleanField(default=True)),
+                ('meta', models.JSONField(blank=True, default=dict)),
+                ('created_by', models.ForeignKey(blank=True, help_text='User who created this record', null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='created_%(class)ss', to=settings.AUTH_USER_MODEL)),
+                ('deleted_by', models.ForeignKey(blank=True, help_text='User who deleted this record', null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='deleted_%(class)ss', to=settings.AUTH_USER_MODEL)),
+                ('quiz', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='questions', to='main.quiz')),
+                ('school', models.ForeignKey(help_text='The school this item belongs to', on_delete=django.db.models.deletion.CASCADE, related_name='school_%(class)ss', to='main.school')),
+                ('updated_by', models.ForeignKey(blank=True, help_text='User who last updated this record', null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='updated_%(class)ss', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'ordering': ['order', 'id'],
+            },
+            managers=[
+                ('default_objects', django.db.models.manager.Manager()),
+                ('objects', main.tenancy.managers.TenantManager()),
+            ],
+        ),
+        migrations.CreateModel(
+            name='QuizOption',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('created_at', models.DateTimeField(auto_now_add=True, db_index=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('is_active', models.BooleanField(db_index=True, default=True)),
+                ('deleted_at', models.DateTimeField(blank=True, null=True)),
+                ('text', models.CharField(max_length=500)),
+                ('is_correct', models.BooleanField(default=False)),
+                ('order', models.PositiveIntegerField(default=0)),
+                ('created_by', models.ForeignKey(blank=True, help_text='User who created this record', null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='created_%(class)ss', to=settings.AUTH_USER_MODEL)),
+                ('deleted_by', models.ForeignKey(blank=True, help_text='User who deleted this record', null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='deleted_%(class)ss', to=settings.AUTH_USER_MODEL)),
+                ('school', models.ForeignKey(help_text='The school this item belongs to', on_delete=django.db.models.deletion.CASCADE, related_name='school_%(class)ss', to='main.school')),
+                ('updated_by', models.ForeignKey(blank=True, help_text='User who last updated this record', null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='updated_%(class)ss', to=settings.AUTH_USER_MODEL)),
+                ('question', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='options', to='main.quizquestion')),
+            ],
+            managers=[
+                ('default_objects', django.db.models.manager.Manager()),
+                ('objects', main.tenancy.managers.TenantManager()),
+            ],
+        ),
+        migrations.CreateModel(
+            name='QuizAnswer',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('created_at', models.DateTimeField(auto_now_add=True, db_index=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('is_active', models.BooleanField(db_index=True, default=True)),
+                ('deleted_at', models.DateTimeField(blank=True, null=True)),
+                ('selected_option_ids', models.JSONField(blank=True, default=list)),
+                ('text_answer', models.TextField(blank=True, default='')),
+                ('is_correct', models.BooleanField(default=False)),
+                ('points_awarded', models.DecimalField(decimal_places=2, default=0, max_digits=6)),
+                ('created_by', models.ForeignKey(blank=True, help_text='User who created this record', null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='created_%(class)ss', to=settings.AUTH_USER_MODEL)),
+                ('deleted_by', models.ForeignKey(blank=True, help_text='User who deleted this record', null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='deleted_%(class)ss', to=settings.AUTH_USER_MODEL)),
+                ('school', models.ForeignKey(help_text='The school this item belongs to', on_delete=django.db.models.deletion.CASCADE, related_name='school_%(class)ss', to='main.school')),
+                ('updated_by', models.ForeignKey(blank=True, help_text='User who last updated this record', null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='updated_%(class)ss', to=settings.AUTH_USER_MODEL)),
+                ('attempt', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='answers', to='main.quizattempt')),
+                ('question', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='answers', to='main.quizquestion')),
+            ],
+            managers=[
+                ('default_objects', django.db.models.manager.Manager()),
+                ('objects', main.tenancy.managers.TenantManager()),
+            ],
+        ),
+        migrations.AddIndex(
+            model_name='quiz',
+            index=models.Index(fields=['school', 'subject', 'is_published'], name='main_quiz_school__fc09e1_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='quiz',
+            index=models.Index(fields=['school', 'category', 'is_published'], name='main_quiz_school__b4a538_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='quiz',
+            index=models.Index(fields=['start_time', 'end_time'], name='main_quiz_start_t_f6f32e_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='quiz',
+            index=models.Index(fields=['academic_session', 'term'], name='main_quiz_academi_17df1e_idx'),
+        ),
+        migrations.AddConstraint(
+            model_name='quiz',
+            constraint=models.UniqueConstraint(fields=('school', 'slug'), name='unique_quiz_slug_per_school'),
+        ),
+        migrations.AddIndex(
+            model_name='quizattempt',
+            index=models.Index(fields=['quiz', 'student'], name='main_quizat_quiz_id_3db583_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='quizattempt',
+            index=models.Index(fields=['status'], name='main_quizat_status_76e47f_idx'),
+        ),
+        migrations.AddConstraint(
+            model_name='quizattempt',
+            constraint=models.UniqueConstraint(condition=models.Q(('status', 'in_progress')), fields=('quiz', 'student'), name='uniq_active_attempt'),
+        ),
+        migrations.AddConstraint(
+            model_name='quizpaper',
+            constraint=models.UniqueConstraint(fields=('quiz', 'version'), name='uniq_quiz_paper_version'),
+        ),
+        migrations.AddIndex(
+            model_name='quizquestion',
+            index=models.Index(fields=['quiz', 'order'], name='main_quizqu_quiz_id_111a61_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='quizoption',
+            index=models.Index(fields=['question', 'order'], name='main_quizop_questio_118d7b_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='quizanswer',
+            index=models.Index(fields=['attempt', 'question'], name='main_quizan_attempt_7c151f_idx'),
+        ),
+        migrations.AddConstraint(
+            model_name='quizanswer',
+            constraint=models.UniqueConstraint(fields=('attempt', 'question'), name='uniq_answer_per_question_attempt'),
+        ),
+    ]
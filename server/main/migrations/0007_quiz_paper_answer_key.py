@@ -0,0 +1,18 @@
+# Generated by Django 5.0.7 on 2026-10-19 00:04
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('main', '0006_assessments'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='quizpaper',
+            name='answer_key',
+            field=models.JSONField(default=dict, help_text='{question_id: {kind, points, correct option ids}}; never served'),
+        ),
+    ]
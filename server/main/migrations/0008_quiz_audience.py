@@ -0,0 +1,50 @@
+# Generated by Django 5.0.7 on 2026-10-19 00:09
+
+import django.db.models.deletion
+import django.db.models.manager
+import main.models
+import main.tenancy.managers
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('main', '0007_quiz_paper_answer_key'),
+    ]
+
+    operations = [
+        migrations.AlterModelManagers(
+            name='quiz',
+            managers=[
+                ('default_objects', django.db.models.manager.Manager()),
+                ('objects', main.models.QuizManager()),
+            ],
+        ),
+        migrations.AddField(
+            model_name='quiz',
+            name='is_global',
+            field=models.BooleanField(default=True, editable=False, help_text='No class or student assignments: open to the whole school (kept in sync with the audience)'),
+        ),
+        migrations.CreateModel(
+            name='QuizAudience',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('is_active', models.BooleanField(default=True)),
+                ('quiz', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='audience', to='main.quiz')),
+                ('school', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='quiz_audience', to='main.school')),
+                ('student', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='quiz_audience', to='main.student')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['student', 'is_active', 'quiz'], name='main_quizau_student_616a3a_idx')],
+            },
+            managers=[
+                ('default_objects', django.db.models.manager.Manager()),
+                ('objects', main.tenancy.managers.TenantManager()),
+            ],
+        ),
+        migrations.AddConstraint(
+            model_name='quizaudience',
+            constraint=models.UniqueConstraint(fields=('quiz', 'student'), name='uniq_quiz_audience'),
+        ),
+    ]
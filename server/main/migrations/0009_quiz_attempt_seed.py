@@ -0,0 +1,19 @@
+# Generated by Django 5.0.7 on 2026-10-19 00:17
+
+import main.assessments.ordering
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('main', '0008_quiz_audience'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='quizattempt',
+            name='seed',
+            field=models.BigIntegerField(default=main.assessments.ordering.new_seed, help_text="Derives this attempt's question/option order (see main.assessments.ordering)"),
+        ),
+    ]
@@ -0,0 +1,50 @@
+# Generated by Django 5.0.7 on 2026-10-19 00:40
+
+from django.db import migrations
+
+# inlined rather than imported from main.assessments.search, so later edits there cannot rewrite this migration
+TABLES_SQL = (
+    "CREATE VIRTUAL TABLE IF NOT EXISTS main_quiz_search USING fts5("
+    "scope, title, body, tokenize='unicode61 remove_diacritics 2', prefix='2 3 4')",
+    "CREATE VIRTUAL TABLE IF NOT EXISTS main_quizquestion_search USING fts5("
+    "scope, quiz_id UNINDEXED, text, explanation, tokenize='unicode61 remove_diacritics 2', prefix='2 3 4')",
+)
+DROP_SQL = (
+    "DROP TABLE IF EXISTS main_quiz_search",
+    "DROP TABLE IF EXISTS main_quizquestion_search",
+)
+
+
+def create_search_index(apps, schema_editor):
+    # FTS5 is SQLite-only; other backends keep the icontains fallback in QuizQuerySet.search
+    if schema_editor.connection.vendor != 'sqlite':
+        return
+    for sql in TABLES_SQL:
+        schema_editor.execute(sql)
+    schema_editor.execute(
+        "INSERT INTO main_quiz_search (rowid, scope, title, body) "
+        "SELECT q.id, 's' || q.school_id, q.title, q.description || ' ' || s.name "
+        "FROM main_quiz q JOIN main_subject s ON s.id = q.subject_id WHERE q.is_active"
+    )
+    schema_editor.execute(
+        "INSERT INTO main_quizquestion_search (rowid, scope, quiz_id, text, explanation) "
+        "SELECT id, 's' || school_id, quiz_id, text, explanation FROM main_quizquestion WHERE is_active"
+    )
+
+
+def drop_search_index(apps, schema_editor):
+    if schema_editor.connection.vendor != 'sqlite':
+        return
+    for sql in DROP_SQL:
+        schema_editor.execute(sql)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('main', '0009_quiz_attempt_seed'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_search_index, drop_search_index),
+    ]
@@ -0,0 +1,122 @@
+# Generated by Django 5.0.7 on 2026-10-19 00:50
+
+import django.db.models.deletion
+import django.db.models.manager
+import main.tenancy.managers
+from django.conf import settings
+from django.db import migrations, models
+
+# inlined rather than imported from main.assessments.search, so later edits there cannot rewrite this migration
+BANK_TABLE_SQL = (
+    "CREATE VIRTUAL TABLE IF NOT EXISTS main_questionbankitem_search USING fts5("
+    "scope, subject_id UNINDEXED, text, explanation, tokenize='unicode61 remove_diacritics 2', prefix='2 3 4')"
+)
+
+
+def create_bank_search_index(apps, schema_editor):
+    if schema_editor.connection.vendor != 'sqlite':
+        return
+    schema_editor.execute(BANK_TABLE_SQL)
+
+
+def drop_bank_search_index(apps, schema_editor):
+    if schema_editor.connection.vendor != 'sqlite':
+        return
+    schema_editor.execute("DROP TABLE IF EXISTS main_questionbankitem_search")
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('main', '0010_assessment_search'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='quizquestion',
+            name='text',
+            field=models.TextField(blank=True),
+        ),
+        migrations.CreateModel(
+            name='QuestionBankItem',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('created_at', models.DateTimeField(auto_now_add=True, db_index=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('is_active', models.BooleanField(db_index=True, default=True)),
+                ('deleted_at', models.DateTimeField(blank=True, null=True)),
+                ('kind', models.CharField(choices=[('single', 'Single Choice'), ('multiple', 'Multiple Choice'), ('true_false', 'True/False'), ('short_answer', 'Short Answer'), ('essay', 'Essay')], default='single', max_length=12)),
+                ('text', models.TextField()),
+                ('points', models.DecimalField(decimal_places=2, default=1, help_text='Default points when placed in a quiz', max_digits=6)),
+                ('difficulty', models.PositiveSmallIntegerField(choices=[(1, 'Easy'), (2, 'Medium'), (3, 'Hard')], default=2)),
+                ('explanation', models.TextField(blank=True)),
+                ('image', models.ImageField(blank=True, null=True, upload_to='quiz/bank/%Y/%m/%d/')),
+                ('created_by', models.ForeignKey(blank=True, help_text='User who created this record', null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='created_%(class)ss', to=settings.AUTH_USER_MODEL)),
+                ('deleted_by', models.ForeignKey(blank=True, help_text='User who deleted this record', null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='deleted_%(class)ss', to=settings.AUTH_USER_MODEL)),
+                ('school', models.ForeignKey(help_text='The school this item belongs to', on_delete=django.db.models.deletion.CASCADE, related_name='school_%(class)ss', to='main.school')),
+                ('subject', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='bank_items', to='main.subject')),
+                ('updated_by', models.ForeignKey(blank=True, help_text='User who last updated this record', null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='updated_%(class)ss', to=settings.AUTH_USER_MODEL)),
+            ],
+            managers=[
+                ('default_objects', django.db.models.manager.Manager()),
+                ('objects', main.tenancy.managers.TenantManager()),
+            ],
+        ),
+        migrations.AddField(
+            model_name='quizquestion',
+            name='bank_item',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.PROTECT, related_name='placements', to='main.questionbankitem'),
+        ),
+        migrations.CreateModel(
+            name='QuestionBankOption',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('created_at', models.DateTimeField(auto_now_add=True, db_index=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('is_active', models.BooleanField(db_index=True, default=True)),
+                ('deleted_at', models.DateTimeField(blank=True, null=True)),
+                ('text', models.CharField(max_length=500)),
+                ('is_correct', models.BooleanField(default=False)),
+                ('order', models.PositiveIntegerField(default=0)),
+                ('created_by', models.ForeignKey(blank=True, help_text='User who created this record', null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='created_%(class)ss', to=settings.AUTH_USER_MODEL)),
+                ('deleted_by', models.ForeignKey(blank=True, help_text='User who deleted this record', null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='deleted_%(class)ss', to=settings.AUTH_USER_MODEL)),
+                ('item', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='options', to='main.questionbankitem')),
+                ('school', models.ForeignKey(help_text='The school this item belongs to', on_delete=django.db.models.deletion.CASCADE, related_name='school_%(class)ss', to='main.school')),
+                ('updated_by', models.ForeignKey(blank=True, help_text='User who last updated this record', null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='updated_%(class)ss', to=settings.AUTH_USER_MODEL)),
+            ],
+            managers=[
+                ('default_objects', django.db.models.manager.Manager()),
+                ('objects', main.tenancy.managers.TenantManager()),
+            ],
+        ),
+        migrations.CreateModel(
+            name='QuestionBankTag',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.SlugField()),
+                ('item', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='tags', to='main.questionbankitem')),
+                ('school', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='question_bank_tags', to='main.school')),
+            ],
+            managers=[
+                ('default_objects', django.db.models.manager.Manager()),
+                ('objects', main.tenancy.managers.TenantManager()),
+            ],
+        ),
+        migrations.AddIndex(
+            model_name='questionbankitem',
+            index=models.Index(fields=['subject', 'is_active', 'difficulty', 'school'], name='main_questi_subject_581c88_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='questionbankoption',
+            index=models.Index(fields=['item', 'order'], name='main_questi_item_id_c8402e_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='questionbanktag',
+            index=models.Index(fields=['school', 'name', 'item'], name='main_questi_school__4d75f4_idx'),
+        ),
+        migrations.AddConstraint(
+            model_name='questionbanktag',
+            constraint=models.UniqueConstraint(fields=('item', 'name'), name='uniq_question_bank_tag'),
+        ),
+        migrations.RunPython(create_bank_search_index, drop_bank_search_index),
+    ]
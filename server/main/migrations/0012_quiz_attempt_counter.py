@@ -0,0 +1,48 @@
+# Generated by Django 5.0.7 on 2026-10-19 01:04
+
+import django.db.models.deletion
+import django.db.models.manager
+import main.tenancy.managers
+from django.db import migrations, models
+from django.db.models import Count
+
+
+def backfill_attempt_counters(apps, schema_editor):
+    QuizAttempt = apps.get_model('main', 'QuizAttempt')
+    QuizAttemptCounter = apps.get_model('main', 'QuizAttemptCounter')
+    rows = (
+        QuizAttempt._base_manager.filter(is_active=True).order_by()
+        .values('school_id', 'quiz_id', 'student_id')
+        .annotate(used=Count('id'))
+    )
+    QuizAttemptCounter._base_manager.bulk_create(
+        [QuizAttemptCounter(**row) for row in rows], batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('main', '0011_question_bank'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='QuizAttemptCounter',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('used', models.PositiveIntegerField(default=0)),
+                ('quiz', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='attempt_counters', to='main.quiz')),
+                ('school', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='quiz_attempt_counters', to='main.school')),
+                ('student', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='quiz_attempt_counters', to='main.student')),
+            ],
+            managers=[
+                ('default_objects', django.db.models.manager.Manager()),
+                ('objects', main.tenancy.managers.TenantManager()),
+            ],
+        ),
+        migrations.AddConstraint(
+            model_name='quizattemptcounter',
+            constraint=models.UniqueConstraint(fields=('quiz', 'student'), name='uniq_quiz_attempt_counter'),
+        ),
+        migrations.RunPython(backfill_attempt_counters, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,44 @@
+# Generated by Django 5.0.7 on 2026-10-19 01:10
+
+from datetime import timedelta
+
+from django.db import migrations, models
+from django.db.models import F, Q, Value
+from django.db.models.functions import Least
+
+
+def backfill_deadlines(apps, schema_editor):
+    # one UPDATE per timed quiz with open attempts (same rule as main.assessments.timer.refresh_deadlines)
+    Quiz = apps.get_model('main', 'Quiz')
+    QuizAttempt = apps.get_model('main', 'QuizAttempt')
+    quizzes = (
+        Quiz._base_manager.filter(attempts__status='in_progress')
+        .filter(Q(duration_minutes__gt=0) | Q(end_time__isnull=False))
+        .values_list('pk', 'duration_minutes', 'end_time').distinct()
+    )
+    for quiz_id, duration, end_time in quizzes:
+        ends = [Value(end_time)] if end_time else []
+        if duration:
+            ends.append(F('started_at') + timedelta(minutes=duration))
+        QuizAttempt._base_manager.filter(quiz_id=quiz_id, status='in_progress').update(
+            deadline=ends[0] if len(ends) == 1 else Least(*ends))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('main', '0012_quiz_attempt_counter'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='quizattempt',
+            name='deadline',
+            field=models.DateTimeField(blank=True, help_text='When the attempt auto-submits: start + duration or the quiz end time, whichever is first', null=True),
+        ),
+        migrations.AddIndex(
+            model_name='quizattempt',
+            index=models.Index(fields=['status', 'deadline'], name='main_quizat_status_742c7a_idx'),
+        ),
+        migrations.RunPython(backfill_deadlines, migrations.RunPython.noop),
+    ]
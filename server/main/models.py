@@ -3,7 +3,7 @@ from __future__ import annotations
 from .tenancy.tenancy_models import SchoolAwareModel, AuditableModel, SoftDeleteModel
 from main.tenancy.managers import TenantManager, get_current_school
 from django.db import models, transaction
-from django.core.validators import MinValueValidator
+from django.core.validators import MaxValueValidator, MinValueValidator
 from django.core.exceptions import ValidationError
 from django.conf import settings
 from decimal import Decimal
@@ -15,14 +15,17 @@ import string
 from datetime import date
 import time
 import sys
-from django.db import models, transaction, IntegrityError
+from django.db import models, transaction, IntegrityError, connections
 from django.db.models import Q
 from datetime import timedelta
 from django.core.exceptions import ObjectDoesNotExist, ValidationError
 
 from typing import Optional
-from django.db.models import Q, UniqueConstraint, Count
+from django.db.models import Q, UniqueConstraint, Count, F, Sum
+from django.db.models.functions import Greatest
+from collections import Counter
 from django.utils import timezone
+from django.utils.text import slugify
 
 from django.contrib.auth.models import AbstractUser, UserManager, make_password
 from django.db import models
@@ -34,6 +37,9 @@ from django.db.models import Q, UniqueConstraint
 
 
 from .tenancy.tenancy_models import *
+from .academics.applicability import applicable_subject_ids, subject_applies
+from .academics.grading import PRESETS, compile_bands
+from .assessments.ordering import new_seed
 
 SUPERADMIN = "superadmin"
 OWNER = "owner"
@@ -922,14 +928,11 @@ class Subject(SchoolAwareModel, AuditableModel, SoftDeleteModel):
         return f"{self.name} ({self.school.name})"
 
     def is_applicable_to_class_level(self, level: ClassLevel) -> bool:
-        cats_ok = (not self.applicable_categories) or (
-            level.category in self.applicable_categories)
-        depts_ok = (
-            (not self.applicable_departments)
-            or (level.department in self.applicable_departments)
-            or ("GENERAL" in self.applicable_departments)
-        )
-        return cats_ok and depts_ok
+        if self.pk and self.is_active:
+            return self.pk in applicable_subject_ids(self.school_id, level.category, level.department)
+        # unsaved/inactive subjects are not in the matrix; evaluate the same rule directly
+        return subject_applies(
+            self.applicable_categories or [], self.applicable_departments or [], level.category, level.department)
 
     @classmethod
     def create_default_subjects(cls, school):
@@ -986,6 +989,53 @@ class Subject(SchoolAwareModel, AuditableModel, SoftDeleteModel):
             )
 
 
+# ----------------------------- Grading -------------------------------------
+class GradingScale(SchoolAwareModel, AuditableModel, SoftDeleteModel):
+    """
+    Score → grade bands for a school, optionally overridden per class level.
+
+    `bands` is a list of {"min", "grade", "point"?, "remark"?}; the band starting at 0 is the fail band.
+    Presets (WAEC A1–F9, 5-band primary, …) live in `main.academics.grading.PRESETS`.
+    Why: schools grade differently; lookups use the compiled, cached form (`scale_for`).
+    """
+    related_name = 'grading_scales'
+
+    class_level = models.ForeignKey(
+        ClassLevel, on_delete=models.CASCADE, null=True, blank=True, related_name="grading_scales",
+        help_text="Leave empty for the school-wide default scale")
+    name = models.CharField(max_length=50)
+    bands = models.JSONField(default=list)
+
+    class Meta:
+        constraints = [
+            UniqueConstraint(fields=["school", "class_level"],
+                             name="uniq_grading_scale_per_level"),
+            UniqueConstraint(fields=["school"], condition=Q(class_level__isnull=True),
+                             name="uniq_default_grading_scale_per_school"),
+        ]
+
+    def __str__(self) -> str:  # pragma: no cover
+        return f"{self.name} ({self.class_level or 'default'})"
+
+    def clean(self):
+        super().clean()
+        compile_bands(self.bands, name=self.name)
+
+    def save(self, *args, **kwargs):
+        """Bands are validated on every save (not only via `full_clean`), so a bad list never reaches the cache."""
+        compile_bands(self.bands, name=self.name)
+        super().save(*args, **kwargs)
+
+    @classmethod
+    def from_preset(cls, school, preset: str, class_level=None) -> "GradingScale":
+        """Create or replace a school's (or level's) scale with one of the built-in presets."""
+        scale, _ = cls.default_objects.update_or_create(
+            school=school, class_level=class_level,
+            defaults={"name": preset, "bands": PRESETS[preset], "is_active": True},
+        )
+        return scale
+
+
 # ----------------------------- Session Classes ------------------------------
 class ClassList(SchoolAwareModel, AuditableModel, SoftDeleteModel):
     """
@@ -1007,6 +1057,9 @@ class ClassList(SchoolAwareModel, AuditableModel, SoftDeleteModel):
     class_teacher = models.ForeignKey(
         "Staff", on_delete=models.SET_NULL, null=True, blank=True, related_name="assigned_classes")
     capacity = models.PositiveIntegerField(null=True, blank=True)
+    active_count = models.PositiveIntegerField(
+        default=0, editable=False,
+        help_text="Denormalized number of active enrollments; kept in sync by StudentEnrollment")
 
     class Meta:
         constraints = [
@@ -1056,8 +1109,38 @@ class ClassList(SchoolAwareModel, AuditableModel, SoftDeleteModel):
         return cls.objects.values_list('id', flat=True)
 
     # enrollment helpers
+    @staticmethod
+    def bump_active_counts(deltas: dict[int, int]) -> None:
+        """
+        Apply {class_list_id: delta} to `active_count` (and the department summaries) with F() expressions.
+        Why: increments happen in SQL, so concurrent writers never lose updates.
+        """
+        by_delta: dict[int, list[int]] = {}
+        for class_list_id, delta in deltas.items():
+            if class_list_id and delta:
+                by_delta.setdefault(delta, []).append(class_list_id)
+        for delta, ids in by_delta.items():
+            ClassList.default_objects.filter(pk__in=ids).update(
+                active_count=Greatest(F("active_count") + delta, 0))
+        from main.reports.summaries import apply_class_deltas
+        apply_class_deltas(deltas)
+
+    @staticmethod
+    def claim_seat(class_list_id: int, seats: int = 1) -> bool:
+        """
+        Atomically take `seats` seats; False (nothing taken) when fewer are left (or no capacity is set).
+        Why: check-and-increment in a single UPDATE cannot be raced by another enrollment.
+        """
+        claimed = bool(ClassList.default_objects.filter(
+            pk=class_list_id, active_count__lte=F("capacity") - seats
+        ).update(active_count=F("active_count") + seats))
+        if claimed:
+            from main.reports.summaries import apply_class_deltas
+            apply_class_deltas({class_list_id: seats})
+        return claimed
+
     def get_current_enrollment(self) -> int:
-        return self.enrollments.filter(is_active=True).count()
+        return self.active_count
 
     def seats_left(self) -> int:
         return max((self.capacity or 0) - self.get_current_enrollment(), 0)
@@ -1065,23 +1148,27 @@ class ClassList(SchoolAwareModel, AuditableModel, SoftDeleteModel):
     def has_capacity(self) -> bool:
         return self.get_current_enrollment() < (self.capacity or 0)
 
+    def get_applicable_subject_ids(self) -> tuple[int, ...]:
+        """Ids of subjects applicable to this class level and department (cached matrix lookup)."""
+        level = self.class_level
+        return applicable_subject_ids(self.school_id, level.category, level.department)
+
     def get_applicable_subjects(self):
         """Get all subjects applicable to this class level and department"""
-        return Subject.objects.filter(
-            models.Q(school=self.school) &
-            (
-                # Core subjects with no category restriction
-                models.Q(applicable_categories=[]) |
-                models.Q(applicable_categories__contains=[self.category])
-            ) &
-            (
-                # Subjects with no department restriction
-                models.Q(applicable_departments=[]) |
-                models.Q(applicable_departments__contains=[self.class_level.department]) |
-                models.Q(applicable_departments__contains=[
-                         'GENERAL'])  # General subjects
-            )
-        ).distinct()
+        return Subject.objects.filter(pk__in=self.get_applicable_subject_ids())
+
+    def assign_applicable_subjects(self, subject_ids=None) -> None:
+        """Idempotently attach applicable subjects in one insert."""
+        if subject_ids is None:
+            subject_ids = self.get_applicable_subject_ids()
+        ClassSubjectAssignment.objects.bulk_create(
+            [
+                ClassSubjectAssignment(
+                    class_list=self, subject_id=subject_id, school_id=self.school_id)
+                for subject_id in subject_ids
+            ],
+            ignore_conflicts=True,
+        )
 
     @classmethod
     def create_for_session(cls, academic_session, class_levels=None, divisions=None):
@@ -1093,8 +1180,11 @@ class ClassList(SchoolAwareModel, AuditableModel, SoftDeleteModel):
         if divisions is None:
             divisions = ['A']  # Default to single division
 
+        school_id = academic_session.school_id
         created_classes = []
         for class_level in class_levels:
+            subject_ids = applicable_subject_ids(
+                school_id, class_level.category, class_level.department)
             for division in divisions:
                 class_list, created = cls.objects.get_or_create(
                     class_level=class_level,
@@ -1107,13 +1197,7 @@ class ClassList(SchoolAwareModel, AuditableModel, SoftDeleteModel):
                     created_classes.append(class_list)
 
                     # Auto-assign subjects for this department
-                    applicable_subjects = class_list.get_applicable_subjects()
-                    for subject in applicable_subjects:
-                        ClassSubjectAssignment.objects.get_or_create(
-                            class_list=class_list,
-                            subject=subject,
-                            school=self.school
-                        )
+                    class_list.assign_applicable_subjects(subject_ids)
 
         return created_classes
 
@@ -1219,34 +1303,133 @@ class StudentEnrollment(SchoolAwareModel, AuditableModel, SoftDeleteModel):
         if self.is_active:
             # capacity check (ignore self when updating)
             current = self.class_list.get_current_enrollment()
-            if self.pk and StudentEnrollment.objects.filter(pk=self.pk, is_active=True).exists():
+            if self.pk and getattr(self, "_counted_class_id", None) == self.class_list_id:
                 current -= 1
             if current >= (self.class_list.capacity or 0):
                 raise ValidationError(
                     f"Class {self.class_list.name} is at capacity ({self.class_list.capacity} students)")
 
+    # ---- active_count bookkeeping ----
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        loaded = dict(zip(field_names, values))
+        if "is_active" in loaded and "class_list_id" in loaded:
+            instance._counted_class_id = loaded["class_list_id"] if loaded["is_active"] else None
+        if "promoted" in loaded and "class_list_id" in loaded:
+            instance._counted_promoted_class_id = loaded["class_list_id"] if loaded["promoted"] else None
+        return instance
+
+    @staticmethod
+    def _moved(before, after) -> dict[int, int]:
+        """{class_list_id: delta} for a row's contribution moving from `before` to `after`."""
+        deltas = {}
+        if before != after:
+            if before:
+                deltas[before] = -1
+            if after:
+                deltas[after] = deltas.get(after, 0) + 1
+        return deltas
+
+    def _counted_before(self) -> tuple[int | None, int | None]:
+        """
+        (active class, promoted class) this row is currently counted under. Taken from the
+        snapshot `from_db` keeps; when that is missing (is_active/promoted/class_list deferred,
+        or an instance built with the pk of an existing row) the stored row is re-read.
+        """
+        snapshot = self.__dict__
+        if "_counted_class_id" in snapshot and "_counted_promoted_class_id" in snapshot:
+            return self._counted_class_id, self._counted_promoted_class_id
+        stored = None
+        if self.pk is not None:
+            stored = StudentEnrollment.default_objects.filter(pk=self.pk).select_for_update().values_list(
+                "class_list_id", "is_active", "promoted").first()
+        if stored is None:
+            before, promoted_before = None, None
+        else:
+            before = stored[0] if stored[1] else None
+            promoted_before = stored[0] if stored[2] else None
+        return (snapshot.get("_counted_class_id", before),
+                snapshot.get("_counted_promoted_class_id", promoted_before))
+
+    def save(self, *args, **kwargs):
+        """Persist, then move this row's contribution between `ClassList.active_count`s (and department summaries)."""
+        from main.reports.summaries import apply_promoted_deltas
+
+        with transaction.atomic():
+            before, promoted_before = self._counted_before()
+            super().save(*args, **kwargs)
+            after = self.class_list_id if self.is_active else None
+            promoted_after = self.class_list_id if self.promoted else None
+            ClassList.bump_active_counts(self._moved(before, after))
+            apply_promoted_deltas(self._moved(promoted_before, promoted_after))
+        self._counted_class_id = after
+        self._counted_promoted_class_id = promoted_after
+
+    @staticmethod
+    @transaction.atomic
+    def deactivate(queryset, **extra) -> int:
+        """
+        Bulk-deactivate the active rows of `queryset` and decrement their classes' counters.
+        `extra` is written alongside (e.g. promoted=True); returns rows updated.
+        """
+        now = timezone.now()
+        active = queryset.filter(is_active=True)
+        rows = list(active.select_for_update().values_list("class_list_id", "student_id"))
+        if not rows:
+            return 0
+        per_class = Counter(class_list_id for class_list_id, _ in rows)
+        updated = active.update(is_active=False, left_at=now, updated_at=now, **extra)
+        ClassList.bump_active_counts({cid: -n for cid, n in per_class.items()})
+        from main.assessments.audience import schedule_sync
+        schedule_sync(students={student_id for _, student_id in rows})
+        return updated
+
     @staticmethod
     @transaction.atomic
     def enroll(student, target_class: ClassList) -> "StudentEnrollment":
-        """Idempotent per-session enrollment; transfers within session if already enrolled elsewhere."""
-        if not target_class.has_capacity():
-            raise ValidationError("Class capacity reached.")
-        session = target_class.academic_session
+        """
+        Idempotent per-session enrollment; transfers within session if already enrolled elsewhere.
+
+        The seat is taken with a conditional UPDATE on `ClassList.active_count` before anything else
+        is written, so concurrent enrollments can never overfill a class. Failures raise
+        ValidationError with code "capacity" (class full) or "conflict" (same student enrolled
+        concurrently); either way the whole enrollment is rolled back.
+        """
+        session_id = target_class.academic_session_id
+        current = StudentEnrollment.default_objects.filter(
+            student=student, academic_session_id=session_id, is_active=True
+        ).first()
+        if current and current.class_list_id == target_class.pk:
+            return current
+        if not ClassList.claim_seat(target_class.pk):
+            raise ValidationError("Class capacity reached.", code="capacity")
         # deactivate existing active enrollment in this session
-        StudentEnrollment.objects.filter(
-            student=student, academic_session=session, is_active=True
-        ).update(is_active=False, left_at=timezone.now())
-        # create or reactivate enrollment in target class
-        obj, _ = StudentEnrollment.objects.get_or_create(
-            school=target_class.school,
-            student=student,
-            academic_session=session,
-            class_list=target_class,
-            defaults={"is_active": True},
-        )
+        if current:
+            StudentEnrollment.deactivate(
+                StudentEnrollment.default_objects.filter(pk=current.pk))
+        # create or reactivate enrollment in target class; its seat is already counted
+        obj = StudentEnrollment.default_objects.filter(
+            student=student, class_list=target_class).first()
+        if obj is None:
+            obj = StudentEnrollment(
+                school_id=target_class.school_id,
+                student=student,
+                academic_session_id=session_id,
+                class_list=target_class,
+            )
         obj.is_active = True
         obj.left_at = None  # now active again
-        obj.save(update_fields=["is_active", "left_at", "updated_at"])
+        obj._counted_class_id = target_class.pk
+        try:
+            with transaction.atomic():
+                if obj.pk:
+                    obj.save(update_fields=["is_active", "left_at", "updated_at"])
+                else:
+                    obj.save()
+        except IntegrityError:
+            raise ValidationError(
+                "Student is already being enrolled in this session.", code="conflict")
         return obj
 
     @transaction.atomic
@@ -1303,10 +1486,40 @@ class StudentEnrollment(SchoolAwareModel, AuditableModel, SoftDeleteModel):
 
 
 # ----------------------------- Student --------------------------------------
+class StudentQuerySet(models.QuerySet):
+    def with_current_enrollment(self, *related: str) -> "StudentQuerySet":
+        """
+        Prefetch each student's active enrollment (+ class, level, session) in one extra query.
+        `Student.current_enrollment`/`current_class` read from it instead of querying per row.
+        Extra enrollment paths (e.g. "class_list__class_teacher__user") are joined into the same query.
+        """
+        return self.prefetch_related(models.Prefetch(
+            "enrollments",
+            queryset=StudentEnrollment.default_objects.filter(is_active=True)
+            .select_related("academic_session", "class_list__class_level", "class_list__academic_session", *related)
+            .order_by("-enrollment_date", "-id"),
+            to_attr="_active_enrollments",
+        ))
+
+
+class StudentManager(TenantManager):
+    """Tenant-aware manager returning our custom queryset."""
+    _queryset_class = StudentQuerySet
+
+    def get_queryset(self) -> StudentQuerySet:
+        return super().get_queryset()
+
+    def with_current_enrollment(self, *related: str) -> StudentQuerySet:
+        return self.get_queryset().with_current_enrollment(*related)
+
+
 class Student(UserInherit):
     """Student profile; enroll via `StudentEnrollment` for per-session rosters."""
     related_name = 'students'
 
+    default_objects = models.Manager.from_queryset(StudentQuerySet)()
+    objects = StudentManager()
+
     reg_no = models.CharField(max_length=20, null=True, blank=True)
     student_id = models.CharField(max_length=20, null=True, blank=True)
     user = models.OneToOneField(
@@ -1348,7 +1561,10 @@ class Student(UserInherit):
 
     @property
     def current_enrollment(self) -> Optional[StudentEnrollment]:
-        return self.enrollments.filter(is_active=True).order_by("-enrollment_date").first()
+        prefetched = getattr(self, "_active_enrollments", None)
+        if prefetched is not None:
+            return prefetched[0] if prefetched else None
+        return self.enrollments.filter(is_active=True).order_by("-enrollment_date", "-id").first()
 
     @property
     def current_class(self) -> Optional[ClassList]:
@@ -1357,9 +1573,8 @@ class Student(UserInherit):
 
     @transaction.atomic
     def enroll_in_class(self, class_list: ClassList) -> StudentEnrollment:
-        StudentEnrollment.objects.filter(
-            student=self, academic_session=class_list.academic_session, is_active=True
-        ).update(is_active=False, left_at=timezone.now())
+        StudentEnrollment.deactivate(StudentEnrollment.objects.filter(
+            student=self, academic_session=class_list.academic_session))
         return StudentEnrollment.objects.create(
             student=self,
             class_list=class_list,
@@ -1498,13 +1713,7 @@ class AcademicSessionMethods:
 
         # Automatically assign applicable subjects to all classes
         for class_list in created_classes:
-            applicable_subjects = class_list.get_applicable_subjects()
-            for subject in applicable_subjects:
-                ClassSubjectAssignment.objects.get_or_create(
-                    class_list=class_list,
-                    subject=subject,
-                    school=self.school
-                )
+            class_list.assign_applicable_subjects()
 
         return created_classes
 
@@ -1537,17 +1746,579 @@ class AcademicSessionMethods:
                     created_classes.append(class_list)
 
                     # Auto-assign subjects for this department
-                    applicable_subjects = class_list.get_applicable_subjects()
-                    for subject in applicable_subjects:
-                        ClassSubjectAssignment.objects.get_or_create(
-                            class_list=class_list,
-                            subject=subject,
-                            school=self.school
-                        )
+                    class_list.assign_applicable_subjects()
 
         return created_classes
 
 
+# ----------------------------- Assessments ----------------------------------
+QUIZ_QUESTION_KINDS = (
+    ("single", "Single Choice"),
+    ("multiple", "Multiple Choice"),
+    ("true_false", "True/False"),
+    ("short_answer", "Short Answer"),
+    ("essay", "Essay"),
+)
+
+
+class QuizQuerySet(models.QuerySet):
+    def published(self) -> "QuizQuerySet":
+        return self.filter(is_published=True)
+
+    def search(self, query: str | None = None, school=None) -> "QuizQuerySet":
+        """
+        Ranked full-text match on title, description and subject; the last word matches as a prefix.
+        Uses the per-school FTS5 index (see `main.assessments.search`): every match, best first,
+        with filters chained before or after applied in the same query; falls back to `icontains`
+        where the index is unavailable.
+        """
+        if not query:
+            return self
+        from .assessments import search as fts
+
+        school = school or get_current_school()
+        if school is not None and fts.fts_available(connections[self.db]):
+            match = fts.match_expression(getattr(school, "pk", school), query)
+            if match is None:
+                return self.none()
+            return fts.filter_ranked(self, fts.QUIZ_TABLE, fts.QUIZ_WEIGHTS, match)
+        return self.filter(
+            Q(title__icontains=query)
+            | Q(description__icontains=query)
+            | Q(subject__name__icontains=query)
+        ).distinct()
+
+    def for_class(self, class_list) -> "QuizQuerySet":
+        return self.filter(Q(class_lists=class_list) | Q(class_lists__isnull=True))
+
+    def for_student(self, student, now=None) -> "QuizQuerySet":
+        """
+        Published quizzes open to `student` right now: one indexed lookup in the materialized
+        audience (see `QuizAudience`) or open to the whole school, within the availability window.
+        """
+        now = now or timezone.now()
+        audience = QuizAudience.default_objects.filter(student=student, is_active=True).values("quiz_id")
+        qs = self.filter(school_id=student.school_id, is_published=True).filter(
+            Q(is_global=True) | Q(pk__in=audience))
+        # availability window
+        return qs.filter(Q(start_time__isnull=True) | Q(start_time__lte=now)).filter(
+            Q(end_time__isnull=True) | Q(end_time__gte=now)
+        )
+
+
+class QuizManager(TenantManager):
+    """Tenant-aware manager returning our custom queryset."""
+    _queryset_class = QuizQuerySet
+
+    def get_queryset(self) -> QuizQuerySet:
+        return super().get_queryset()
+
+    def published(self) -> QuizQuerySet:
+        return self.get_queryset().published()
+
+    def search(self, query: str | None = None, school=None) -> QuizQuerySet:
+        return self.get_queryset().search(query, school)
+
+    def for_class(self, class_list) -> QuizQuerySet:
+        return self.get_queryset().for_class(class_list)
+
+    def for_student(self, student, now=None) -> QuizQuerySet:
+        return self.get_queryset().for_student(student, now)
+
+
+class Quiz(SchoolAwareModel, AuditableModel, SoftDeleteModel):
+    """
+    Quiz linked to **term**, **subject**, **class list(s)** and optionally **specific students**.
+
+    - Use `class_lists` to assign to homerooms; use `assigned_students` for targeted delivery.
+    - `academic_session` & `term` keep the quiz anchored in time.
+    - Publishing compiles the questions into an immutable `QuizPaper`; `paper_version` is the current one.
+    """
+    related_name = 'quizzes'
+
+    # Basic
+    title = models.CharField(max_length=200)
+    slug = models.SlugField(max_length=250, blank=True)
+    description = models.TextField(blank=True)
+    instructions = models.TextField(blank=True)
+
+    # Academic context
+    subject = models.ForeignKey(Subject, on_delete=models.CASCADE, related_name="quizzes")
+    academic_session = models.ForeignKey(AcademicSession, on_delete=models.CASCADE, related_name="quizzes")
+    term = models.ForeignKey(Term, on_delete=models.SET_NULL, null=True, blank=True, related_name="quizzes")
+
+    # Audience
+    class_lists = models.ManyToManyField(ClassList, blank=True, related_name="quizzes")
+    assigned_students = models.ManyToManyField(Student, blank=True, related_name="assigned_quizzes")
+
+    # Config
+    CATEGORY_CHOICES = [
+        ("assignment", "Assignment"),
+        ("exam", "Exam"),
+        ("practice", "Practice Quiz"),
+        ("homework", "Homework"),
+        ("test", "Class Test"),
+    ]
+    DIFFICULTY_CHOICES = [("easy", "Easy"), ("medium", "Medium"), ("hard", "Hard")]
+
+    category = models.CharField(max_length=20, choices=CATEGORY_CHOICES, default="practice")
+    difficulty = models.CharField(max_length=10, choices=DIFFICULTY_CHOICES, default="medium")
+
+    total_marks = models.PositiveIntegerField(default=0)
+    pass_mark_percentage = models.PositiveIntegerField(
+        default=50, validators=[MinValueValidator(0), MaxValueValidator(100)])
+
+    # Timing & attempts
+    duration_minutes = models.PositiveIntegerField(null=True, blank=True)
+    max_attempts = models.PositiveIntegerField(default=1, validators=[MinValueValidator(1)])
+
+    # Availability
+    start_time = models.DateTimeField(null=True, blank=True)
+    end_time = models.DateTimeField(null=True, blank=True)
+
+    # Behaviour
+    randomize_questions = models.BooleanField(default=False)
+    randomize_options = models.BooleanField(default=False)
+    show_results_immediately = models.BooleanField(default=True)
+    show_correct_answers = models.BooleanField(default=True)
+    allow_review = models.BooleanField(default=True)
+
+    # Publish
+    is_published = models.BooleanField(default=False)
+    is_global = models.BooleanField(
+        default=True, editable=False,
+        help_text="No class or student assignments: open to the whole school (kept in sync with the audience)")
+    paper_version = models.PositiveIntegerField(
+        default=0, help_text="Current compiled paper (0 = never published)")
+
+    default_objects = models.Manager.from_queryset(QuizQuerySet)()
+    objects = QuizManager()
+
+    class Meta:
+        constraints = [UniqueConstraint(fields=["school", "slug"], name="unique_quiz_slug_per_school")]
+        indexes = [
+            models.Index(fields=["school", "subject", "is_published"]),
+            models.Index(fields=["school", "category", "is_published"]),
+            models.Index(fields=["start_time", "end_time"]),
+            models.Index(fields=["academic_session", "term"]),
+        ]
+        ordering = ["-created_at"]
+
+    def __str__(self) -> str:  # pragma: no cover
+        return f"{self.title}"
+
+    def save(self, *args, **kwargs):
+        if not self.slug:
+            base = slugify(self.title)
+            slug = base or "quiz"
+            i = 1
+            while Quiz.default_objects.filter(school=self.school, slug=slug).exclude(pk=self.pk).exists():
+                i += 1
+                slug = f"{base}-{i}"
+            self.slug = slug
+        super().save(*args, **kwargs)
+
+    def clean(self) -> None:
+        # cross-tenant safety
+        if getattr(self.subject, "school_id", self.school_id) != self.school_id:
+            raise ValidationError("Subject must belong to the same school as the quiz")
+        if self.term and getattr(self.term.academic_session, "school_id", self.school_id) != self.school_id:
+            raise ValidationError("Term must belong to the same school")
+        if not self.pk:
+            return
+        # ensure class lists belong to same school and session (when provided)
+        for cl in self.class_lists.all():
+            if cl.school_id != self.school_id:
+                raise ValidationError("All assigned classes must belong to the same school")
+            if self.academic_session_id and cl.academic_session_id != self.academic_session_id:
+                raise ValidationError("Assigned class session must match quiz academic_session")
+        # ensure assigned students belong to the same school
+        for st in self.assigned_students.all():
+            if st.school_id != self.school_id:
+                raise ValidationError("Assigned students must belong to the same school")
+
+    # Frontend helpers
+    @property
+    def is_available(self) -> bool:
+        if not self.is_published:
+            return False
+        now = timezone.now()
+        if self.start_time and now < self.start_time:
+            return False
+        if self.end_time and now > self.end_time:
+            return False
+        return True
+
+    def is_assigned_to_student(self, student) -> bool:
+        if student.school_id != self.school_id:
+            return False
+        if self.is_global:
+            return True
+        return QuizAudience.default_objects.filter(quiz=self, student=student, is_active=True).exists()
+
+    def paper_header(self) -> dict:
+        """The quiz fields frozen into a compiled paper (no audience or availability window)."""
+        return {
+            "id": self.pk,
+            "title": self.title,
+            "description": self.description,
+            "instructions": self.instructions,
+            "subjectId": self.subject_id,
+            "category": self.category,
+            "totalMarks": self.total_marks,
+            "passMarkPercent": self.pass_mark_percentage,
+            "durationMinutes": self.duration_minutes,
+            "randomizeQuestions": self.randomize_questions,
+            "randomizeOptions": self.randomize_options,
+        }
+
+    def to_public_dict(self):
+        return {
+            **self.paper_header(),
+            "slug": self.slug,
+            "sessionId": self.academic_session_id,
+            "termId": self.term_id,
+            "difficulty": self.difficulty,
+            "maxAttempts": self.max_attempts,
+            "windowStart": self.start_time.isoformat() if self.start_time else None,
+            "windowEnd": self.end_time.isoformat() if self.end_time else None,
+            "showResultsImmediately": self.show_results_immediately,
+            "showCorrectAnswers": self.show_correct_answers,
+            "allowReview": self.allow_review,
+            "isPublished": self.is_published,
+            "isAvailable": self.is_available,
+            "paperVersion": self.paper_version,
+            "classListIds": list(self.class_lists.values_list("id", flat=True)),
+            "assignedStudentIds": list(self.assigned_students.values_list("id", flat=True)),
+        }
+
+
+class QuestionBankItem(SchoolAwareModel, AuditableModel, SoftDeleteModel):
+    """
+    Reusable question content for a school's subject; quizzes place it via `QuizQuestion.bank_item`.
+    Why: reusing a question each term is one placement row, not a copy of its text, image and options,
+    and an edit here reaches every quiz that uses it (published quizzes republish on commit).
+    """
+    related_name = 'question_bank'
+    DIFFICULTY_CHOICES = ((1, "Easy"), (2, "Medium"), (3, "Hard"))
+
+    subject = models.ForeignKey(Subject, on_delete=models.CASCADE, related_name="bank_items")
+    kind = models.CharField(max_length=12, choices=QUIZ_QUESTION_KINDS, default="single")
+    text = models.TextField()
+    points = models.DecimalField(max_digits=6, decimal_places=2, default=1,
+                                 help_text="Default points when placed in a quiz")
+    difficulty = models.PositiveSmallIntegerField(choices=DIFFICULTY_CHOICES, default=2)
+    explanation = models.TextField(blank=True)
+    image = models.ImageField(upload_to="quiz/bank/%Y/%m/%d/", null=True, blank=True)
+
+    class Meta:
+        # generate-from-bank filters exactly these columns (a subject implies its school);
+        # the pk rides along, so candidate ids are an index-only read
+        indexes = [models.Index(fields=["subject", "is_active", "difficulty", "school"])]
+
+    def __str__(self) -> str:  # pragma: no cover
+        return self.text[:60]
+
+    def set_tags(self, names) -> None:
+        """Replace the item's tags (normalized to slugs)."""
+        wanted = {slugify(name) for name in names if slugify(name)}
+        self.tags.exclude(name__in=wanted).delete()
+        existing = set(self.tags.values_list("name", flat=True))
+        QuestionBankTag.default_objects.bulk_create([
+            QuestionBankTag(school_id=self.school_id, item=self, name=name) for name in wanted - existing
+        ])
+
+
+class QuestionBankOption(SchoolAwareModel, AuditableModel, SoftDeleteModel):
+    related_name = 'question_bank_options'
+
+    item = models.ForeignKey(QuestionBankItem, on_delete=models.CASCADE, related_name="options")
+    text = models.CharField(max_length=500)
+    is_correct = models.BooleanField(default=False)
+    order = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        indexes = [models.Index(fields=["item", "order"])]
+
+    def to_public_dict(self):
+        return {"id": self.pk, "text": self.text}
+
+
+class QuestionBankTag(SchoolOwnedModel):
+    """One (item, tag) pair; the (school, name, item) index serves tag filters when sampling."""
+    related_name = 'question_bank_tags'
+
+    school = models.ForeignKey(School, on_delete=models.CASCADE, related_name='question_bank_tags')
+    item = models.ForeignKey(QuestionBankItem, on_delete=models.CASCADE, related_name="tags")
+    name = models.SlugField(max_length=50)
+
+    class Meta:
+        constraints = [UniqueConstraint(fields=["item", "name"], name="uniq_question_bank_tag")]
+        indexes = [models.Index(fields=["school", "name", "item"])]
+
+    def __str__(self) -> str:  # pragma: no cover
+        return self.name
+
+
+class QuizQuestion(SchoolAwareModel, AuditableModel, SoftDeleteModel):
+    """
+    A question's place in a quiz: inline content, or a reference to a `QuestionBankItem`
+    (then kind/text/explanation/image/options come from the bank item; order, points and
+    required stay per quiz).
+    """
+    related_name = 'quiz_questions'
+    KIND_CHOICES = QUIZ_QUESTION_KINDS
+
+    quiz = models.ForeignKey(Quiz, on_delete=models.CASCADE, related_name="questions")
+    bank_item = models.ForeignKey(QuestionBankItem, on_delete=models.PROTECT, null=True, blank=True,
+                                  related_name="placements")
+    kind = models.CharField(max_length=12, choices=KIND_CHOICES, default="single")
+    text = models.TextField(blank=True)
+    points = models.DecimalField(max_digits=6, decimal_places=2, default=1)
+    order = models.PositiveIntegerField(default=0)
+    explanation = models.TextField(blank=True)
+    image = models.ImageField(upload_to="quiz/questions/%Y/%m/%d/", null=True, blank=True)
+    is_required = models.BooleanField(default=True)
+    meta = models.JSONField(default=dict, blank=True)
+
+    class Meta:
+        ordering = ["order", "id"]
+        indexes = [models.Index(fields=["quiz", "order"])]
+
+    def clean(self):
+        super().clean()
+        if self.bank_item_id is None and not self.text:
+            raise ValidationError({"text": "A question needs text or a question bank item"})
+
+    @property
+    def content(self):
+        """Where kind/text/options live: the bank item for bank placements, else this row."""
+        return self.bank_item if self.bank_item_id else self
+
+    def to_public_dict(self):
+        # works off prefetched options (see `main.assessments.papers`); one query otherwise
+        content = self.content
+        options = sorted(content.options.all(), key=lambda o: (o.order, o.pk))
+        return {
+            "id": self.pk,
+            "kind": content.kind,
+            "text": content.text,
+            "points": float(self.points),
+            "order": self.order,
+            "explanation": content.explanation,
+            "image": content.image.url if content.image else None,
+            "required": self.is_required,
+            "options": [o.to_public_dict() for o in options if o.is_active],
+        }
+
+
+class QuizOption(SchoolAwareModel, AuditableModel, SoftDeleteModel):
+    related_name = 'quiz_options'
+
+    question = models.ForeignKey(QuizQuestion, on_delete=models.CASCADE, related_name="options")
+    text = models.CharField(max_length=500)
+    is_correct = models.BooleanField(default=False)
+    order = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        indexes = [models.Index(fields=["question", "order"])]
+
+    def to_public_dict(self):
+        return {"id": self.pk, "text": self.text}
+
+
+class QuizPaper(SchoolOwnedModel):
+    """
+    Immutable compiled snapshot of a published quiz: header, questions and options as JSON.
+    Why: delivery serves one cached blob per (quiz, version) instead of re-serializing per student;
+    edits after publishing create a new version, and attempts stay pinned to the one they started on.
+    """
+    related_name = 'quiz_papers'
+
+    school = models.ForeignKey(School, on_delete=models.CASCADE, related_name='quiz_papers')
+    quiz = models.ForeignKey(Quiz, on_delete=models.CASCADE, related_name="papers")
+    version = models.PositiveIntegerField()
+    digest = models.CharField(max_length=64, help_text="sha256 of the payload")
+    payload = models.JSONField()
+    answer_key = models.JSONField(
+        default=dict, help_text="{question_id: {kind, points, correct option ids}}; never served")
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        constraints = [UniqueConstraint(fields=["quiz", "version"], name="uniq_quiz_paper_version")]
+
+    def __str__(self) -> str:  # pragma: no cover
+        return f"{self.quiz_id} v{self.version}"
+
+
+class QuizAudience(SchoolOwnedModel):
+    """
+    Materialized (quiz, student) eligibility: direct assignments plus active enrollments in assigned classes.
+    Why: a student's quiz list is one indexed lookup instead of a three-way OR join with DISTINCT.
+
+    Maintained on commit from `class_lists`/`assigned_students` changes and enrollment saves
+    (see `main.assessments.audience`); revoked rows are flagged inactive, not deleted.
+    `manage.py rebuild_quiz_audience` recomputes everything.
+    """
+    related_name = 'quiz_audience'
+
+    school = models.ForeignKey(School, on_delete=models.CASCADE, related_name='quiz_audience')
+    quiz = models.ForeignKey(Quiz, on_delete=models.CASCADE, related_name="audience")
+    student = models.ForeignKey(Student, on_delete=models.CASCADE, related_name="quiz_audience")
+    is_active = models.BooleanField(default=True)
+
+    class Meta:
+        constraints = [UniqueConstraint(fields=["quiz", "student"], name="uniq_quiz_audience")]
+        indexes = [models.Index(fields=["student", "is_active", "quiz"])]
+
+    def __str__(self) -> str:  # pragma: no cover
+        return f"{self.quiz_id} → {self.student_id}"
+
+
+class QuizAttemptCounter(SchoolOwnedModel):
+    """
+    Attempts used per (quiz, student), claimed in the same statement that checks the limit.
+    Why: starting an attempt is one conditional upsert instead of counting prior attempts, so
+    simultaneous starts (a whole class at the bell, or a double-click) never exceed `max_attempts`.
+    Claimed by `QuizAttempt.save` (see `main.assessments.attempts.claim_attempt`); released on delete.
+    """
+    related_name = 'quiz_attempt_counters'
+
+    school = models.ForeignKey(School, on_delete=models.CASCADE, related_name='quiz_attempt_counters')
+    quiz = models.ForeignKey(Quiz, on_delete=models.CASCADE, related_name="attempt_counters")
+    student = models.ForeignKey(Student, on_delete=models.CASCADE, related_name="quiz_attempt_counters")
+    used = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        constraints = [UniqueConstraint(fields=["quiz", "student"], name="uniq_quiz_attempt_counter")]
+
+    def __str__(self) -> str:  # pragma: no cover
+        return f"{self.quiz_id}/{self.student_id}: {self.used}"
+
+
+class QuizAttempt(SchoolAwareModel, AuditableModel, SoftDeleteModel):
+    related_name = 'quiz_attempts'
+
+    quiz = models.ForeignKey(Quiz, on_delete=models.CASCADE, related_name="attempts")
+    student = models.ForeignKey(Student, on_delete=models.CASCADE, related_name="quiz_attempts")
+    paper_version = models.PositiveIntegerField(
+        null=True, blank=True, help_text="Paper the attempt was started on (pinned at creation)")
+    seed = models.BigIntegerField(
+        default=new_seed, help_text="Derives this attempt's question/option order (see main.assessments.ordering)")
+    started_at = models.DateTimeField(auto_now_add=True)
+    deadline = models.DateTimeField(
+        null=True, blank=True,
+        help_text="When the attempt auto-submits: start + duration or the quiz end time, whichever is first")
+    submitted_at = models.DateTimeField(null=True, blank=True)
+    score = models.DecimalField(max_digits=8, decimal_places=2, default=0)
+    status = models.CharField(max_length=12, default="in_progress")  # in_progress, submitted, graded
+    meta = models.JSONField(default=dict, blank=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=["quiz", "student"]),
+            models.Index(fields=["status"]),
+            # the expiry sweep: open attempts by deadline (see main.assessments.timer.sweep)
+            models.Index(fields=["status", "deadline"]),
+        ]
+        constraints = [
+            UniqueConstraint(fields=["quiz", "student"], condition=Q(status="in_progress"),
+                             name="uniq_active_attempt"),
+        ]
+
+    def save(self, *args, **kwargs):
+        if not self._state.adding:
+            return super().save(*args, **kwargs)
+        from .assessments.attempts import claim_attempt
+        from .assessments.timer import deadline_for
+
+        paper_version, limit, duration, end_time = (
+            Quiz.default_objects.filter(pk=self.quiz_id)
+            .values_list("paper_version", "max_attempts", "duration_minutes", "end_time").get()
+        )
+        if self.paper_version is None:
+            self.paper_version = paper_version
+        if self.deadline is None:
+            self.deadline = deadline_for(timezone.now(), duration, end_time)
+        # the claim and the insert commit or roll back together (e.g. on `uniq_active_attempt`)
+        with transaction.atomic():
+            if not claim_attempt(self.school_id, self.quiz_id, self.student_id, limit):
+                raise ValidationError("Maximum number of attempts reached", code="max_attempts")
+            super().save(*args, **kwargs)
+
+    def clean(self) -> None:
+        from .assessments.attempts import check_eligibility
+
+        # one query: school, publication window, assignment and attempts used
+        check_eligibility(self.quiz_id, self.student, existing=not self._state.adding)
+
+    @property
+    def passed(self) -> bool:
+        if not self.submitted_at:
+            return False
+        total = float(self.quiz.total_marks or 0)
+        threshold = (total * float(self.quiz.pass_mark_percentage or 0)) / 100.0
+        return float(self.score or 0) >= threshold
+
+
+class QuizAnswer(SchoolAwareModel, AuditableModel, SoftDeleteModel):
+    related_name = 'quiz_answers'
+
+    attempt = models.ForeignKey(QuizAttempt, on_delete=models.CASCADE, related_name="answers")
+    question = models.ForeignKey(QuizQuestion, on_delete=models.CASCADE, related_name="answers")
+    selected_option_ids = models.JSONField(default=list, blank=True)
+    text_answer = models.TextField(blank=True, default="")
+    is_correct = models.BooleanField(default=False)
+    points_awarded = models.DecimalField(max_digits=6, decimal_places=2, default=0)
+
+    class Meta:
+        indexes = [models.Index(fields=["attempt", "question"])]
+        constraints = [UniqueConstraint(fields=["attempt", "question"], name="uniq_answer_per_question_attempt")]
+
+    def auto_mark(self, answer_key=None):
+        """Mark against the quiz's cached answer key; short_answer/essay are left for manual marking."""
+        from main.assessments.marking import get_answer_key, mark
+
+        if answer_key is None:
+            answer_key = get_answer_key(self.attempt.quiz_id)
+        mark(self, answer_key)
+
+
+# ----------------------------- Reporting summaries ------------------------
+class DepartmentSummary(SchoolOwnedModel):
+    """
+    Precomputed per (session, department) enrollment figures for reports.
+    Why: department reports read these rows instead of grouping over every historical enrollment.
+
+    Maintained incrementally from enrollment changes (see `main.reports.summaries`);
+    `manage.py rebuild_reporting_summaries` recomputes them from `StudentEnrollment`.
+    Per-class figures live on `ClassList.active_count`.
+    """
+    related_name = 'department_summaries'
+
+    school = models.ForeignKey(
+        School, on_delete=models.CASCADE, related_name='department_summaries')
+    academic_session = models.ForeignKey(
+        AcademicSession, on_delete=models.CASCADE, related_name='department_summaries')
+    department = models.CharField(
+        max_length=20, choices=ClassLevel.DEPARTMENT_CHOICES)
+    active_students = models.PositiveIntegerField(default=0)
+    promoted = models.PositiveIntegerField(default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        constraints = [
+            UniqueConstraint(fields=["academic_session", "department"],
+                             name="uniq_department_summary_per_session"),
+        ]
+        indexes = [
+            models.Index(fields=["school", "academic_session"]),
+        ]
+
+    def __str__(self) -> str:  # pragma: no cover
+        return f"{self.department} @ {self.academic_session_id}: {self.active_students} active"
+
+
 # ----------------------------- Reporting & Utilities ------------------------
 class SchoolUtilities:
     """
@@ -1563,63 +2334,65 @@ class SchoolUtilities:
 
     @staticmethod
     def class_department_statistics(school) -> dict[str, dict[str, int]]:
-        """Active student & class counts by department (current snapshot)."""
+        """
+        Active student & class counts by department (current snapshot).
+        Reads `DepartmentSummary` rows and `ClassList.active_count`, never the enrollment history.
+        """
         data: dict[str, dict[str, int]] = {}
-        qs = (
-            StudentEnrollment.objects.filter(school=school, is_active=True)
-            .values("class_list__class_level__department")
-            .annotate(student_count=Count("student"), class_count=Count("class_list", distinct=True))
-        )
         label_map = dict(ClassLevel.DEPARTMENT_CHOICES)
-        for row in qs:
-            code = row["class_list__class_level__department"]
+        students = (
+            DepartmentSummary.default_objects.filter(school=school, active_students__gt=0)
+            .values("department")
+            .annotate(n=Sum("active_students"))
+        )
+        classes = dict(
+            ClassList.default_objects.filter(school=school, active_count__gt=0)
+            .values("class_level__department")
+            .annotate(n=Count("id"))
+            .values_list("class_level__department", "n")
+        )
+        for row in students:
+            code = row["department"]
             data[code] = {
                 "name": label_map.get(code, code),
-                "students": row["student_count"],
-                "classes": row["class_count"],
+                "students": row["n"],
+                "classes": classes.get(code, 0),
             }
         return data
 
     # ---- reports ----
+    @staticmethod
+    def session_roll_queryset(session):
+        """Classes of a session in roll order (shared by the roll report and its export)."""
+        return ClassList.objects.filter(academic_session=session).order_by(
+            "class_level__level_order", "division")
+
     @staticmethod
     def report_session_roll(session) -> list[dict]:
         """Roll per class (active counts & capacity) for a given session."""
-        qs = (
-            ClassList.objects.filter(academic_session=session)
-            .annotate(active_count=Count("enrollments", filter=Q(enrollments__is_active=True)))
-            .values(
-                "id",
-                "class_level__name",
-                "class_level__department",
-                "division",
-                "capacity",
-                "active_count",
-            )
-            .order_by("class_level__level_order", "division")
+        qs = SchoolUtilities.session_roll_queryset(session).values(
+            "id",
+            "class_level__name",
+            "class_level__department",
+            "division",
+            "capacity",
+            "active_count",
         )
         return list(qs)
 
     @staticmethod
     def report_department_mix(session) -> dict[str, int]:
-        """Active student counts by department for a given session."""
-        qs = (
-            StudentEnrollment.objects.filter(
-                academic_session=session, is_active=True)
-            .values("class_list__class_level__department")
-            .annotate(n=Count("student"))
-        )
-        return {row["class_list__class_level__department"]: row["n"] for row in qs}
+        """Active student counts by department for a given session (precomputed rows)."""
+        qs = DepartmentSummary.default_objects.filter(
+            academic_session=session, active_students__gt=0)
+        return dict(qs.values_list("department", "active_students"))
 
     @staticmethod
     def report_promotions_by_department(source_session) -> dict[str, int]:
-        """Count promotions (flagged on the source-session enrollments) by department."""
-        qs = (
-            StudentEnrollment.objects.filter(
-                academic_session=source_session, promoted=True)
-            .values("class_list__class_level__department")
-            .annotate(n=Count("id"))
-        )
-        return {row["class_list__class_level__department"]: row["n"] for row in qs}
+        """Count promotions (flagged on the source-session enrollments) by department (precomputed rows)."""
+        qs = DepartmentSummary.default_objects.filter(
+            academic_session=source_session, promoted__gt=0)
+        return dict(qs.values_list("department", "promoted"))
 
     @staticmethod
     def get_available_departments_for_promotion(student):
@@ -1627,87 +2400,35 @@ class SchoolUtilities:
         if (student.current_class and
                 student.current_class.class_level.name == 'JS3'):
 
-            return ClassLevel.objects.filter(
+            label_map = dict(ClassLevel.DEPARTMENT_CHOICES)
+            departments = ClassLevel.objects.filter(
                 school=student.school,
                 name='SS1'
-            ).values_list('department', 'department__verbose_name')
+            ).values_list('department', flat=True)
+            return [(code, label_map.get(code, code)) for code in departments]
         return []
 
     @staticmethod
     def get_class_department_statistics(school):
         """Get statistics about class departments in the school"""
-        from django.db.models import Count
-
-        stats = {}
-
-        # Get enrollment statistics by department
-        department_stats = StudentEnrollment.objects.filter(
-            school=school,
-            is_active=True
-        ).values(
-            'class_list__class_level__department',
-            'class_list__class_level__department__verbose_name'
-        ).annotate(
-            student_count=Count('student'),
-            class_count=Count('class_list', distinct=True)
-        )
-
-        for stat in department_stats:
-            department = stat['class_list__class_level__department']
-            stats[department] = {
-                'name': stat['class_list__class_level__department__verbose_name'],
-                'students': stat['student_count'],
-                'classes': stat['class_count']
-            }
-
-        return stats
+        return SchoolUtilities.class_department_statistics(school)
 
     @staticmethod
-    def bulk_promote_students(enrollments, target_session, department_assignments=None):
+    def bulk_promote_students(enrollments, target_session, department_assignments=None, hold_back=None):
         """
         Bulk promote students to next session.
         department_assignments: dict mapping student_id to target_department for JS3->SS1 promotions
-        """
-        from django.db import transaction
+        hold_back: student ids that repeat their current level in the target session
 
-        promoted_enrollments = []
+        Returns {"promoted": [...], "held_back": [...], "failed": [...]}; see `PromotionPlanner`.
+        """
+        from main.academics.promotion import PromotionPlanner
 
-        with transaction.atomic():
-            for enrollment in enrollments:
-                try:
-                    # For JS3 students, use provided department assignment
-                    target_department = None
-                    if (enrollment.class_list.class_level.name == 'JS3' and
-                            department_assignments and
-                            enrollment.student.id in department_assignments):
-                        target_department = department_assignments[enrollment.student.id]
-
-                    new_enrollment = enrollment.promote_to_next_level(
-                        target_department)
-
-                    # Update to new session if different
-                    if (new_enrollment and
-                            new_enrollment.class_list.academic_session != target_session):
-
-                        # Find equivalent class in target session
-                        target_class = ClassList.objects.filter(
-                            class_level=new_enrollment.class_list.class_level,
-                            academic_session=target_session,
-                            division=new_enrollment.class_list.division
-                        ).first()
-
-                        if target_class:
-                            new_enrollment.class_list = target_class
-                            new_enrollment.save()
-
-                    promoted_enrollments.append(new_enrollment)
-
-                except ValidationError as e:
-                    # Log the error and continue with other students
-                    print(f"Failed to promote {enrollment.student}: {e}")
-                    continue
-
-        return promoted_enrollments
+        return PromotionPlanner(
+            target_session,
+            department_assignments=department_assignments,
+            hold_back=hold_back,
+        ).run(enrollments)
 
 
 # ----------------------------- GmeetClass ------------------------------
@@ -0,0 +1,105 @@
+# ==============================================
+# File: main/reports/dashboard.py
+# Purpose: Admin dashboard headline counts (one query, cached per school)
+# ==============================================
+from __future__ import annotations
+
+import time
+
+from django.core.cache import cache
+from django.db.models import Count, IntegerField, OuterRef, Subquery, Value
+from django.db.models.functions import Coalesce
+
+from main.common.oncommit import invalidate_on_commit, is_invalidated
+
+VERSION_CACHE_KEY = "dashboard_version:{school_id}"
+STATS_CACHE_KEY = "dashboard_stats:{school_id}:v{version}"
+STATS_CACHE_TIMEOUT = 60 * 60
+
+
+def _count_subquery(queryset):
+    """Scalar `COUNT(*)` subquery correlated on the outer school row."""
+    counted = (
+        queryset.filter(school_id=OuterRef("pk"))
+        .order_by()
+        .values("school_id")
+        .annotate(n=Count("pk"))
+        .values("n")
+    )
+    return Coalesce(Subquery(counted, output_field=IntegerField()), Value(0))
+
+
+def compute_admin_stats(school_id: int) -> dict:
+    """
+    Headline counts for one school in a single SELECT built from scalar subqueries.
+    Counts follow the tenant managers: only active rows; classes are those of the current session.
+    """
+    from main.models import School, Student, Staff, ClassList, Subject, AcademicSession
+
+    current = AcademicSession.default_objects.filter(
+        school_id=OuterRef("pk"), is_current=True, is_active=True)
+    row = (
+        School.objects.filter(pk=school_id)
+        .annotate(
+            total_students=_count_subquery(Student.default_objects.filter(is_active=True)),
+            total_staff=_count_subquery(Staff.default_objects.filter(is_active=True)),
+            total_classes=_count_subquery(ClassList.default_objects.filter(
+                is_active=True,
+                academic_session_id=Subquery(current.values("pk")[:1]),
+            )),
+            total_subjects=_count_subquery(Subject.default_objects.filter(is_active=True)),
+            current_session_name=Subquery(current.values("name")[:1]),
+        )
+        .values("total_students", "total_staff", "total_classes",
+                "total_subjects", "current_session_name")
+        .first()
+    )
+    if row is None:
+        return {}
+    return {
+        "total_students": row["total_students"],
+        "total_staff": row["total_staff"],
+        "total_classes": row["total_classes"],
+        "total_subjects": row["total_subjects"],
+        "current_session": row["current_session_name"] or "Not Set",
+    }
+
+
+def _fresh_version() -> int:
+    """A version no earlier generation can have used (the version key is dropped on every bump)."""
+    return time.time_ns()
+
+
+def get_version(school_id: int) -> int:
+    """Current stats version for a school."""
+    key = VERSION_CACHE_KEY.format(school_id=school_id)
+    version = cache.get(key)
+    if version is None:
+        cache.add(key, _fresh_version(), None)
+        version = cache.get(key)
+    return version
+
+
+def get_admin_stats(school_id: int) -> dict:
+    """
+    Cached headline counts; the key embeds the school's version so a bump makes old entries unreachable.
+    Why: the admin dashboard is hit by every admin on every page load but the counts change rarely.
+    """
+    if is_invalidated(VERSION_CACHE_KEY.format(school_id=school_id)):
+        # this transaction changed counted rows: read them, but cache nothing until it commits
+        return compute_admin_stats(school_id)
+    key = STATS_CACHE_KEY.format(school_id=school_id, version=get_version(school_id))
+    stats = cache.get(key)
+    if stats is None:
+        stats = compute_admin_stats(school_id)
+        cache.set(key, stats, STATS_CACHE_TIMEOUT)
+    return stats
+
+
+def bump_version(school_id: int) -> None:
+    """
+    Start a new stats generation for a school once the surrounding transaction commits.
+    Saves of counted rows call this through signals; bulk writes (bulk_create, queryset
+    update/delete) send none, so code doing them calls it directly.
+    """
+    invalidate_on_commit(VERSION_CACHE_KEY.format(school_id=school_id))
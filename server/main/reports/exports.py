@@ -0,0 +1,115 @@
+# ==============================================
+# File: main/reports/exports.py
+# Purpose: Constant-memory CSV/XLSX exports (rows read in chunks; CSV also streams to the client)
+# ==============================================
+from __future__ import annotations
+
+import csv
+import tempfile
+from typing import Iterable, Iterator, Sequence
+
+from django.db.models import OuterRef, Subquery
+
+EXPORT_CHUNK_SIZE = 2000
+XLSX_READ_CHUNK = 64 * 1024
+
+
+class _Echo:
+    """File-like object whose write() just returns the value (csv.writer → generator)."""
+
+    def write(self, value):
+        return value
+
+
+def iter_csv(header: Sequence[str], rows: Iterable[Sequence]) -> Iterator[str]:
+    """Yield one CSV-encoded line at a time; nothing is buffered beyond the current row."""
+    writer = csv.writer(_Echo())
+    yield writer.writerow(header)
+    for row in rows:
+        yield writer.writerow(row)
+
+
+def iter_xlsx(header: Sequence[str], rows: Iterable[Sequence], title: str = "Export") -> Iterator[bytes]:
+    """
+    Build a write-only workbook in a temp file, then yield it in chunks.
+    Why: write-only mode spills rows to disk, so memory stays flat however many rows are exported.
+    This does not stream: an XLSX is a zip whose directory is written last, so the first byte
+    is yielded only after every row is written and time to first byte grows with the row count.
+    Use `iter_csv` when the client needs bytes immediately.
+    """
+    try:
+        from openpyxl import Workbook
+    except ImportError as e:  # optional dependency
+        raise RuntimeError("XLSX export requires the 'openpyxl' package") from e
+
+    workbook = Workbook(write_only=True)
+    sheet = workbook.create_sheet(title=title[:31])
+    sheet.append(list(header))
+    for row in rows:
+        sheet.append(list(row))
+    with tempfile.TemporaryFile() as handle:
+        workbook.save(handle)
+        handle.seek(0)
+        while chunk := handle.read(XLSX_READ_CHUNK):
+            yield chunk
+
+
+# -------- datasets: (header, row iterator) built from values_list projections --------
+def _stream(queryset, fields: Sequence[str]) -> Iterator[tuple]:
+    return queryset.values_list(*fields).iterator(chunk_size=EXPORT_CHUNK_SIZE)
+
+
+def students_dataset(school_id: int):
+    from main.models import Student, StudentEnrollment
+
+    active = StudentEnrollment.default_objects.filter(
+        student_id=OuterRef("pk"), is_active=True).order_by("-enrollment_date", "-id")
+    queryset = (
+        Student.default_objects.filter(school_id=school_id, is_active=True)
+        .annotate(
+            current_level=Subquery(active.values("class_list__class_level__name")[:1]),
+            current_division=Subquery(active.values("class_list__division")[:1]),
+        )
+        .order_by("user__last_name", "user__first_name", "pk")
+    )
+    header = ["ID", "Student ID", "Reg No", "First Name", "Last Name", "Email",
+              "Date of Birth", "Class", "Division"]
+    fields = ["pk", "student_id", "reg_no", "user__first_name", "user__last_name", "user__email",
+              "date_of_birth", "current_level", "current_division"]
+    return header, _stream(queryset, fields)
+
+
+def staff_dataset(school_id: int):
+    from main.models import Staff
+
+    queryset = Staff.default_objects.filter(school_id=school_id, is_active=True).order_by(
+        "user__last_name", "user__first_name", "pk")
+    header = ["ID", "First Name", "Last Name", "Email", "Department", "Teaching Staff"]
+    fields = ["pk", "user__first_name", "user__last_name", "user__email",
+              "department", "is_teaching_staff"]
+    return header, _stream(queryset, fields)
+
+
+def class_roll_dataset(session):
+    from main.models import SchoolUtilities
+
+    header = ["Class ID", "Level", "Department", "Division", "Capacity", "Active Students"]
+    fields = ["id", "class_level__name", "class_level__department", "division",
+              "capacity", "active_count"]
+    return header, _stream(SchoolUtilities.session_roll_queryset(session), fields)
+
+
+def enrollment_history_dataset(school_id: int, student=None):
+    from main.models import StudentEnrollment
+
+    if student is not None:
+        queryset = student.get_enrollment_history()
+    else:
+        queryset = StudentEnrollment.default_objects.filter(school_id=school_id).order_by(
+            "student_id", "enrollment_date", "pk")
+    header = ["Student ID", "Session", "Level", "Division", "Enrolled", "Left",
+              "Active", "Promoted", "Promotion Date"]
+    fields = ["student_id", "academic_session__name", "class_list__class_level__name",
+              "class_list__division", "enrollment_date", "left_at", "is_active",
+              "promoted", "promotion_date"]
+    return header, _stream(queryset, fields)
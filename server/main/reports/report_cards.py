@@ -0,0 +1,234 @@
+# ==============================================
+# File: main/reports/report_cards.py
+# Purpose: Batch term report cards (class / level / school) rendered across a process pool
+# ==============================================
+from __future__ import annotations
+
+import os
+import shutil
+import tempfile
+import zipfile
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from pathlib import Path
+from typing import Callable, Optional
+
+from django.db import connections
+
+REPORT_CARD_TEMPLATE = "report_cards/report_card.html"
+
+# progress(done, total, student_id) — student_id is None for cards skipped on resume
+ProgressCallback = Callable[[int, int, Optional[int]], None]
+
+
+# -------- data: everything is read up front in the parent, workers never touch the DB --------
+def _scoped_classes(term, class_id: Optional[int] = None, level_id: Optional[int] = None):
+    from main.models import ClassList
+
+    classes = ClassList.default_objects.filter(
+        school_id=term.school_id, academic_session_id=term.academic_session_id)
+    if class_id is not None:
+        classes = classes.filter(pk=class_id)
+    if level_id is not None:
+        classes = classes.filter(class_level_id=level_id)
+    return classes
+
+
+def build_cards(term, class_id: Optional[int] = None, level_id: Optional[int] = None) -> list[dict]:
+    """
+    One plain-dict context per enrolled student, ordered by class then name.
+    Queries: classes, enrollments and term totals, plus one ranking query per class and the
+    school's grading scales on a cold cache — never per student.
+    Why: dicts pickle cheaply to worker processes and keep rendering free of ORM access.
+    """
+    from main.academics.grading import get_scales, pick_scale
+    from main.models import StudentEnrollment
+    from myquiz.models import TermResult
+    from myquiz.ranking import get_ranking, ordinal
+
+    class_ids = list(_scoped_classes(term, class_id, level_id).values_list("pk", flat=True))
+    if not class_ids:
+        return []
+
+    enrollments = (
+        StudentEnrollment.default_objects.filter(class_list_id__in=class_ids, is_active=True)
+        .order_by("class_list__class_level__name", "class_list__division",
+                  "student__user__last_name", "student__user__first_name", "student_id")
+        .values_list("student_id", "student__student_id", "student__reg_no",
+                     "student__user__first_name", "student__user__last_name", "class_list_id",
+                     "class_list__class_level_id", "class_list__class_level__name",
+                     "class_list__division")
+    )
+
+    totals = dict(
+        TermResult.objects.filter(term=term, school_class_id__in=class_ids)
+        .values_list("student_id", "total_score")
+    )
+
+    heading = {
+        "school": term.school.name,
+        "session": term.academic_session.name,
+        "term": term.get_name_display(),
+    }
+    scales = get_scales(term.school_id)
+    rankings: dict[int, dict] = {}
+    cards = []
+    for student_id, code, reg_no, first, last, list_id, level_id, level, division in enrollments:
+        if list_id not in rankings:
+            rankings[list_id] = get_ranking(list_id, term.pk)
+        ranking = rankings[list_id]
+        ranked = ranking["students"].get(student_id)
+        scale = pick_scale(scales, level_id)
+        subjects = []
+        for subject_id, entry in sorted(
+                (ranked or {}).get("subjects", {}).items(),
+                key=lambda item: ranking["subjects"][item[0]]["name"]):
+            summary = ranking["subjects"][subject_id]
+            subjects.append({
+                "name": summary["name"],
+                "marks": entry["marks"],
+                "average": entry["score"],
+                "grade": scale.grade(entry["score"]),
+                "remark": scale.remark(entry["score"]),
+                "position": f"{ordinal(entry['position'])} of {summary['count']}",
+                "class_average": summary["average"],
+                "highest": summary["highest"],
+                "lowest": summary["lowest"],
+            })
+        cards.append({
+            **heading,
+            "student_id": student_id,
+            "code": code or reg_no or str(student_id),
+            "name": f"{first} {last}".strip(),
+            "class_name": f"{level} {division or ''}".strip(),
+            "subjects": subjects,
+            "term_total": totals.get(student_id),
+            "average": ranked["average"] if ranked else None,
+            "position": f"{ordinal(ranked['position'])} of {ranking['size']}" if ranked else None,
+        })
+    return cards
+
+
+# -------- worker side --------
+_worker_template = None
+
+
+def _init_worker(template_name: str) -> None:
+    """Runs once per worker process: set Django up (spawn start method) and compile the template."""
+    global _worker_template
+    import django
+    from django.apps import apps
+
+    if not apps.ready:
+        os.environ.setdefault("DJANGO_SETTINGS_MODULE", "CONFIG.settings")
+        django.setup()
+    from django.template.loader import get_template
+
+    _worker_template = get_template(template_name)
+
+
+def render_card(card: dict, template=None) -> bytes:
+    """Render one card context to PDF bytes with xhtml2pdf."""
+    try:
+        from xhtml2pdf import pisa
+    except ImportError as e:  # optional dependency
+        raise RuntimeError("Report cards require the 'xhtml2pdf' package") from e
+    from io import BytesIO
+
+    if template is None:
+        from django.template.loader import get_template
+        template = get_template(REPORT_CARD_TEMPLATE)
+    buffer = BytesIO()
+    status = pisa.CreatePDF(template.render({"card": card}), dest=buffer)
+    if status.err:
+        raise RuntimeError(f"Could not render report card for student {card['student_id']}")
+    return buffer.getvalue()
+
+
+def _render_part(card: dict, parts_dir: str) -> int:
+    """Write one card to `<parts_dir>/<student_id>.pdf` atomically; returns the student id."""
+    pdf = render_card(card, _worker_template)
+    target = os.path.join(parts_dir, f"{card['student_id']}.pdf")
+    fd, scratch = tempfile.mkstemp(dir=parts_dir, suffix=".tmp")
+    with os.fdopen(fd, "wb") as handle:
+        handle.write(pdf)
+    # rename is atomic: a part file exists only once its card is fully written
+    os.replace(scratch, target)
+    return card["student_id"]
+
+
+# -------- output --------
+def parts_dir_for(output: Path) -> Path:
+    return output.with_name(output.name + ".parts")
+
+
+def _write_zip(output: Path, parts: Path, cards: list[dict]) -> None:
+    with zipfile.ZipFile(output, "w", compression=zipfile.ZIP_STORED) as archive:
+        for card in cards:
+            archive.write(parts / f"{card['student_id']}.pdf",
+                          arcname=f"{card['class_name']}/{card['code']}-{card['student_id']}.pdf".replace(" ", "_"))
+
+
+def _write_merged(output: Path, parts: Path, cards: list[dict]) -> None:
+    try:
+        from pypdf import PdfWriter
+    except ImportError as e:  # optional dependency
+        raise RuntimeError("Merged PDF output requires the 'pypdf' package; use a .zip output") from e
+    writer = PdfWriter()
+    for card in cards:
+        writer.append(str(parts / f"{card['student_id']}.pdf"))
+    with open(output, "wb") as handle:
+        writer.write(handle)
+
+
+def generate_report_cards(
+    term,
+    output: str | os.PathLike,
+    *,
+    class_id: Optional[int] = None,
+    level_id: Optional[int] = None,
+    workers: Optional[int] = None,
+    progress: Optional[ProgressCallback] = None,
+    template_name: str = REPORT_CARD_TEMPLATE,
+) -> dict:
+    """
+    Render report cards for every active student in scope and bundle them into `output`
+    (.zip → one PDF per student; .pdf → a single merged document).
+
+    Per-student PDFs go to `<output>.parts/` first. After a crash, calling again with the
+    same output skips every student whose part already exists and renders only the rest.
+    The parts directory is removed once the bundle is written.
+    """
+    output = Path(output)
+    if output.suffix.lower() not in (".zip", ".pdf"):
+        raise ValueError("Report card output must be a .zip or .pdf file")
+
+    cards = build_cards(term, class_id=class_id, level_id=level_id)
+    parts = parts_dir_for(output)
+    parts.mkdir(parents=True, exist_ok=True)
+
+    done_ids = {int(p.stem) for p in parts.glob("*.pdf") if p.stem.isdigit()}
+    pending = [card for card in cards if card["student_id"] not in done_ids]
+    total = len(cards)
+    done = total - len(pending)
+    if progress and done:
+        progress(done, total, None)
+
+    if pending:
+        # forked workers must not inherit live DB connections
+        connections.close_all()
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                                 initargs=(template_name,)) as pool:
+            futures = [pool.submit(_render_part, card, str(parts)) for card in pending]
+            for future in as_completed(futures):
+                student_id = future.result()
+                done += 1
+                if progress:
+                    progress(done, total, student_id)
+
+    if output.suffix.lower() == ".zip":
+        _write_zip(output, parts, cards)
+    else:
+        _write_merged(output, parts, cards)
+    shutil.rmtree(parts)
+    return {"output": str(output), "total": total, "rendered": len(pending),
+            "resumed": total - len(pending)}
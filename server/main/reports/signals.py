@@ -0,0 +1,25 @@
+# ==============================================
+# File: main/reports/signals.py
+# Purpose: Invalidate cached report/dashboard data when source rows change
+# ==============================================
+from __future__ import annotations
+
+from django.db.models.signals import post_save, post_delete
+
+from main.reports.dashboard import bump_version
+
+# Models counted on the admin dashboard; AcademicSession supplies the current session (name, classes)
+DASHBOARD_SOURCES = ("main.Student", "main.Staff", "main.ClassList", "main.Subject", "main.AcademicSession")
+
+
+def _bump_dashboard_version(sender, instance, **kwargs):
+    """Any create/update/soft-delete/hard-delete of a counted row starts a new stats generation."""
+    if getattr(instance, "school_id", None):
+        bump_version(instance.school_id)
+
+
+for _sender in DASHBOARD_SOURCES:
+    post_save.connect(_bump_dashboard_version, sender=_sender,
+                      dispatch_uid=f"dashboard_version:{_sender}:save")
+    post_delete.connect(_bump_dashboard_version, sender=_sender,
+                        dispatch_uid=f"dashboard_version:{_sender}:delete")
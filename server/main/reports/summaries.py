@@ -0,0 +1,118 @@
+# ==============================================
+# File: main/reports/summaries.py
+# Purpose: Incremental maintenance + full rebuild of DepartmentSummary rows
+# ==============================================
+from __future__ import annotations
+
+from collections import Counter
+from typing import Iterable, Optional
+
+from django.db import transaction
+from django.db.models import Count, F, Q
+from django.db.models.functions import Greatest
+
+# (school_id, academic_session_id, department)
+SummaryKey = tuple[int, int, str]
+
+
+def _ensure_rows(keys: Iterable[SummaryKey]) -> None:
+    """Insert missing summary rows (zeroed) so deltas can be applied with UPDATE."""
+    from main.models import DepartmentSummary
+
+    DepartmentSummary.default_objects.bulk_create(
+        [DepartmentSummary(school_id=school_id, academic_session_id=session_id, department=department)
+         for school_id, session_id, department in keys],
+        ignore_conflicts=True,
+    )
+
+
+def _apply(field: str, deltas: dict[SummaryKey, int]) -> None:
+    """
+    Add `delta` to `field` on each key's row with F() expressions.
+    Why: increments happen in SQL, so concurrent enrollments never lose updates.
+    """
+    from main.models import DepartmentSummary
+
+    deltas = {key: delta for key, delta in deltas.items() if delta}
+    if not deltas:
+        return
+    _ensure_rows(deltas)
+    for (_, session_id, department), delta in deltas.items():
+        DepartmentSummary.default_objects.filter(
+            academic_session_id=session_id, department=department
+        ).update(**{field: Greatest(F(field) + delta, 0)})
+
+
+def _keys_for_classes(class_ids: Iterable[int]) -> dict[int, SummaryKey]:
+    """{class_list_id: (school_id, session_id, department)} in one query."""
+    from main.models import ClassList
+
+    return {
+        pk: (school_id, session_id, department)
+        for pk, school_id, session_id, department in ClassList.default_objects.filter(
+            pk__in=list(class_ids)
+        ).values_list("pk", "school_id", "academic_session_id", "class_level__department")
+    }
+
+
+def _roll_up(field: str, deltas: dict[int, int]) -> None:
+    """Sum {class_list_id: delta} per department key and apply it to `field`."""
+    deltas = {pk: delta for pk, delta in deltas.items() if pk and delta}
+    if not deltas:
+        return
+    rolled: Counter = Counter()
+    for pk, key in _keys_for_classes(deltas).items():
+        rolled[key] += deltas[pk]
+    _apply(field, rolled)
+
+
+def apply_class_deltas(deltas: dict[int, int]) -> None:
+    """Roll {class_list_id: delta} active-enrollment changes up into their departments."""
+    _roll_up("active_students", deltas)
+
+
+def apply_promoted_deltas(deltas: dict[int, int]) -> None:
+    """Roll {source class_list_id: delta} promotion flags up into their departments."""
+    _roll_up("promoted", deltas)
+
+
+@transaction.atomic
+def rebuild(school_id: Optional[int] = None) -> int:
+    """
+    Recompute every summary row (optionally for one school) from `StudentEnrollment`.
+    Returns the number of rows written.
+    """
+    from main.models import DepartmentSummary, StudentEnrollment
+
+    enrollments = StudentEnrollment.default_objects.all()
+    summaries = DepartmentSummary.default_objects.all()
+    if school_id is not None:
+        enrollments = enrollments.filter(school_id=school_id)
+        summaries = summaries.filter(school_id=school_id)
+
+    rows = (
+        enrollments.order_by()
+        .values("school_id", "academic_session_id", "class_list__class_level__department")
+        .annotate(
+            active=Count("pk", filter=Q(is_active=True)),
+            promoted=Count("pk", filter=Q(promoted=True)),
+        )
+    )
+    # zero rows that no longer have enrollments, then upsert the fresh figures
+    summaries.update(active_students=0, promoted=0)
+    written = DepartmentSummary.default_objects.bulk_create(
+        [
+            DepartmentSummary(
+                school_id=row["school_id"],
+                academic_session_id=row["academic_session_id"],
+                department=row["class_list__class_level__department"],
+                active_students=row["active"],
+                promoted=row["promoted"],
+            )
+            for row in rows
+        ],
+        update_conflicts=True,
+        unique_fields=["academic_session", "department"],
+        update_fields=["active_students", "promoted", "updated_at"],
+    )
+    return len(written)
@@ -0,0 +1,169 @@
+# ==============================================
+# File: main/result/gpa.py
+# Purpose: Table-driven grading + set-based (SQL) and vectorized (NumPy) GPA/CGPA
+# ==============================================
+from __future__ import annotations
+
+from django.db.models import Case, F, FloatField, Sum, Value, When
+from django.db.models.functions import Cast, NullIf, Round
+
+from main.academics.grading import DEFAULT_SCALE, CompiledScale, scale_for
+
+# One compiled scale drives per-row grading, the SQL CASE and the NumPy lookup, so they cannot drift.
+# Callers resolve it per school (`student_scale`); DEFAULT_SCALE is only the fallback.
+
+
+def student_scale(student, class_level_id=None) -> CompiledScale:
+    """
+    Grading scale of the student's school (`scale_for`). Course levels here are degree names,
+    not class levels, so the school default applies unless `class_level_id` is given.
+    """
+    return scale_for(student.student.school_id, class_level_id)
+
+
+# -------- per row --------
+def grade_for(total, scale: CompiledScale = DEFAULT_SCALE) -> str:
+    return scale.grade(total)
+
+
+def point_for(grade: str, scale: CompiledScale = DEFAULT_SCALE) -> float:
+    """Grade point for a letter grade (F / NG → 0)."""
+    return scale.point_for_grade(grade)
+
+
+# -------- SQL: whole cohorts in one aggregate query --------
+def grade_point_expression(field: str = "grade", scale: CompiledScale = DEFAULT_SCALE):
+    """CASE expression mapping the stored letter grade to its point."""
+    return Case(
+        *[When(**{field: grade}, then=Value(point)) for grade, point in zip(scale.grades, scale.points)],
+        default=Value(0.0),
+        output_field=FloatField(),
+    )
+
+
+def quality_points_expression(scale: CompiledScale = DEFAULT_SCALE):
+    """credit × grade point for one registration."""
+    return Cast(F("course__credit"), FloatField()) * grade_point_expression(scale=scale)
+
+
+def gpa_by_student(taken_courses, scale: CompiledScale = DEFAULT_SCALE) -> dict[int, float]:
+    """
+    {student_id: GPA} for every student in `taken_courses`, computed in a single GROUP BY.
+    Pass a semester/level-filtered queryset for GPA, or all of a student's registrations for CGPA.
+    """
+    rows = (
+        taken_courses.order_by()
+        .values("student_id")
+        .annotate(
+            quality=Sum(quality_points_expression(scale)),
+            credits=Sum(Cast(F("course__credit"), FloatField())),
+        )
+        .annotate(gpa=Round(F("quality") / NullIf(F("credits"), 0.0), 2))
+        .values_list("student_id", "gpa")
+    )
+    return {student_id: gpa or 0 for student_id, gpa in rows}
+
+
+def semester_gpas(semester, level=None, students=None, scale: CompiledScale = DEFAULT_SCALE) -> dict[int, float]:
+    from .models import TakenCourse
+
+    queryset = TakenCourse.objects.filter(course__semester=semester)
+    if level is not None:
+        queryset = queryset.filter(course__level=level)
+    if students is not None:
+        queryset = queryset.filter(student__in=students)
+    return gpa_by_student(queryset, scale)
+
+
+def cgpas(students=None, scale: CompiledScale = DEFAULT_SCALE) -> dict[int, float]:
+    from .models import TakenCourse
+
+    queryset = TakenCourse.objects.all()
+    if students is not None:
+        queryset = queryset.filter(student__in=students)
+    return gpa_by_student(queryset, scale)
+
+
+# -------- NumPy: recalculate everyone after a grading-scale change --------
+def grade_arrays(totals, credits, scale: CompiledScale = DEFAULT_SCALE):
+    """
+    Vectorized grading: returns (band index, grade point, quality points) arrays.
+    Band 0 is the scale's fail band. One `searchsorted` replaces the per-row ladder.
+    """
+    import numpy as np
+
+    index = scale.indices_many(totals)
+    grade_point = np.asarray(scale.points, dtype=float)[index]
+    return index, grade_point, grade_point * np.asarray(credits, dtype=float)
+
+
+def gpa_arrays(student_ids, credits, quality):
+    """(unique student ids, GPA per student) via bincount sums — no Python loop over rows."""
+    import numpy as np
+
+    uniques, inverse = np.unique(np.asarray(student_ids), return_inverse=True)
+    credit_sum = np.bincount(inverse, weights=np.asarray(credits, dtype=float))
+    quality_sum = np.bincount(inverse, weights=quality)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        gpa = np.where(credit_sum > 0, np.round(quality_sum / credit_sum, 2), 0.0)
+    return uniques, gpa
+
+
+def recalculate_all(taken_courses=None, scale: CompiledScale | None = None, batch_size: int = 2000) -> dict:
+    """
+    Re-grade every registration in `taken_courses` and write grade/point/comment back, with
+    `scale` or, by default, each student's school scale (`scale_for`).
+    Rows are read once as a projection; grading and per-student CGPA are computed with NumPy.
+    Returns {"rows": n, "cgpa": {student_id: cgpa}}.
+    """
+    import numpy as np
+
+    from .models import FAIL, PASS, TakenCourse
+
+    if taken_courses is None:
+        taken_courses = TakenCourse.objects.all()
+    rows = list(taken_courses.order_by().values_list(
+        "pk", "student_id", "total", "course__credit", "student__student__school_id"))
+    if not rows:
+        return {"rows": 0, "cgpa": {}}
+
+    pks, student_ids, totals, credits, school_ids = (np.array(column) for column in zip(*rows))
+    totals, credits = totals.astype(float), credits.astype(float)
+    grades = np.empty(len(rows), dtype=object)
+    fails = np.zeros(len(rows), dtype=bool)
+    quality = np.zeros(len(rows))
+    # one vectorized pass per school scale
+    for school_id in np.unique(school_ids):
+        rows_of = school_ids == school_id
+        school_scale = scale or scale_for(int(school_id))
+        index, _, quality[rows_of] = grade_arrays(totals[rows_of], credits[rows_of], school_scale)
+        grades[rows_of] = np.asarray(school_scale.grades, dtype=object)[index]
+        fails[rows_of] = index == 0
+
+    TakenCourse.objects.bulk_update(
+        [
+            TakenCourse(pk=int(pk), grade=grade, point=round(float(q), 2), comment=FAIL if fail else PASS)
+            for pk, grade, q, fail in zip(pks, grades, quality, fails)
+        ],
+        ["grade", "point", "comment"],
+        batch_size=batch_size,
+    )
+    uniques, gpa = gpa_arrays(student_ids, credits, quality)
+    return {"rows": len(rows), "cgpa": dict(zip(uniques.tolist(), gpa.tolist()))}
+
+
+def student_quality_points(student, semester=None, level=None,
+                           scale: CompiledScale | None = None) -> tuple[float, float]:
+    """(quality points, registered credits) for one student in one aggregate query, by their school's scale."""
+    from .models import TakenCourse
+
+    queryset = TakenCourse.objects.filter(student=student)
+    if semester is not None:
+        queryset = queryset.filter(course__semester=semester)
+    if level is not None:
+        queryset = queryset.filter(course__level=level)
+    totals = queryset.aggregate(
+        quality=Sum(quality_points_expression(scale or student_scale(student))),
+        credits=Sum(Cast(F("course__credit"), FloatField())),
+    )
+    return totals["quality"] or 0.0, totals["credits"] or 0.0
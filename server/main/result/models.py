@@ -1,10 +1,13 @@
 from django.db import models
 from django.urls import reverse
+from django.utils.functional import cached_property
 
 from accounts.models import Student
 from core.models import Semester
 from course.models import Course
 
+from .gpa import grade_for, point_for, student_quality_points, student_scale
+
 YEARS = (
     (1, "1"),
     (2, "2"),
@@ -111,40 +114,17 @@ class TakenCourse(models.Model):
             + float(final_exam)
         )
 
-    # @staticmethod
+    @cached_property
+    def grading_scale(self):
+        """The student's school scale; grade, point and comment all read it."""
+        return student_scale(self.student)
+
     def get_grade(self, total):
-        # total = float(assignment) + float(mid_exam) + float(quiz) + float(attendance) + float(final_exam)
-        # total = self.get_total(assignment=assignment, mid_exam=mid_exam, quiz=quiz, attendance=attendance, final_exam=final_exam)
-        # total = total
-        if total >= 90:
-            grade = A_PLUS
-        elif total >= 85:
-            grade = A
-        elif total >= 80:
-            grade = A_MINUS
-        elif total >= 75:
-            grade = B_PLUS
-        elif total >= 70:
-            grade = B
-        elif total >= 65:
-            grade = B_MINUS
-        elif total >= 60:
-            grade = C_PLUS
-        elif total >= 55:
-            grade = C
-        elif total >= 50:
-            grade = C_MINUS
-        elif total >= 45:
-            grade = D
-        elif total < 45:
-            grade = F
-        else:
-            grade = NG
-        return grade
+        return grade_for(total, self.grading_scale)
 
     # @staticmethod
     def get_comment(self, grade):
-        if grade == F or grade == NG:
+        if grade == self.grading_scale.grades[0] or grade == NG:
             comment = FAIL
         # elif grade == NG:
         #     comment = FAIL
@@ -153,128 +133,29 @@ class TakenCourse(models.Model):
         return comment
 
     def get_point(self, grade):
-        p = 0
-        # point = 0
-        # for i in student:
-        credit = self.course.credit
-        if self.grade == A_PLUS:
-            point = 4
-        elif self.grade == A:
-            point = 4
-        elif self.grade == A_MINUS:
-            point = 3.75
-        elif self.grade == B_PLUS:
-            point = 3.5
-        elif self.grade == B:
-            point = 3
-        elif self.grade == B_MINUS:
-            point = 2.75
-        elif self.grade == C_PLUS:
-            point = 2.5
-        elif self.grade == C:
-            point = 2
-        elif self.grade == C_MINUS:
-            point = 1.75
-        elif self.grade == D:
-            point = 1
-        else:
-            point = 0
-        p += int(credit) * point
-        return p
+        """Quality points for this registration: course credit * grade point."""
+        return int(self.course.credit) * point_for(grade, self.grading_scale)
 
     def calculate_gpa(self, total_credit_in_semester):
         current_semester = Semester.objects.get(is_current_semester=True)
-        student = TakenCourse.objects.filter(
-            student=self.student,
-            course__level=self.student.level,
-            course__semester=current_semester,
+        quality, _ = student_quality_points(
+            self.student, semester=current_semester, level=self.student.level, scale=self.grading_scale
         )
-        p = 0
-        point = 0
-        for i in student:
-            credit = i.course.credit
-            if i.grade == A_PLUS:
-                point = 4
-            elif i.grade == A:
-                point = 4
-            elif i.grade == A_MINUS:
-                point = 3.75
-            elif i.grade == B_PLUS:
-                point = 3.5
-            elif i.grade == B:
-                point = 3
-            elif i.grade == B_MINUS:
-                point = 2.75
-            elif i.grade == C_PLUS:
-                point = 2.5
-            elif i.grade == C:
-                point = 2
-            elif i.grade == C_MINUS:
-                point = 1.75
-            elif i.grade == D:
-                point = 1
-            else:
-                point = 0
-            p += int(credit) * point
         try:
-            gpa = p / total_credit_in_semester
+            gpa = quality / total_credit_in_semester
             return round(gpa, 2)
         except ZeroDivisionError:
             return 0
 
     def calculate_cgpa(self):
         current_semester = Semester.objects.get(is_current_semester=True)
-        previousResult = Result.objects.filter(
-            student__id=self.student.id, level__lt=self.student.level
-        )
-        previous_cgpa = 0
-        for i in previousResult:
-            if i.cgpa is not None:
-                previous_cgpa += i.cgpa
-        cgpa = 0
-        if str(current_semester) == SECOND:
-            first_sem_gpa = 0.0
-            sec_sem_gpa = 0.0
-            try:
-                first_sem_result = Result.objects.get(
-                    student=self.student.id, semester=FIRST, level=self.student.level
-                )
-                first_sem_gpa += first_sem_result.gpa
-            except:
-                first_sem_gpa = 0
-
-            try:
-                sec_sem_result = Result.objects.get(
-                    student=self.student.id, semester=SECOND, level=self.student.level
-                )
-                sec_sem_gpa += sec_sem_result.gpa
-            except:
-                sec_sem_gpa = 0
-
-            taken_courses = TakenCourse.objects.filter(
-                student=self.student, student__level=self.student.level
-            )
-            taken_course_credits = 0
-            taken_course_points = 0
-            for i in taken_courses:
-                taken_course_points += float(i.point)
-            for i in taken_courses:
-                taken_course_credits += int(i.course.credit)
-            # cgpa = (first_sem_gpa + sec_sem_gpa) / 2
-
-            print("taken_course_points = ", taken_course_points)
-            print("taken_course_credits = ", taken_course_credits)
-            print("first_sem_gpa = ", first_sem_gpa)
-            print("sec_sem_gpa = ", sec_sem_gpa)
-            print("cgpa = ", round(taken_course_points / taken_course_credits, 2))
-
-            try:
-                cgpa = taken_course_points / taken_course_credits
-                return round(cgpa, 2)
-            except ZeroDivisionError:
-                return 0
-
-            # return round(cgpa, 2)
+        if str(current_semester) != SECOND:
+            return None
+        quality, credits = student_quality_points(self.student, scale=self.grading_scale)
+        try:
+            return round(quality / credits, 2)
+        except ZeroDivisionError:
+            return 0
 
 
 class Result(models.Model):
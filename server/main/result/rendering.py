@@ -0,0 +1,180 @@
+# ==============================================
+# File: main/result/rendering.py
+# Purpose: Result-sheet PDF render service (one table, shared styles, stored under MEDIA_ROOT by score hash)
+# ==============================================
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import tempfile
+from io import BytesIO
+from typing import Iterable, Optional, Sequence
+
+from django.conf import settings
+
+from reportlab.lib import colors
+from reportlab.lib.enums import TA_CENTER, TA_RIGHT
+from reportlab.lib.styles import ParagraphStyle, getSampleStyleSheet
+from reportlab.lib.units import inch
+from reportlab.platypus import Image, Paragraph, SimpleDocTemplate, Spacer, Table, TableStyle
+
+cm = 2.54
+
+# rendered sheets live on disk, shared by every web worker:
+# <MEDIA_ROOT>/result_sheet/<course>/<lecturer key>/<digest>.pdf
+RESULT_SHEET_DIR = "result_sheet"
+# the headings that go into the digest; the lecturer keys the folder instead and the logo is a static asset
+DIGEST_META_KEYS = ("semester", "session", "level")
+
+HEADER = ("S/N", "ID NO.", "FULL NAME", "TOTAL", "GRADE", "POINT", "COMMENT")
+COL_WIDTHS = [0.5 * inch, 1.1 * inch, 2.2 * inch, 0.7 * inch, 0.7 * inch, 0.7 * inch, 0.9 * inch]
+
+# ---- styles: built once per process, not per request/row ----
+_SAMPLE = getSampleStyleSheet()
+STYLE_NORMAL = _SAMPLE["Normal"]
+STYLE_TITLE = ParagraphStyle(
+    name="ResultSheetTitle", parent=STYLE_NORMAL, alignment=TA_CENTER,
+    fontName="Helvetica", fontSize=12, leading=15)
+STYLE_SUBTITLE = ParagraphStyle(
+    name="ResultSheetSubtitle", parent=STYLE_TITLE, fontSize=10)
+STYLE_RIGHT = ParagraphStyle(
+    name="ResultSheetRight", parent=STYLE_NORMAL, alignment=TA_RIGHT)
+TABLE_STYLE = [
+    ("BACKGROUND", (0, 0), (-1, 0), colors.black),
+    ("TEXTCOLOR", (1, 0), (-1, 0), colors.white),
+    ("TEXTCOLOR", (0, 0), (0, 0), colors.cyan),
+    ("ALIGN", (0, 0), (-1, 0), "CENTER"),
+    ("VALIGN", (0, 0), (-1, -1), "MIDDLE"),
+    ("INNERGRID", (0, 0), (-1, -1), 0.05, colors.black),
+    ("BOX", (0, 0), (-1, -1), 1, colors.black),
+]
+
+
+# ---- data ----
+def result_sheet_rows(course_id: int) -> list[tuple]:
+    """(id no., full name, total, grade, point, comment) per student in one projected query."""
+    from .models import TakenCourse  # lazy: keep the renderer importable on its own
+
+    return [
+        (username.upper(), f"{first} {last}".strip().capitalize(), total, grade, point, comment)
+        for username, first, last, total, grade, point, comment in TakenCourse.objects.filter(
+            course_id=course_id
+        ).order_by("student__student__username").values_list(
+            "student__student__username",
+            "student__student__first_name",
+            "student__student__last_name",
+            "total", "grade", "point", "comment",
+        )
+    ]
+
+
+def scores_digest(meta: dict, rows: Iterable[Sequence]) -> str:
+    """Content hash of the sheet's headings and rows; changes only when scores (or headings) do."""
+    headings = {key: meta.get(key) for key in DIGEST_META_KEYS}
+    payload = json.dumps({"meta": headings, "rows": [list(r) for r in rows]}, default=str, sort_keys=True)
+    return hashlib.sha256(payload.encode()).hexdigest()
+
+
+def lecturer_key(lecturer: str) -> str:
+    """Folder name for one lecturer's copy of a sheet (their name is printed on it)."""
+    return hashlib.sha256(str(lecturer).encode()).hexdigest()[:16]
+
+
+# ---- rendering ----
+def render_result_sheet(meta: dict, rows: Sequence[Sequence]) -> bytes:
+    """
+    Build the PDF in memory.
+    `meta` keys: semester, session, lecturer, level and optionally logo (an image path).
+    Rows as returned by `result_sheet_rows`.
+    """
+    buffer = BytesIO()
+    doc = SimpleDocTemplate(
+        buffer, rightMargin=0, leftMargin=6.5 * cm, topMargin=0.3 * cm, bottomMargin=0)
+
+    story = [Spacer(1, 0.2)]
+    if meta.get("logo"):
+        logo = Image(meta["logo"], 1 * inch, 1 * inch)
+        logo.__setattr__("_offs_x", -200)
+        logo.__setattr__("_offs_y", -45)
+        story.append(logo)
+    story += [
+        Paragraph(f"<b> {meta['semester']} Semester {meta['session']} Result Sheet</b>".upper(), STYLE_TITLE),
+        Spacer(1, 0.1 * inch),
+        Paragraph(f"<b>Course lecturer: {meta['lecturer']}</b>".upper(), STYLE_SUBTITLE),
+        Spacer(1, 0.1 * inch),
+        Paragraph(f"<b>Level: </b>{meta['level']}".upper(), STYLE_SUBTITLE),
+        Spacer(1, 0.6 * inch),
+    ]
+
+    data = [HEADER]
+    style = list(TABLE_STYLE)
+    no_of_pass = no_of_fail = 0
+    for n, (id_no, full_name, total, grade, point, comment) in enumerate(rows, start=1):
+        # a Paragraph wraps long names inside the column instead of overflowing it
+        data.append((n, id_no, Paragraph(full_name, STYLE_NORMAL), total, grade, point, comment))
+        if grade == "F":
+            style.append(("TEXTCOLOR", (0, n), (-1, n), colors.red))
+        if comment == "PASS":
+            no_of_pass += 1
+        elif comment == "FAIL":
+            no_of_fail += 1
+    # one table for all students; header repeats on each page
+    story.append(Table(data, colWidths=COL_WIDTHS, repeatRows=1, style=TableStyle(style)))
+
+    story.append(Spacer(1, 1 * inch))
+    story.append(Table([
+        [Paragraph("<b>Date:</b>_____________________________", STYLE_NORMAL),
+         Paragraph(f"<b>No. of PASS:</b> {no_of_pass}", STYLE_RIGHT)],
+        [Paragraph("<b>Siganture / Stamp:</b> _____________________________", STYLE_NORMAL),
+         Paragraph(f"<b>No. of FAIL: </b>{no_of_fail}", STYLE_RIGHT)],
+    ]))
+
+    doc.build(story)
+    return buffer.getvalue()
+
+
+# ---- storage ----
+def sheet_path(course_id: int, lecturer: str, digest: str) -> str:
+    return os.path.join(
+        settings.MEDIA_ROOT, RESULT_SHEET_DIR, str(course_id), lecturer_key(lecturer), f"{digest}.pdf")
+
+
+def get_cached_result_sheet(course_id: int, lecturer: str, digest: str) -> Optional[bytes]:
+    try:
+        with open(sheet_path(course_id, lecturer, digest), "rb") as f:
+            return f.read()
+    except FileNotFoundError:
+        return None
+
+
+def _store(course_id: int, lecturer: str, digest: str, pdf: bytes) -> None:
+    """Write atomically (readers never see half a file), then drop this lecturer's superseded sheets."""
+    path = sheet_path(course_id, lecturer, digest)
+    folder = os.path.dirname(path)
+    os.makedirs(folder, exist_ok=True)
+    fd, tmp = tempfile.mkstemp(dir=folder, suffix=".tmp")
+    with os.fdopen(fd, "wb") as f:
+        f.write(pdf)
+    os.replace(tmp, path)
+    for name in os.listdir(folder):
+        if name.endswith(".pdf") and name != os.path.basename(path):
+            try:
+                os.remove(os.path.join(folder, name))
+            except FileNotFoundError:
+                pass  # removed by a concurrent render
+
+
+def render_and_cache(course_id: int, meta: dict, rows: Optional[Sequence[Sequence]] = None) -> tuple[str, bytes]:
+    """
+    Return (digest, pdf) for the sheet, rendering (and reading rows if not given) only when no
+    sheet with the same headings and scores is stored yet for this lecturer.
+    """
+    if rows is None:
+        rows = result_sheet_rows(course_id)
+    digest = scores_digest(meta, rows)
+    pdf = get_cached_result_sheet(course_id, meta["lecturer"], digest)
+    if pdf is None:
+        pdf = render_result_sheet(meta, rows)
+        _store(course_id, meta["lecturer"], digest, pdf)
+    return digest, pdf
@@ -1,4 +1,6 @@
 # -------- Signals (pre/post save, post delete) --------
+from datetime import date, datetime, time
+from decimal import Decimal
 from typing import Any
 
 from django.db.models.signals import pre_save, post_save, post_delete
@@ -1,3 +1,1293 @@
-from django.test import TestCase
+import json
+import random
+import tempfile
+import threading
+import time
+import zipfile
+from collections import Counter
+from datetime import date, timedelta
+from io import StringIO
+from pathlib import Path
+from unittest import mock, skipUnless
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.exceptions import ValidationError
+from django.db import OperationalError, connection, transaction
+from django.test import TestCase, TransactionTestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+
+from main.models import (
+    School, User, AcademicSession, ClassLevel, ClassList, Student, StudentEnrollment,
+    DepartmentSummary, GradingScale, SchoolUtilities, Subject, Term,
+    QuestionBankItem, QuestionBankOption, QuizAnswer, QuizAttempt, QuizAttemptCounter, QuizAudience,
+    QuizOption, QuizPaper,
+    QuizQuestion,
+)
+from main.models import Quiz as Assessment
+from main.academics.promotion import PromotionPlanner
+from main.academics.applicability import MATRIX_CACHE_KEY, applicable_subject_ids, get_matrix
+from main.academics.grading import DEFAULT_SCALE, PRESETS, compile_bands, scale_for
+from main.assessments.attempts import check_eligibility, claim_attempt, start_attempt
+from main.assessments.audience import rebuild as rebuild_audience
+from main.assessments.bank import add_to_quiz, generate_quiz
+from main.assessments.analytics import analyze_quiz, get_analysis
+from main.assessments.ingestion import save_answers
+from main.assessments.ordering import SplitMix64, attempt_paper, order_paper, shuffled
+from main.assessments.marking import get_answer_key, grade_attempts, grade_quiz
+from main.assessments.papers import compile_quiz, get_paper_json, paper_for_attempt, publish
+from main.assessments.search import fts_available, rebuild as rebuild_search, search_questions
+from main.assessments.timer import GRACE, remaining, sweep
+from main.reports.dashboard import VERSION_CACHE_KEY, bump_version, get_admin_stats
+from main.reports.report_cards import build_cards, generate_report_cards, parts_dir_for
+from main.reports.summaries import rebuild
+from main.result import rendering
+from main.result.gpa import gpa_arrays, grade_arrays, grade_for, point_for
+from myquiz.models import Quiz, Result, TermResult
+
+try:
+    import xhtml2pdf  # noqa: F401
+    HAS_XHTML2PDF = True
+except ImportError:
+    HAS_XHTML2PDF = False
+
+
+def create_school_with_class(capacity=1000):
+    """Helper: a school with one session and one JS1 class."""
+    owner = User.objects.create_user(
+        username="owner@example.com", email="owner@example.com", password="testpass123", role="owner")
+    school = School.objects.create(
+        name="Test School", owner=owner, phone="1234567890", email="school@example.com")
+    ClassLevel.create_default_levels(school)
+    session = AcademicSession.objects.create(
+        school=school, start_date=date(2024, 9, 1), end_date=date(2025, 7, 31))
+    level = ClassLevel.default_objects.get(school=school, name="JS1")
+    class_list = ClassList.default_objects.create(
+        school=school, academic_session=session, class_level=level, capacity=capacity)
+    return school, session, class_list
+
+
+def create_students(school, count, class_list=None, offset=0):
+    """Helper: bulk-create students (optionally enrolled) without per-row saves."""
+    users = User.objects.bulk_create([
+        User(username=f"student{i}@example.com", email=f"student{i}@example.com",
+             role="student", school=school)
+        for i in range(offset, offset + count)
+    ])
+    students = Student.default_objects.bulk_create([
+        Student(school=school, user=user, date_of_birth=date(2012, 1, 1))
+        for user in users
+    ])
+    if class_list is not None:
+        StudentEnrollment.default_objects.bulk_create([
+            StudentEnrollment(school=school, student=student, class_list=class_list,
+                              academic_session_id=class_list.academic_session_id)
+            for student in students
+        ])
+    return students
+
+
+def create_assessment(school, session, questions=3, options=4, **fields):
+    """Helper: an (unpublished) quiz whose first option of every question is correct."""
+    subject = Subject.default_objects.get_or_create(school=school, name="Mathematics")[0]
+    fields.setdefault("title", "Quiz")
+    quiz = Assessment.default_objects.create(
+        school=school, academic_session=session, subject=subject, **fields)
+    created = QuizQuestion.default_objects.bulk_create([
+        QuizQuestion(school=school, quiz=quiz, text=f"Q{n}", order=n) for n in range(questions)
+    ])
+    QuizOption.default_objects.bulk_create([
+        QuizOption(school=school, question=question, text=f"O{k}", order=k, is_correct=k == 0)
+        for question in created for k in range(options)
+    ])
+    return quiz
+
+
+class CurrentEnrollmentPrefetchTests(TestCase):
+    """`Student.objects.with_current_enrollment()` keeps student lists at a constant query count."""
+
+    def setUp(self):
+        self.school, self.session, self.class_list = create_school_with_class()
+
+    def _touch_current_class(self):
+        qs = Student.default_objects.select_related("user").with_current_enrollment()
+        return [
+            (s.user.email, s.current_class.name, s.current_enrollment.academic_session.name)
+            for s in qs
+        ]
+
+    def test_500_students_cost_two_queries(self):
+        create_students(self.school, 500, self.class_list)
+        with self.assertNumQueries(2):
+            rows = self._touch_current_class()
+        self.assertEqual(len(rows), 500)
+        self.assertTrue(all(name == self.class_list.name for _, name, _ in rows))
+
+    def test_query_count_does_not_grow_with_students(self):
+        create_students(self.school, 10, self.class_list)
+        with self.assertNumQueries(2):
+            self._touch_current_class()
+        create_students(self.school, 490, self.class_list, offset=10)
+        with self.assertNumQueries(2):
+            self._touch_current_class()
+
+    def test_prefetch_ignores_inactive_enrollments(self):
+        enrolled, withdrawn = create_students(self.school, 2, self.class_list)
+        StudentEnrollment.default_objects.get(student=withdrawn).withdraw()
+        students = {
+            s.pk: s for s in Student.default_objects.with_current_enrollment()}
+        self.assertEqual(
+            students[enrolled.pk].current_class.pk, self.class_list.pk)
+        self.assertIsNone(students[withdrawn.pk].current_enrollment)
+        self.assertIsNone(students[withdrawn.pk].current_class)
+
+    def test_property_falls_back_to_query_without_prefetch(self):
+        student, = create_students(self.school, 1, self.class_list)
+        student = Student.default_objects.get(pk=student.pk)
+        with self.assertNumQueries(1):
+            self.assertEqual(
+                student.current_enrollment.class_list_id, self.class_list.pk)
+
+
+class ConcurrentEnrollmentTests(TransactionTestCase):
+    """`StudentEnrollment.enroll` must never overfill a class under concurrent admissions."""
+
+    THREADS = 50
+    SEATS = 40
+
+    def setUp(self):
+        self.school, self.session, self.class_list = create_school_with_class(
+            capacity=self.SEATS)
+        self.students = create_students(self.school, self.THREADS)
+
+    def _enroll_all_concurrently(self):
+        outcomes = {"enrolled": 0, "capacity": 0}
+        lock = threading.Lock()
+        barrier = threading.Barrier(self.THREADS)
+
+        def worker(student):
+            if connection.vendor == "sqlite":
+                # the shared-cache test DB takes table-level read locks; let readers skip them so
+                # only the writes (where capacity is enforced) contend
+                with connection.cursor() as cursor:
+                    cursor.execute("PRAGMA read_uncommitted = 1")
+            barrier.wait()
+            try:
+                backoff = 0.001
+                while True:
+                    try:
+                        StudentEnrollment.enroll(student, self.class_list)
+                        result = "enrolled"
+                        break
+                    except ValidationError as e:
+                        result = e.code
+                        break
+                    except OperationalError:
+                        # SQLite serializes writers; a locked database is retried with jittered
+                        # backoff (not counted as a failure) so contending writers do not livelock
+                        time.sleep(random.uniform(0, backoff))
+                        backoff = min(backoff * 2, 0.1)
+                with lock:
+                    outcomes[result] += 1
+            finally:
+                connection.close()
+
+        threads = [threading.Thread(target=worker, args=(s,))
+                   for s in self.students]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        return outcomes
+
+    def test_50_threads_never_overfill_40_seats(self):
+        outcomes = self._enroll_all_concurrently()
+
+        self.class_list.refresh_from_db()
+        active = StudentEnrollment.default_objects.filter(
+            class_list=self.class_list, is_active=True).count()
+        self.assertEqual(outcomes["enrolled"], self.SEATS)
+        self.assertEqual(outcomes["capacity"], self.THREADS - self.SEATS)
+        self.assertEqual(active, self.SEATS)
+        self.assertEqual(self.class_list.active_count, self.SEATS)
+
+
+class EnrollmentCounterTests(TestCase):
+    """`ClassList.active_count` follows every save and delete path and can be reconciled from the rows."""
+
+    def setUp(self):
+        self.school, self.session, self.class_list = create_school_with_class()
+        self.other_class = ClassList.default_objects.create(
+            school=self.school, academic_session=self.session, class_level=self.class_list.class_level,
+            division="B", capacity=10)
+        self.enrollments = [StudentEnrollment.enroll(student, self.class_list)
+                            for student in create_students(self.school, 3)]
+
+    def _counts(self):
+        return [ClassList.default_objects.get(pk=c.pk).active_count for c in (self.class_list, self.other_class)]
+
+    def test_enroll_transfer_withdraw(self):
+        self.assertEqual(self._counts(), [3, 0])
+        StudentEnrollment.enroll(self.enrollments[0].student, self.other_class)
+        self.assertEqual(self._counts(), [2, 1])
+        self.enrollments[1].withdraw()
+        self.assertEqual(self._counts(), [1, 1])
+        # re-saving an unchanged row moves nothing
+        self.enrollments[2].save()
+        self.assertEqual(self._counts(), [1, 1])
+
+    def test_saves_without_a_load_snapshot(self):
+        first, second, third = (e.pk for e in self.enrollments)
+        # deferred is_active/class_list: the stored row tells what was counted
+        deferred = StudentEnrollment.default_objects.only("pk", "remarks").get(pk=first)
+        deferred.remarks = "checked"
+        deferred.save()
+        self.assertEqual(self._counts(), [3, 0])
+        deferred = StudentEnrollment.default_objects.defer("is_active").get(pk=first)
+        deferred.class_list = self.other_class
+        deferred.save()
+        self.assertEqual(self._counts(), [2, 1])
+        # an instance built with the pk of an existing row
+        row = StudentEnrollment.default_objects.filter(pk=second).values()[0]
+        StudentEnrollment(**row).save()
+        self.assertEqual(self._counts(), [2, 1])
+        StudentEnrollment.default_objects.only("pk").get(pk=third).delete()
+        self.assertEqual(self._counts(), [1, 1])
+
+    def test_reconcile_enrollment_counts(self):
+        from django.core.management import call_command
+
+        ClassList.default_objects.filter(pk=self.class_list.pk).update(active_count=7)
+        out = StringIO()
+        call_command("reconcile_enrollment_counts", "--dry-run", stdout=out)
+        self.assertIn(f"ClassList {self.class_list.pk}: stored=7 actual=3 drift=+4", out.getvalue())
+        self.assertEqual(self._counts(), [7, 0])
+        call_command("reconcile_enrollment_counts", f"--school={self.school.pk}", stdout=StringIO())
+        self.assertEqual(self._counts(), [3, 0])
+        out = StringIO()
+        call_command("reconcile_enrollment_counts", stdout=out)
+        self.assertIn("in sync", out.getvalue())
+
+
+class AdminDashboardStatsTests(TestCase):
+    """Admin dashboard counts cost one query and are cached until a counted row changes."""
+
+    def setUp(self):
+        cache.clear()
+        with self.captureOnCommitCallbacks(execute=True):
+            self.school, self.session, self.class_list = create_school_with_class()
+        AcademicSession.default_objects.filter(pk=self.session.pk).update(is_current=True)
+        create_students(self.school, 3)
+
+    def test_counts_in_one_query_then_cached(self):
+        with self.assertNumQueries(1):
+            stats = get_admin_stats(self.school.pk)
+        self.assertEqual(stats["total_students"], 3)
+        self.assertEqual(stats["total_classes"], 1)
+        self.assertEqual(stats["current_session"], self.session.name)
+        with self.assertNumQueries(0):
+            self.assertEqual(get_admin_stats(self.school.pk), stats)
+
+    def test_save_bumps_version(self):
+        get_admin_stats(self.school.pk)
+        with self.captureOnCommitCallbacks(execute=True):
+            create_students(self.school, 1, offset=3)[0].save()
+        self.assertEqual(get_admin_stats(self.school.pk)["total_students"], 4)
+
+    def test_bulk_writes_bump_explicitly(self):
+        get_admin_stats(self.school.pk)
+        version_key = VERSION_CACHE_KEY.format(school_id=self.school.pk)
+        with self.captureOnCommitCallbacks(execute=True):
+            create_students(self.school, 2, offset=3)  # bulk_create sends no signals
+            bump_version(self.school.pk)
+            # before commit this transaction sees its own rows but publishes no new generation
+            self.assertEqual(get_admin_stats(self.school.pk)["total_students"], 5)
+            self.assertIsNone(cache.get(version_key))
+        with self.assertNumQueries(1):
+            self.assertEqual(get_admin_stats(self.school.pk)["total_students"], 5)
+        with self.assertNumQueries(0):
+            get_admin_stats(self.school.pk)
+
+
+class PromotionPlannerTests(TestCase):
+    """Promotion: next level per student, a department at JS3, balanced divisions, failures reported."""
+
+    def setUp(self):
+        self.school, self.session, self.js1 = create_school_with_class()
+        self.next_session = AcademicSession.objects.create(
+            school=self.school, start_date=date(2025, 9, 1), end_date=date(2026, 7, 31))
+        self.levels = {(level.name, level.department): level
+                       for level in ClassLevel.default_objects.filter(school=self.school)}
+
+    def _class(self, session, name, department="GENERAL", division="A", capacity=40):
+        return ClassList.default_objects.create(
+            school=self.school, academic_session=session, class_level=self.levels[(name, department)],
+            division=division, capacity=capacity)
+
+    def _enrolled(self, class_list, count, offset=0):
+        students = create_students(self.school, count, offset=offset)
+        for student in students:
+            StudentEnrollment.enroll(student, class_list)
+        return students, StudentEnrollment.default_objects.filter(class_list=class_list, is_active=True)
+
+    def _placed(self, report):
+        classes = ClassList.default_objects.in_bulk([row["to_class_id"] for row in report["promoted"]])
+        return {row["student_id"]: classes[row["to_class_id"]] for row in report["promoted"]}
+
+    def test_js3_needs_a_department(self):
+        js3 = self._class(self.session, "JS3")
+        (science, art, undecided), enrollments = self._enrolled(js3, 3)
+        report = PromotionPlanner(self.next_session, {science.pk: "SCIENCE", art.pk: "ART"}).run(enrollments)
+
+        placed = self._placed(report)
+        self.assertEqual({pk: (c.class_level.name, c.class_level.department) for pk, c in placed.items()},
+                         {science.pk: ("SS1", "SCIENCE"), art.pk: ("SS1", "ART")})
+        self.assertEqual([row["student_id"] for row in report["failed"]], [undecided.pk])
+        self.assertIn("department", report["failed"][0]["reason"])
+        # the undecided student stays where they were
+        self.assertTrue(StudentEnrollment.default_objects.get(student=undecided, class_list=js3).is_active)
+        self.assertEqual(ClassList.default_objects.get(pk=js3.pk).active_count, 1)
+
+    def test_hold_back_repeats_the_level(self):
+        (repeater, promoted), enrollments = self._enrolled(self.js1, 2)
+        report = PromotionPlanner(self.next_session, hold_back=[repeater.pk]).run(enrollments)
+
+        self.assertEqual([row["student_id"] for row in report["held_back"]], [repeater.pk])
+        held = ClassList.default_objects.get(pk=report["held_back"][0]["to_class_id"])
+        self.assertEqual((held.class_level.name, held.academic_session_id), ("JS1", self.next_session.pk))
+        self.assertEqual(self._placed(report)[promoted.pk].class_level.name, "JS2")
+        self.assertFalse(StudentEnrollment.default_objects.get(student=repeater, class_list=self.js1).promoted)
+        self.assertEqual(ClassList.default_objects.get(pk=self.js1.pk).active_count, 0)
+
+    def test_divisions_balanced_until_full(self):
+        divisions = [self._class(self.next_session, "JS2", division=division, capacity=capacity)
+                     for division, capacity in (("A", 2), ("B", 3))]
+        _, enrollments = self._enrolled(self.js1, 6)
+        report = PromotionPlanner(self.next_session).run(enrollments)
+
+        placed = self._placed(report)
+        self.assertEqual(Counter(c.division for c in placed.values()), {"A": 2, "B": 3})
+        self.assertEqual(len(report["failed"]), 1)
+        self.assertIn("No seats left", report["failed"][0]["reason"])
+        self.assertEqual([ClassList.default_objects.get(pk=c.pk).active_count for c in divisions], [2, 3])
+
+    def test_seat_taken_after_planning(self):
+        target = self._class(self.next_session, "JS2", capacity=2)
+        _, enrollments = self._enrolled(self.js1, 2)
+        planner = PromotionPlanner(self.next_session).plan(enrollments)
+        self.assertEqual(len(planner.moves), 2)
+        # an admission lands between planning and applying
+        newcomer = create_students(self.school, 1, offset=10)[0]
+        StudentEnrollment.enroll(newcomer, target)
+        with self.assertRaises(ValidationError) as raised:
+            planner.apply()
+        self.assertEqual(raised.exception.code, "capacity")
+        self.assertEqual(ClassList.default_objects.get(pk=target.pk).active_count, 1)
+        self.assertEqual(ClassList.default_objects.get(pk=self.js1.pk).active_count, 2)
+        self.assertEqual(StudentEnrollment.default_objects.filter(class_list=target).count(), 1)
+        # a fresh plan sees the remaining seat
+        report = PromotionPlanner(self.next_session).run(enrollments)
+        self.assertEqual((len(report["promoted"]), len(report["failed"])), (1, 1))
+        self.assertEqual(ClassList.default_objects.get(pk=target.pk).active_count, 2)
+
+    def test_duplicate_enrollments_rejected(self):
+        _, enrollments = self._enrolled(self.js1, 2)
+        enrollment = enrollments.first()
+        with self.assertRaises(ValidationError) as raised:
+            PromotionPlanner(self.next_session).run([enrollment, enrollments.last(), enrollment])
+        self.assertEqual(raised.exception.code, "duplicate_enrollment")
+        self.assertFalse(StudentEnrollment.default_objects.filter(academic_session=self.next_session).exists())
+
+
+class DepartmentSummaryTests(TestCase):
+    """Department reports read incrementally maintained rows that agree with a full rebuild."""
+
+    def setUp(self):
+        self.school, self.session, self.class_list = create_school_with_class()
+        self.students = create_students(self.school, 6)
+        for student in self.students:
+            StudentEnrollment.enroll(student, self.class_list)
+
+    def _snapshot(self):
+        return sorted(DepartmentSummary.default_objects.filter(school=self.school).values_list(
+            "academic_session_id", "department", "active_students", "promoted"))
+
+    def test_incremental_rows_match_rebuild(self):
+        StudentEnrollment.default_objects.get(student=self.students[0]).withdraw()
+        next_session = AcademicSession.objects.create(
+            school=self.school, start_date=date(2025, 9, 1), end_date=date(2026, 7, 31))
+        PromotionPlanner(next_session).run(StudentEnrollment.default_objects.filter(
+            student__in=self.students[1:3], is_active=True))
+
+        incremental = self._snapshot()
+        rebuild(self.school.pk)
+        self.assertEqual(incremental, self._snapshot())
+        self.assertEqual(SchoolUtilities.report_department_mix(self.session), {"GENERAL": 3})
+        self.assertEqual(SchoolUtilities.report_promotions_by_department(self.session), {"GENERAL": 2})
+        self.assertEqual(SchoolUtilities.report_department_mix(next_session), {"GENERAL": 2})
+
+    def test_reports_cost_constant_queries(self):
+        with self.assertNumQueries(1):
+            SchoolUtilities.report_department_mix(self.session)
+        with self.assertNumQueries(2):
+            stats = SchoolUtilities.get_class_department_statistics(self.school)
+        self.assertEqual(stats["GENERAL"], {"name": "General", "students": 6, "classes": 1})
+
+
+class ReportCardBatchTests(TestCase):
+    """Batch report cards read their data in constant queries and resume from existing parts."""
+
+    def setUp(self):
+        self.school, self.session, self.class_list = create_school_with_class()
+        self.students = create_students(self.school, 4, class_list=self.class_list)
+        # creating the session also creates its three terms
+        self.term = Term.default_objects.select_related("school", "academic_session").get(
+            academic_session=self.session, name="1st")
+        subject = Subject.default_objects.create(school=self.school, name="Mathematics")
+        for quiz_type, base in (("ca", 10), ("exam", 50)):
+            quiz = Quiz.objects.create(
+                title=quiz_type, quiz_type=quiz_type, school_class=self.class_list,
+                term=self.term, subject=subject, created_by=self.school.owner)
+            Result.objects.bulk_create([
+                Result(student=student, quiz=quiz, score=base + n)
+                for n, student in enumerate(self.students)
+            ])
+        TermResult.objects.create(
+            student=self.students[0], school_class=self.class_list, term=self.term,
+            academic_session=self.session, total_score=35.0)
+
+    def test_cards_cost_constant_queries(self):
+        cache.clear()
+        # classes, enrollments, term totals + class ranking, grading scales, school settings (cold cache)
+        with self.assertNumQueries(6):
+            cards = build_cards(self.term, class_id=self.class_list.pk)
+        self.assertEqual(len(cards), 4)
+        first = next(card for card in cards if card["student_id"] == self.students[0].pk)
+        self.assertEqual(first["subjects"], [
+            {"name": "Mathematics", "marks": [None, 10.0, 50.0], "average": 30.0,
+             "grade": "F", "remark": "Fail", "position": "4th of 4",
+             "class_average": 31.5, "highest": 33.0, "lowest": 30.0}])
+        self.assertEqual(first["term_total"], 35.0)
+        self.assertEqual(first["position"], "4th of 4")
+
+    @skipUnless(HAS_XHTML2PDF, "xhtml2pdf is not installed")
+    def test_generate_zip_resumes_from_existing_parts(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            output = Path(tmp) / "cards.zip"
+            parts = parts_dir_for(output)
+            parts.mkdir()
+            (parts / f"{self.students[0].pk}.pdf").write_bytes(b"%PDF-already-rendered")
+
+            summary = generate_report_cards(self.term, output, level_id=self.class_list.class_level_id,
+                                            workers=2)
+
+            self.assertEqual((summary["total"], summary["rendered"], summary["resumed"]), (4, 3, 1))
+            self.assertFalse(parts.exists())
+            with zipfile.ZipFile(output) as archive:
+                names = archive.namelist()
+                self.assertEqual(len(names), 4)
+                self.assertTrue(all(archive.read(name).startswith(b"%PDF") for name in names))
+
+
+class ResultSheetRenderTests(TestCase):
+    """Result sheets are stored under MEDIA_ROOT by a hash of what they print; every worker reads the same file."""
+
+    META = {"semester": "First", "session": "2024/2025", "lecturer": "A Lecturer", "level": "100"}
+
+    def setUp(self):
+        media = tempfile.TemporaryDirectory()
+        self.addCleanup(media.cleanup)
+        override = override_settings(MEDIA_ROOT=media.name)
+        override.enable()
+        self.addCleanup(override.disable)
+        self.rows = [("STU1", "Ada " * 20, 71, "A", 5, "PASS"), ("STU2", "Bo", 30, "F", 0, "FAIL")]
+
+    def test_digest_follows_printed_content(self):
+        digest = rendering.scores_digest(self.META, self.rows)
+        self.assertEqual(digest, rendering.scores_digest(dict(self.META), list(self.rows)))
+        changed = [self.rows[0], ("STU2", "Bo", 45, "E", 1, "PASS")]
+        self.assertNotEqual(digest, rendering.scores_digest(self.META, changed))
+        self.assertNotEqual(digest, rendering.scores_digest({**self.META, "level": "200"}, self.rows))
+        # the lecturer and the logo's location are not sheet content
+        self.assertEqual(digest, rendering.scores_digest(
+            {**self.META, "lecturer": "B Lecturer", "logo": "/elsewhere/logo.png"}, self.rows))
+
+    def test_stored_sheet_is_reused_until_scores_change(self):
+        digest, pdf = rendering.render_and_cache(7, self.META, self.rows)
+        self.assertTrue(pdf.startswith(b"%PDF"))
+        self.assertEqual(rendering.get_cached_result_sheet(7, "A Lecturer", digest), pdf)
+
+        with mock.patch.object(rendering, "render_result_sheet") as render:
+            self.assertEqual(rendering.render_and_cache(7, self.META, self.rows), (digest, pdf))
+        render.assert_not_called()
+
+        # a new score renders a new sheet and removes the superseded one
+        new_digest, _ = rendering.render_and_cache(7, self.META, self.rows[:1])
+        self.assertNotEqual(new_digest, digest)
+        self.assertIsNone(rendering.get_cached_result_sheet(7, "A Lecturer", digest))
+
+    def test_lecturers_on_one_course_keep_their_own_sheets(self):
+        other = {**self.META, "lecturer": "B Lecturer"}
+        digest, pdf = rendering.render_and_cache(7, self.META, self.rows)
+        other_digest, other_pdf = rendering.render_and_cache(7, other, self.rows)
+        self.assertEqual(other_digest, digest)
+
+        # neither render removed the other's sheet, so both are served from disk
+        with mock.patch.object(rendering, "render_result_sheet") as render:
+            self.assertEqual(rendering.render_and_cache(7, self.META, self.rows), (digest, pdf))
+            self.assertEqual(rendering.render_and_cache(7, other, self.rows), (digest, other_pdf))
+        render.assert_not_called()
+
+    def test_logo_is_drawn(self):
+        from PIL import Image as PILImage
+
+        logo = Path(settings.MEDIA_ROOT) / "logo.png"
+        PILImage.new("RGB", (8, 8), "red").save(logo)
+        with_logo = rendering.render_result_sheet({**self.META, "logo": str(logo)}, self.rows)
+        self.assertGreater(len(with_logo), len(rendering.render_result_sheet(self.META, self.rows)))
+
+
+class SubjectMatrixTests(TestCase):
+    """Subject applicability per (category, department) is one cached matrix per school."""
+
+    def setUp(self):
+        cache.clear()
+        self.school, _, _ = create_school_with_class()
+        self.key = MATRIX_CACHE_KEY.format(school_id=self.school.pk)
+        with self.captureOnCommitCallbacks(execute=True):
+            self.english = self._subject("English")
+            self.physics = self._subject("Physics", ["SSS"], ["SCIENCE"])
+            self.civic = self._subject("Civic", ["JSS", "SSS"], ["GENERAL"])
+
+    def _subject(self, name, categories=(), departments=()):
+        return Subject.default_objects.create(school=self.school, name=name, code=name[:3].upper(),
+                                              applicable_categories=list(categories),
+                                              applicable_departments=list(departments))
+
+    def _ids(self, category, department):
+        mine = {self.english.pk, self.physics.pk, self.civic.pk}
+        return set(applicable_subject_ids(self.school.pk, category, department)) & mine
+
+    def test_matrix_and_cache(self):
+        self.assertEqual(self._ids("SSS", "SCIENCE"), {self.english.pk, self.physics.pk, self.civic.pk})
+        # GENERAL applies to every department; [] means every category/department
+        self.assertEqual(self._ids("SSS", "ART"), {self.english.pk, self.civic.pk})
+        self.assertEqual(self._ids("PRIMARY", "GENERAL"), {self.english.pk})
+        with self.assertNumQueries(0):
+            get_matrix(self.school.pk)
+
+    def test_changes_invalidate_on_commit(self):
+        get_matrix(self.school.pk)
+        self.physics.applicable_departments = ["ART"]
+        with self.captureOnCommitCallbacks(execute=True):
+            self.physics.save()
+        self.assertEqual(self._ids("SSS", "ART"), {self.english.pk, self.physics.pk, self.civic.pk})
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.civic.delete()
+        self.assertNotIn(self.civic.pk, self._ids("JSS", "GENERAL"))
+
+    def test_same_transaction_sees_its_writes_without_publishing_them(self):
+        get_matrix(self.school.pk)
+        try:
+            with transaction.atomic():
+                biology = self._subject("Biology", ["SSS"], ["SCIENCE"])
+                # the earlier cached matrix is dropped at once, so this transaction sees Biology
+                self.assertIn(biology.pk, applicable_subject_ids(self.school.pk, "SSS", "SCIENCE"))
+                # ... but the uncommitted matrix is not cached for other workers
+                self.assertIsNone(cache.get(self.key))
+                raise RuntimeError("roll back")
+        except RuntimeError:
+            pass
+        self.assertNotIn(biology.pk, applicable_subject_ids(self.school.pk, "SSS", "SCIENCE"))
+
+
+class GradingScaleTests(TestCase):
+    """Scores are graded by bisecting a school's compiled scale (level override → school → built-in)."""
+
+    def setUp(self):
+        cache.clear()
+        with self.captureOnCommitCallbacks(execute=True):
+            self.school, self.session, self.class_list = create_school_with_class()
+        self.level_id = self.class_list.class_level_id
+
+    def test_band_boundaries(self):
+        waec = compile_bands(PRESETS["waec"])
+        self.assertEqual([waec.grade(s) for s in (100, 75, 74.9, 40, 39.99, 0, -5)],
+                         ["A1", "A1", "B2", "E8", "F9", "F9", "F9"])
+        self.assertEqual(waec.grade_many([75, 74.9, 12]), ["A1", "B2", "F9"])
+        self.assertEqual(DEFAULT_SCALE.grade(89.99), "A")
+        self.assertTrue(DEFAULT_SCALE.is_fail(44))
+
+    def test_invalid_bands_rejected(self):
+        for bands in ([], [{"min": 50, "grade": "P"}], [{"grade": "A"}],
+                      [{"min": 0, "grade": "F"}, {"min": 0, "grade": "E"}]):
+            with self.assertRaises(ValidationError):
+                compile_bands(bands)
+        # saves validate too, not only full_clean
+        with self.assertRaises(ValidationError):
+            GradingScale.default_objects.create(
+                school=self.school, name="Broken", bands=[{"min": 50, "grade": "P"}])
+        self.assertFalse(GradingScale.default_objects.filter(school=self.school).exists())
+
+    def test_numpy_kernels_match_per_row_at_boundaries(self):
+        for scale in (DEFAULT_SCALE, compile_bands(PRESETS["waec"]), compile_bands(PRESETS["primary"])):
+            # every floor, just below and above it, and out-of-range scores
+            near = {t for floor in scale.floors for t in (floor - 0.01, floor, floor + 0.01)}
+            totals = sorted(near | {-5, 100, 120})
+            credits = [(n % 4) + 1 for n in range(len(totals))]
+            index, grade_point, quality = grade_arrays(totals, credits, scale)
+            with self.subTest(scale=scale.floors):
+                self.assertEqual([scale.grades[i] for i in index], [grade_for(t, scale) for t in totals])
+                self.assertEqual(scale.grade_many(totals), [grade_for(t, scale) for t in totals])
+                self.assertEqual(grade_point.tolist(), [point_for(grade_for(t, scale), scale) for t in totals])
+                self.assertEqual(quality.tolist(), [c * point_for(grade_for(t, scale), scale)
+                                                    for t, c in zip(totals, credits)])
+        # CGPA per student: bincount sums agree with a per-row loop
+        uniques, gpa = gpa_arrays([7, 7, 9], [3, 1, 2], [12.0, 2.0, 0.0])
+        self.assertEqual(dict(zip(uniques.tolist(), gpa.tolist())), {7: 3.5, 9: 0.0})
+
+    def test_gpa_ordering_follows_grades(self):
+        for name in PRESETS:
+            scale = compile_bands(PRESETS[name])
+            with self.subTest(scale=name):
+                # points never fall as the grade rises, and the fail band is worth nothing
+                self.assertEqual(list(scale.points), sorted(scale.points))
+                self.assertEqual(scale.points[0], 0)
+        waec = compile_bands(PRESETS["waec"])
+        # three students, same two 3-credit courses: A1/A1, C6/D7, F9/F9
+        _, _, quality = grade_arrays([80, 90, 52, 47, 10, 30], [3] * 6, waec)
+        uniques, gpa = gpa_arrays([1, 1, 2, 2, 3, 3], [3] * 6, quality)
+        self.assertEqual(dict(zip(uniques.tolist(), gpa.tolist())), {1: 8.0, 2: 2.5, 3: 0.0})
+        self.assertGreater(point_for("A1", waec), point_for("C6", waec))
+
+    def test_level_override_school_default_and_invalidation(self):
+        self.assertIs(scale_for(self.school.pk, self.level_id), DEFAULT_SCALE)
+
+        self.school.settings = {"grading_scale": "primary"}
+        with self.captureOnCommitCallbacks(execute=True):
+            self.school.save()
+        self.assertEqual(scale_for(self.school.pk, self.level_id).grade(65), "B")
+
+        with self.captureOnCommitCallbacks(execute=True):
+            GradingScale.from_preset(self.school, "waec", class_level=self.class_list.class_level)
+        self.assertEqual(scale_for(self.school.pk, self.level_id).grade(65), "B3")
+        # other levels keep the school default
+        self.assertEqual(scale_for(self.school.pk, None).grade(65), "B")
+        with self.assertNumQueries(0):
+            scale_for(self.school.pk, self.level_id)
+
+
+class QuizPaperTests(TestCase):
+    """Publishing compiles an immutable, versioned paper; delivery is a cache read."""
+
+    def setUp(self):
+        cache.clear()
+        self.school, self.session, self.class_list = create_school_with_class()
+        self.quiz = create_assessment(self.school, self.session, questions=60)
+
+    def test_publish_compiles_once_and_serves_from_cache(self):
+        # questions + prefetched options, whatever the paper size
+        with self.assertNumQueries(2):
+            compile_quiz(self.quiz)
+        paper = publish(self.quiz)
+        self.assertEqual(paper.version, 1)
+        self.assertEqual(len(paper.payload["questions"]), 60)
+        self.assertEqual([o["text"] for o in paper.payload["questions"][0]["options"]], ["O0", "O1", "O2", "O3"])
+        self.assertNotIn("isCorrect", paper.payload["questions"][0]["options"][0])
+
+        get_paper_json(self.quiz.pk)
+        with self.assertNumQueries(0):
+            get_paper_json(self.quiz.pk, 1)
+        # republishing unchanged content keeps the version
+        self.assertEqual(publish(self.quiz).version, 1)
+        self.assertEqual(QuizPaper.default_objects.count(), 1)
+
+    def test_edit_after_publish_creates_version_and_pins_attempts(self):
+        publish(self.quiz)
+        student = create_students(self.school, 1, class_list=self.class_list)[0]
+        attempt = QuizAttempt.default_objects.create(school=self.school, quiz=self.quiz, student=student)
+        self.assertEqual(attempt.paper_version, 1)
+
+        question = QuizQuestion.default_objects.filter(quiz=self.quiz).first()
+        question.text = "Edited"
+        with self.captureOnCommitCallbacks(execute=True):
+            question.save()
+        self.quiz.refresh_from_db()
+        self.assertEqual(self.quiz.paper_version, 2)
+        self.assertIn('"text":"Edited"', get_paper_json(self.quiz.pk))
+        # the in-flight attempt keeps the paper it started on
+        self.assertNotIn('"text":"Edited"', paper_for_attempt(attempt))
+
+    def test_option_edits_republish_without_loading_their_questions(self):
+        publish(self.quiz)
+        options = list(QuizOption.default_objects.filter(question__quiz=self.quiz, order=1))
+        with self.captureOnCommitCallbacks() as callbacks:
+            # one UPDATE per option; the quiz is resolved once, on commit
+            with self.assertNumQueries(len(options)):
+                for option in options:
+                    option.text = "Edited"
+                    option.save()
+        for callback in callbacks:
+            callback()
+        self.quiz.refresh_from_db()
+        self.assertEqual(self.quiz.paper_version, 2)
+        self.assertNotIn('"text":"O1"', get_paper_json(self.quiz.pk))
+
+
+class SubmittedCohortMixin:
+    """30 submitted attempts on a 10-question quiz; student n answers the first n % 11 correctly."""
+
+    def setUp(self):
+        cache.clear()
+        self.school, self.session, self.class_list = create_school_with_class()
+        self.quiz = create_assessment(self.school, self.session, questions=10)
+        publish(self.quiz)
+        self.options = {}
+        for question_id, option_id in QuizOption.default_objects.filter(
+                question__quiz=self.quiz).order_by("order").values_list("question_id", "pk"):
+            self.options.setdefault(question_id, []).append(option_id)
+        self.students = create_students(self.school, 30, class_list=self.class_list)
+        self.attempts = QuizAttempt.default_objects.bulk_create([
+            QuizAttempt(school=self.school, quiz=self.quiz, student=student, status="submitted",
+                        paper_version=1)
+            for student in self.students
+        ])
+        # the rest are answered with option 1
+        QuizAnswer.default_objects.bulk_create([
+            QuizAnswer(school=self.school, attempt=attempt, question_id=question_id,
+                       selected_option_ids=[options[0] if q < n % 11 else options[1]])
+            for n, attempt in enumerate(self.attempts)
+            for q, (question_id, options) in enumerate(sorted(self.options.items()))
+        ])
+
+
+class QuizMarkingTests(SubmittedCohortMixin, TestCase):
+    """Attempts are marked in memory against one cached answer key and written with one UPDATE per outcome."""
+
+    def _scores(self):
+        return [float(score) for score in QuizAttempt.default_objects.filter(
+            quiz=self.quiz).order_by("pk").values_list("score", flat=True)]
+
+    def test_grade_quiz_scores_every_attempt(self):
+        summary = grade_quiz(self.quiz)
+        self.assertEqual(summary["attempts"], 30)
+        self.assertEqual(summary["answers"], 300)
+        self.assertEqual(self._scores(), [float(n % 11) for n in range(30)])
+        self.assertEqual(set(QuizAttempt.default_objects.values_list("status", flat=True)), {"graded"})
+        # nothing changes on a second pass, so nothing is rewritten
+        self.assertEqual(grade_quiz(self.quiz)["changed"], 0)
+
+    def test_writes_are_grouped_by_outcome(self):
+        attempts = list(QuizAttempt.default_objects.filter(quiz=self.quiz))
+        with CaptureQueriesContext(connection) as queries:
+            grade_attempts(attempts)
+        updates = [q["sql"] for q in queries.captured_queries if q["sql"].startswith("UPDATE")]
+        # answers: only newly correct ones change (one outcome); attempts: one UPDATE per distinct score
+        self.assertEqual(len(updates), 1 + 11)
+        with self.assertNumQueries(4):  # savepoint pair, version, answers; nothing changed → no writes
+            grade_attempts(attempts)
+
+    def test_key_correction_regrades(self):
+        grade_quiz(self.quiz)
+        first_question = min(self.options)
+        with self.captureOnCommitCallbacks(execute=True):
+            QuizOption.default_objects.filter(question_id=first_question).update(is_correct=False)
+            correct = QuizOption.default_objects.get(pk=self.options[first_question][1])
+            correct.is_correct = True
+            correct.save()
+        self.quiz.refresh_from_db()
+        self.assertEqual(self.quiz.paper_version, 2)
+
+        grade_quiz(self.quiz)
+        # students who got Q1 "right" lose a mark; those who chose option 1 gain one
+        self.assertEqual(self._scores(), [float(n % 11 - 1 if n % 11 else 1) for n in range(30)])
+
+
+class QuizAudienceTests(TestCase):
+    """A student's quizzes come from the materialized audience, kept in sync on commit."""
+
+    def setUp(self):
+        self.school, self.session, self.class_list = create_school_with_class()
+        self.other_class = ClassList.default_objects.create(
+            school=self.school, academic_session=self.session, class_level=self.class_list.class_level,
+            division="B", capacity=10)
+        self.students = create_students(self.school, 3, class_list=self.class_list)
+        self.outsider = create_students(self.school, 1, class_list=self.other_class, offset=3)[0]
+        self.class_quiz = create_assessment(self.school, self.session, is_published=True)
+        self.targeted = create_assessment(self.school, self.session, is_published=True)
+        self.open_quiz = create_assessment(self.school, self.session, is_published=True)
+        with self.captureOnCommitCallbacks(execute=True):
+            self.class_quiz.class_lists.add(self.class_list)
+            self.targeted.assigned_students.add(self.outsider)
+        self.class_quiz.refresh_from_db()
+
+    def _visible(self, student):
+        return set(Assessment.default_objects.for_student(student).values_list("pk", flat=True))
+
+    def test_for_student_is_one_query(self):
+        with self.assertNumQueries(1):
+            visible = self._visible(self.students[0])
+        self.assertEqual(visible, {self.class_quiz.pk, self.open_quiz.pk})
+        self.assertEqual(self._visible(self.outsider), {self.targeted.pk, self.open_quiz.pk})
+        self.assertTrue(self.class_quiz.is_assigned_to_student(self.students[1]))
+        self.assertFalse(self.class_quiz.is_assigned_to_student(self.outsider))
+
+    def test_assignment_and_enrollment_changes_resync(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            self.other_class.quizzes.add(self.class_quiz)
+        self.assertIn(self.class_quiz.pk, self._visible(self.outsider))
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.class_quiz.class_lists.remove(self.class_list)
+        self.assertNotIn(self.class_quiz.pk, self._visible(self.students[0]))
+
+        with self.captureOnCommitCallbacks(execute=True):
+            StudentEnrollment.enroll(self.students[0], self.other_class)
+        self.assertIn(self.class_quiz.pk, self._visible(self.students[0]))
+
+        with self.captureOnCommitCallbacks(execute=True):
+            StudentEnrollment.deactivate(StudentEnrollment.default_objects.filter(student=self.outsider))
+        self.assertEqual(self._visible(self.outsider), {self.targeted.pk, self.open_quiz.pk})
+
+    def test_rebuild_matches_incremental(self):
+        before = set(QuizAudience.default_objects.filter(is_active=True).values_list("quiz_id", "student_id"))
+        QuizAudience.default_objects.update(is_active=False)
+        rebuild_audience(self.school.pk)
+        after = set(QuizAudience.default_objects.filter(is_active=True).values_list("quiz_id", "student_id"))
+        self.assertEqual(after, before)
+        self.assertEqual(len(after), 4)
+
+
+class AnswerIngestionTests(TestCase):
+    """Autosaves are coalesced per question and only new/changed answers are written."""
+
+    def setUp(self):
+        cache.clear()
+        self.school, self.session, self.class_list = create_school_with_class()
+        self.quiz = create_assessment(self.school, self.session, questions=5)
+        publish(self.quiz)
+        self.student = create_students(self.school, 1, class_list=self.class_list)[0]
+        self.attempt = QuizAttempt.default_objects.create(school=self.school, quiz=self.quiz, student=self.student)
+        self.sheet = {
+            question_id: option_id
+            for question_id, option_id in QuizOption.default_objects.filter(
+                question__quiz=self.quiz, order=1).values_list("question_id", "pk")
+        }
+
+    def _batch(self, **overrides):
+        sheet = {**self.sheet, **overrides}
+        return [{"question": q, "options": [o]} for q, o in sheet.items()]
+
+    def test_resending_is_idempotent(self):
+        self.assertEqual(save_answers(self.attempt.pk, self._batch())["written"], 5)
+        # savepoint pair, attempt, stored answers (key cached) — no write
+        with self.assertNumQueries(4):
+            summary = save_answers(self.attempt.pk, self._batch())
+        self.assertEqual((summary["written"], summary["unchanged"]), (0, 5))
+
+        first = min(self.sheet)
+        batch = self._batch() + [{"question": first, "options": [self.sheet[first]]},
+                                 {"question": first, "options": []}]
+        summary = save_answers(self.attempt.pk, batch + [{"question": 999999, "options": []}])
+        # last entry for a question wins; unknown questions are rejected, not stored
+        self.assertEqual((summary["written"], summary["rejected"]), (1, [999999]))
+        self.assertEqual(QuizAnswer.default_objects.filter(attempt=self.attempt).count(), 5)
+        self.assertEqual(QuizAnswer.default_objects.get(attempt=self.attempt, question_id=first).selected_option_ids, [])
+
+    def test_options_not_offered_by_the_question_are_rejected(self):
+        save_answers(self.attempt.pk, self._batch())
+        first, second = sorted(self.sheet)[:2]
+        # an option of another question, and an id that does not exist at all
+        summary = save_answers(self.attempt.pk, [
+            {"question": first, "options": [self.sheet[second]]},
+            {"question": second, "options": [self.sheet[second], 999999]},
+        ])
+        self.assertEqual((summary["written"], summary["rejected"]), (0, [first, second]))
+        stored = dict(QuizAnswer.default_objects.filter(attempt=self.attempt).values_list(
+            "question_id", "selected_option_ids"))
+        self.assertEqual((stored[first], stored[second]), ([self.sheet[first]], [self.sheet[second]]))
+
+    def test_closed_or_foreign_attempt_rejected(self):
+        other = create_students(self.school, 1, offset=1)[0]
+        with self.assertRaises(ValidationError) as raised:
+            save_answers(self.attempt.pk, self._batch(), student_id=other.pk)
+        self.assertEqual(raised.exception.code, "attempt")
+
+        QuizAttempt.default_objects.filter(pk=self.attempt.pk).update(status="submitted")
+        with self.assertRaises(ValidationError) as raised:
+            save_answers(self.attempt.pk, self._batch())
+        self.assertEqual(raised.exception.code, "attempt_closed")
+
+
+class SeededOrderingTests(TestCase):
+    """Each attempt's order is a pure function of its seed and the compiled paper."""
+
+    def test_prng_and_shuffle_are_stable(self):
+        # reference values pin the algorithm: an order a student saw must never change
+        rng = SplitMix64(0)
+        self.assertEqual([rng.next() for _ in range(2)], [0xE220A8397B1DCDAF, 0x6E789E6AA1B965F4])
+        items = list(range(500))
+        order = shuffled(items, 42)
+        self.assertEqual(order, shuffled(items, 42))
+        self.assertNotEqual(order, shuffled(items, 43))
+        self.assertEqual(sorted(order), items)
+
+    def test_attempt_order_is_reproducible(self):
+        cache.clear()
+        school, session, class_list = create_school_with_class()
+        quiz = create_assessment(school, session, questions=500, options=4,
+                                 randomize_questions=True, randomize_options=True)
+        publish(quiz)
+        students = create_students(school, 2, class_list=class_list)
+        attempts = [QuizAttempt.default_objects.create(school=school, quiz=quiz, student=st) for st in students]
+
+        first = attempt_paper(attempts[0])
+        ids = [q["id"] for q in first["questions"]]
+        self.assertEqual(len(ids), 500)
+        self.assertNotEqual(ids, sorted(ids))
+        self.assertEqual(attempt_paper(QuizAttempt.default_objects.get(pk=attempts[0].pk)), first)
+        self.assertNotEqual([q["id"] for q in attempt_paper(attempts[1])["questions"]], ids)
+
+        # options are shuffled per question, independently of the question order
+        paper = {"quiz": {"randomizeOptions": True}, "questions": first["questions"][:1]}
+        self.assertEqual(order_paper(paper, attempts[0].seed)["questions"][0]["options"],
+                         order_paper({**paper, "questions": first["questions"][:3]},
+                                     attempts[0].seed)["questions"][0]["options"])
+
+
+class ItemAnalysisTests(SubmittedCohortMixin, TestCase):
+    """Item statistics come from one answer matrix; the cache is dropped when attempts are graded."""
+
+    def test_item_statistics(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            grade_quiz(self.quiz)
+        analysis = analyze_quiz(self.quiz.pk)
+        self.assertEqual((analysis["attempts"], analysis["items"]), (30, 10))
+        first, last = analysis["questions"][0], analysis["questions"][-1]
+        # question q is right for students with n % 11 > q: 27/30 for the first, 2/30 for the last
+        self.assertEqual(first["difficulty"], 0.9)
+        self.assertEqual(last["difficulty"], round(2 / 30, 3))
+        self.assertGreater(first["discrimination"], 0)
+        self.assertEqual([o["count"] for o in first["options"]], [27, 3, 0, 0])
+        self.assertEqual(first["options"][1]["lower"], 3)
+        self.assertIn("too_hard", last["flags"])
+        # Guttman-perfect response pattern → very high internal consistency
+        self.assertGreater(analysis["alpha"], 0.9)
+        self.assertEqual(sum(analysis["scores"]["histogram"]["counts"]), 30)
+        self.assertEqual(analysis["scores"]["max_possible"], 10.0)
+
+    def test_blank_submissions_count_as_omitted(self):
+        extra = create_students(self.school, 2, class_list=self.class_list, offset=30)
+        QuizAttempt.default_objects.bulk_create([
+            QuizAttempt(school=self.school, quiz=self.quiz, student=student, status="submitted", paper_version=1)
+            for student in extra
+        ])
+        analysis = analyze_quiz(self.quiz.pk)
+        self.assertEqual(analysis["attempts"], 32)
+        self.assertEqual([q["omitted"] for q in analysis["questions"]], [2] * 10)
+        self.assertEqual(analysis["scores"]["min"], 0.0)
+
+    def test_cached_until_regraded(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            grade_quiz(self.quiz)
+        get_analysis(self.quiz.pk)
+        with self.assertNumQueries(0):
+            get_analysis(self.quiz.pk)
+        with self.captureOnCommitCallbacks(execute=True):
+            QuizAnswer.default_objects.filter(question_id=min(self.options)).update(selected_option_ids=[])
+            grade_quiz(self.quiz)
+        self.assertEqual(get_analysis(self.quiz.pk)["questions"][0]["omitted"], 30)
+
+
+@skipUnless(connection.vendor == "sqlite", "FTS5 search index is SQLite-only")
+class SearchIndexTests(TestCase):
+    """Quiz/question search is a ranked, per-school FTS5 lookup kept in sync on commit."""
+
+    def setUp(self):
+        self.school, self.session, _ = create_school_with_class()
+        self.other = School.objects.create(
+            name="Other School", phone="0987654321", email="other@example.com",
+            owner=User.objects.create_user(username="other@example.com", email="other@example.com",
+                                           password="testpass123", role="owner"))
+        other_session = AcademicSession.objects.create(
+            school=self.other, start_date=date(2024, 9, 1), end_date=date(2025, 7, 31))
+        with self.captureOnCommitCallbacks(execute=True):
+            self.algebra = create_assessment(self.school, self.session, title="Algebra basics")
+            self.revision = create_assessment(self.school, self.session, title="Term revision",
+                                              description="Covers algebra and geometry")
+            self.biology = create_assessment(self.school, self.session, title="Photosynthesis")
+            create_assessment(self.other, other_session, title="Algebra for the other school")
+            QuizQuestion.default_objects.create(
+                school=self.school, quiz=self.biology, text="Which pigment absorbs light energy?")
+
+    def _search(self, query):
+        return list(Assessment.default_objects.filter(school=self.school).search(query, school=self.school))
+
+    def test_ranked_prefix_search_is_scoped_to_the_school(self):
+        self.assertTrue(fts_available())
+        # title hit ranks above the description hit; the other school's quiz never appears
+        self.assertEqual(self._search("alg"), [self.algebra, self.revision])
+        self.assertEqual(self._search("algebra geo"), [self.revision])
+        # subject name is indexed with the quiz; quoting makes FTS operators in user input inert
+        self.assertEqual(len(self._search("mathem")), 3)
+        self.assertEqual(self._search('"alg* OR NEAR('), [])
+        self.assertEqual(Assessment.default_objects.search("", school=self.school).count(), 4)
+
+    def test_index_follows_saves_and_deletes(self):
+        question = QuizQuestion.default_objects.get(quiz=self.biology, text__startswith="Which")
+        self.assertEqual(search_questions(self.school.pk, "pigm"), [(question.pk, self.biology.pk)])
+
+        question.text = "Which organelle contains chlorophyll?"
+        with self.captureOnCommitCallbacks(execute=True):
+            question.save()
+        self.assertEqual(search_questions(self.school.pk, "pigment"), [])
+        self.assertEqual(search_questions(self.school.pk, "chloro"), [(question.pk, self.biology.pk)])
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.algebra.subject.name = "Further Maths"
+            self.algebra.subject.save()
+            Assessment.default_objects.filter(pk=self.revision.pk).update(is_active=False)
+            self.revision.refresh_from_db()
+            self.revision.save()
+        self.assertEqual(len(self._search("further")), 2)
+        self.assertEqual(self._search("alg"), [self.algebra])
+
+        with self.captureOnCommitCallbacks(execute=True):
+            question.delete()
+        self.assertEqual(search_questions(self.school.pk, "chloro"), [])
+
+    def test_rebuild(self):
+        # bulk_create sends no signals; a rebuild picks the rows up
+        QuizQuestion.default_objects.bulk_create([
+            QuizQuestion(school=self.school, quiz=self.algebra, text=f"Solve equation {n}") for n in range(3)])
+        self.assertEqual(search_questions(self.school.pk, "equation"), [])
+        self.assertEqual(rebuild_search(self.school.pk), (3, 3 * 3 + 3 + 1, 0))
+        self.assertEqual(len(search_questions(self.school.pk, "equation")), 3)
+        self.assertEqual(len(self._search("alg")), 2)
+
+    def test_chained_filters_see_every_match(self):
+        # more unpublished title hits than SEARCH_LIMIT outrank the one published description hit
+        subject = self.algebra.subject
+        Assessment.default_objects.bulk_create([
+            Assessment(school=self.school, academic_session=self.session, subject=subject, title=f"Algebra {n}",
+                       slug=f"algebra-{n}")
+            for n in range(120)
+        ])
+        Assessment.default_objects.filter(pk=self.revision.pk).update(is_published=True)
+        rebuild_search(self.school.pk)
+        quizzes = Assessment.default_objects.filter(school=self.school)
+        self.assertEqual(quizzes.search("alg", school=self.school).count(), 122)
+        self.assertEqual(list(quizzes.search("alg", school=self.school).published()), [self.revision])
+        self.assertEqual(list(quizzes.published().search("alg", school=self.school)), [self.revision])
+
+
+class QuestionBankTests(TestCase):
+    """Quizzes place bank items by reference; generation samples by subject, difficulty and tags."""
+
+    def setUp(self):
+        cache.clear()
+        self.school, self.session, _ = create_school_with_class()
+        self.subject = Subject.default_objects.create(school=self.school, name="Mathematics")
+        self.items = []
+        for n in range(12):
+            item = QuestionBankItem.default_objects.create(
+                school=self.school, subject=self.subject, text=f"Bank question {n}", difficulty=n % 3 + 1)
+            QuestionBankOption.default_objects.bulk_create([
+                QuestionBankOption(school=self.school, item=item, text=f"O{k}", order=k, is_correct=k == 0)
+                for k in range(3)
+            ])
+            item.set_tags(["Algebra" if n % 2 == 0 else "Geometry", "term-1"])
+            self.items.append(item)
+
+    def test_generate_samples_matching_items_without_repeats(self):
+        quiz = create_assessment(self.school, self.session, questions=1)
+        placed = generate_quiz(quiz, 2, difficulty=3, tags=["algebra"], seed=7)
+        chosen = [self.items[[i.pk for i in self.items].index(q.bank_item_id)] for q in placed]
+        # n % 3 == 2 and n even → items 2 and 8
+        self.assertEqual(sorted(item.text for item in chosen), ["Bank question 2", "Bank question 8"])
+        self.assertEqual([q.order for q in placed], [1, 2])  # after the quiz's own question
+        with self.assertRaises(ValidationError) as raised:
+            generate_quiz(quiz, 1, difficulty=3, tags=["algebra"])
+        self.assertEqual(raised.exception.code, "bank_exhausted")
+        self.assertEqual(len(generate_quiz(quiz, 4, difficulty=[1, 2], tags=["term-1"], seed=1)), 4)
+
+        self.items[0].set_tags(["term-2"])
+        self.assertEqual(set(self.items[0].tags.values_list("name", flat=True)), {"term-2"})
+
+    def test_bank_edit_reaches_every_quiz_using_it(self):
+        item = self.items[0]
+        quizzes = [create_assessment(self.school, self.session, questions=0, title=t) for t in ("A", "B")]
+        with self.captureOnCommitCallbacks(execute=True):
+            for quiz in quizzes:
+                add_to_quiz(quiz, [item.pk], points=2)
+                publish(quiz)
+        correct = item.options.get(is_correct=True).pk
+        for quiz in quizzes:
+            question = json.loads(get_paper_json(quiz.pk))["questions"][0]
+            self.assertEqual((question["text"], question["points"], len(question["options"])),
+                             ("Bank question 0", 2.0, 3))
+            self.assertEqual(get_answer_key(quiz.pk)[question["id"]][2], frozenset([correct]))
+        # placements store no content of their own
+        self.assertEqual(set(QuizQuestion.default_objects.filter(bank_item=item).values_list("text", flat=True)),
+                         {""})
+
+        item.text = "Edited once"
+        with self.captureOnCommitCallbacks(execute=True):
+            item.save()
+        for quiz in quizzes:
+            quiz.refresh_from_db()
+            self.assertEqual(quiz.paper_version, 2)
+            self.assertEqual(json.loads(get_paper_json(quiz.pk))["questions"][0]["text"], "Edited once")
+
+    def test_item_placed_once_per_quiz(self):
+        quiz = create_assessment(self.school, self.session, questions=0)
+        with self.assertRaises(ValidationError) as raised:
+            add_to_quiz(quiz, [self.items[0].pk, self.items[0].pk])
+        self.assertEqual(raised.exception.code, "bank_item_duplicate")
+        add_to_quiz(quiz, [self.items[0].pk])
+        with self.assertRaises(ValidationError):
+            add_to_quiz(quiz, [self.items[1].pk, self.items[0].pk])
+        self.assertEqual(QuizQuestion.default_objects.filter(quiz=quiz).count(), 1)
+
+    def test_analysis_keeps_colliding_option_ids_apart(self):
+        # an inline question whose QuizOption ids equal the bank item's QuestionBankOption ids
+        item = self.items[0]
+        bank_ids = list(item.options.order_by("order").values_list("pk", flat=True))  # first one correct
+        quiz = create_assessment(self.school, self.session, questions=0)
+        inline = QuizQuestion.default_objects.create(school=self.school, quiz=quiz, text="Inline", order=0)
+        QuizOption.default_objects.bulk_create([
+            QuizOption(pk=pk, school=self.school, question=inline, text=f"I{k}", order=k, is_correct=k == 1)
+            for k, pk in enumerate(bank_ids)
+        ])
+        with self.captureOnCommitCallbacks(execute=True):
+            placed = add_to_quiz(quiz, [item.pk])[0]
+            publish(quiz)
+        student = create_students(self.school, 1)[0]
+        attempt = QuizAttempt.default_objects.create(
+            school=self.school, quiz=quiz, student=student, status="submitted", paper_version=1)
+        # the same id picked on both questions: right on the inline one, wrong on the bank one
+        QuizAnswer.default_objects.bulk_create([
+            QuizAnswer(school=self.school, attempt=attempt, question_id=question_id,
+                       selected_option_ids=[bank_ids[1]])
+            for question_id in (inline.pk, placed.pk)
+        ])
+
+        by_question = {q["id"]: q for q in analyze_quiz(quiz.pk)["questions"]}
+        for question_id, correct in ((inline.pk, bank_ids[1]), (placed.pk, bank_ids[0])):
+            options = by_question[question_id]["options"]
+            self.assertEqual([o["id"] for o in options if o["correct"]], [correct])
+            self.assertEqual([o["count"] for o in options], [0, 1, 0])
+
+
+class AttemptStartTests(TestCase):
+    """Starting an attempt: one eligibility query, a counter that enforces the limit, idempotent retries."""
+
+    def setUp(self):
+        self.school, self.session, self.class_list = create_school_with_class()
+        self.student, self.outsider = create_students(self.school, 2)
+        self.quiz = create_assessment(self.school, self.session, is_published=True, max_attempts=2)
+        with self.captureOnCommitCallbacks(execute=True):
+            self.quiz.assigned_students.add(self.student)
+
+    def _submit(self, attempt):
+        QuizAttempt.default_objects.filter(pk=attempt.pk).update(status="submitted")
+
+    def test_eligibility_is_one_query(self):
+        with self.assertNumQueries(1):
+            row = check_eligibility(self.quiz.pk, self.student)
+        self.assertEqual((row["used"], row["is_assigned"]), (0, True))
+        with self.assertRaises(ValidationError) as raised:
+            check_eligibility(self.quiz.pk, self.outsider)
+        self.assertEqual(raised.exception.code, "not_assigned")
+
+    def test_repeated_start_resumes_the_open_attempt(self):
+        first = start_attempt(self.quiz.pk, self.student)
+        self.assertEqual(start_attempt(self.quiz.pk, self.student).pk, first.pk)
+        self.assertEqual(QuizAttemptCounter.default_objects.get(quiz=self.quiz, student=self.student).used, 1)
+
+    def test_limit_is_enforced_and_deletes_give_attempts_back(self):
+        for _ in range(2):
+            self._submit(start_attempt(self.quiz.pk, self.student))
+        with self.assertRaises(ValidationError) as raised:
+            start_attempt(self.quiz.pk, self.student)
+        self.assertEqual(raised.exception.code, "max_attempts")
+        # the counter refuses past the limit even when the eligibility check is skipped
+        self.assertFalse(claim_attempt(self.school.pk, self.quiz.pk, self.student.pk, 2))
+
+        reset = QuizAttempt.default_objects.filter(quiz=self.quiz, student=self.student).first()
+        reset.delete()
+        reset.hard_delete()  # released once, not twice
+        self.assertEqual(start_attempt(self.quiz.pk, self.student).status, "in_progress")
+        self.assertEqual(QuizAttemptCounter.default_objects.get(quiz=self.quiz, student=self.student).used, 2)
+
+
+class AttemptTimerTests(TestCase):
+    """Attempts carry a server-side deadline; the sweeper closes expired ones in batches."""
+
+    def setUp(self):
+        cache.clear()
+        self.school, self.session, _ = create_school_with_class()
+        self.quiz = create_assessment(self.school, self.session, questions=4, is_published=True,
+                                      duration_minutes=30)
+        publish(self.quiz)
+        self.students = create_students(self.school, 30)
+        self.correct = dict(QuizOption.default_objects.filter(
+            question__quiz=self.quiz, is_correct=True).values_list("question_id", "pk"))
+
+    def _start(self, student, answered=0):
+        attempt = QuizAttempt.default_objects.create(school=self.school, quiz=self.quiz, student=student)
+        save_answers(attempt.pk, [{"question": q, "options": [o]} for q, o in list(self.correct.items())[:answered]])
+        return attempt
+
+    def test_deadline_is_duration_or_window_end(self):
+        attempt = self._start(self.students[0])
+        self.assertAlmostEqual((attempt.deadline - attempt.started_at).total_seconds(), 1800, delta=5)
+        with self.assertNumQueries(1):
+            timing = remaining(attempt.pk, student_id=self.students[0].pk)
+        self.assertTrue(1790 <= timing["remaining"] <= 1800)
+
+        # the window closing in 10 minutes caps running attempts too
+        self.quiz.end_time = timezone.now() + timedelta(minutes=10)
+        self.quiz.save()
+        attempt.refresh_from_db()
+        self.assertEqual(attempt.deadline, self.quiz.end_time)
+        self.assertEqual(self._start(self.students[1]).deadline, self.quiz.end_time)
+
+    def test_sweep_closes_and_grades_expired_attempts_in_batches(self):
+        attempts = [self._start(student, answered=n % 5) for n, student in enumerate(self.students)]
+        live = self._start(create_students(self.school, 1, offset=30)[0])
+        QuizAttempt.default_objects.filter(pk__in=[a.pk for a in attempts]).update(
+            deadline=timezone.now() - timedelta(minutes=1))
+
+        with CaptureQueriesContext(connection) as queries:
+            self.assertEqual(sweep(batch_size=10), 30)
+        # answer key, four batch reads (three of ten, one empty), and per batch: close, reload,
+        # answers, grouped answer update, one update per distinct score (5), two savepoint pairs;
+        # none of it grows with the number of attempts in a batch
+        self.assertLessEqual(len(queries), 1 + 4 + 3 * 13)
+
+        closed = {a.pk: a for a in QuizAttempt.default_objects.filter(quiz=self.quiz).exclude(pk=live.pk)}
+        self.assertEqual({a.status for a in closed.values()}, {"graded"})
+        self.assertTrue(all(a.submitted_at == a.deadline for a in closed.values()))
+        self.assertEqual([float(closed[a.pk].score) for a in attempts[:5]], [0, 1, 2, 3, 4])
+        live.refresh_from_db()
+        self.assertEqual(live.status, "in_progress")
+        self.assertEqual(sweep(), 0)
+
+    def test_expired_attempt_rejects_answers_and_is_replaced_on_restart(self):
+        self.quiz.max_attempts = 2
+        self.quiz.save(update_fields=["max_attempts"])
+        attempt = self._start(self.students[0], answered=1)
+        QuizAttempt.default_objects.filter(pk=attempt.pk).update(
+            deadline=timezone.now() - GRACE - timedelta(seconds=1))
+        with self.assertRaises(ValidationError) as raised:
+            save_answers(attempt.pk, [])
+        self.assertEqual(raised.exception.code, "attempt_closed")
+
+        fresh = start_attempt(self.quiz.pk, self.students[0])
+        self.assertNotEqual(fresh.pk, attempt.pk)
+        attempt.refresh_from_db()
+        self.assertEqual((attempt.status, float(attempt.score)), ("graded", 1.0))
 
-# Create your tests here.
@@ -0,0 +1,163 @@
+# ==============================================
+# File: myquiz/aggregation.py
+# Purpose: Set-based quiz scoring + term/session totals (GROUP BY + bulk upsert)
+# ==============================================
+from __future__ import annotations
+
+from decimal import Decimal
+from typing import Iterable, Optional
+
+from django.db import transaction
+from django.db.models import Count, F, Q, Sum
+
+from main.common.oncommit import CommitBatch
+
+from .ranking import invalidate_ranking
+
+TERMS_PER_SESSION = 3
+
+
+# -------- quiz scores --------
+@transaction.atomic
+def score_quiz(quiz, students: Optional[Iterable[int]] = None) -> int:
+    """
+    (Re)score every student who answered `quiz` in one GROUP BY and upsert their `Result` rows.
+    Score = correct answers / questions × 100. Returns the number of results written.
+    """
+    from .models import Result, StudentAnswer
+
+    total_questions = quiz.questions.count()
+    if not total_questions:
+        return 0
+    answers = StudentAnswer.objects.filter(question__quiz=quiz)
+    if students is not None:
+        answers = answers.filter(student_id__in=list(students))
+    rows = (
+        answers.order_by()
+        .values("student_id")
+        .annotate(correct=Count("pk", filter=Q(selected_option=F("question__correct_answer"))))
+        .values_list("student_id", "correct")
+    )
+    written = Result.objects.bulk_create(
+        [
+            Result(student_id=student_id, quiz=quiz,
+                   score=round(Decimal(correct * 100) / total_questions, 1))
+            for student_id, correct in rows
+        ],
+        update_conflicts=True,
+        unique_fields=["student", "quiz"],
+        update_fields=["score"],
+    )
+    # bulk upserts send no signals; roll the new scores up explicitly
+    refresh_term_totals(quiz.school_class_id, quiz.term_id,
+                        students=[r.student_id for r in written])
+    return len(written)
+
+
+# -------- term / session totals --------
+@transaction.atomic
+def refresh_term_totals(school_class_id: int, term_id: int, students: Optional[Iterable[int]] = None) -> int:
+    """
+    Term total per student = sum of their quiz scores in the class/term ÷ number of quizzes
+    (a missing result counts as 0). One COUNT, one GROUP BY, one upsert; then session totals.
+    Rows are kept per (student, term, class), so a mid-term move leaves one total per class.
+    """
+    from main.models import Term
+    from .models import Quiz, Result, TermResult
+
+    quiz_count = Quiz.objects.filter(school_class_id=school_class_id, term_id=term_id).count()
+    if not quiz_count:
+        return 0
+    results = Result.objects.filter(quiz__school_class_id=school_class_id, quiz__term_id=term_id)
+    if students is not None:
+        students = list(students)
+        results = results.filter(student_id__in=students)
+    totals = dict(
+        results.order_by()
+        .values("student_id")
+        .annotate(total=Sum("score"))
+        .values_list("student_id", "total")
+    )
+    if students is not None:
+        # named students whose results were all removed drop to 0 rather than keep a stale total
+        for student_id in students:
+            totals.setdefault(student_id, 0)
+    session_id = Term.default_objects.filter(pk=term_id).values_list("academic_session_id", flat=True).get()
+    written = TermResult.objects.bulk_create(
+        [
+            TermResult(student_id=student_id, school_class_id=school_class_id, term_id=term_id,
+                       academic_session_id=session_id, total_score=float(total) / quiz_count)
+            for student_id, total in totals.items()
+        ],
+        update_conflicts=True,
+        unique_fields=["student", "term", "school_class"],
+        update_fields=["academic_session", "total_score"],
+    )
+    refresh_session_totals(school_class_id, session_id, students=[r.student_id for r in written])
+    # any score change in the class/term can move every student's position
+    invalidate_ranking(school_class_id, term_id)
+    return len(written)
+
+
+def refresh_session_totals(school_class_id: int, academic_session_id: int,
+                           students: Optional[Iterable[int]] = None) -> int:
+    """Session total per student = sum of term totals ÷ terms per session; one GROUP BY + one upsert."""
+    from .models import SessionResult, TermResult
+
+    term_results = TermResult.objects.filter(
+        school_class_id=school_class_id, academic_session_id=academic_session_id)
+    if students is not None:
+        term_results = term_results.filter(student_id__in=list(students))
+    totals = (
+        term_results.order_by()
+        .values("student_id")
+        .annotate(total=Sum("total_score"))
+        .values_list("student_id", "total")
+    )
+    written = SessionResult.objects.bulk_create(
+        [
+            SessionResult(student_id=student_id, school_class_id=school_class_id,
+                          academic_session_id=academic_session_id,
+                          total_score=total / TERMS_PER_SESSION)
+            for student_id, total in totals
+        ],
+        update_conflicts=True,
+        unique_fields=["student", "academic_session", "school_class"],
+        update_fields=["total_score"],
+    )
+    return len(written)
+
+
+def rebuild_class(school_class, term=None) -> dict:
+    """Recompute every term (or one term) of a class from its quiz results."""
+    from .models import Quiz
+
+    term_ids = (
+        [term.pk] if term is not None
+        else Quiz.objects.filter(school_class=school_class).order_by().values_list("term_id", flat=True).distinct()
+    )
+    return {term_id: refresh_term_totals(school_class.pk, term_id) for term_id in term_ids}
+
+
+# -------- incremental trigger --------
+def schedule_refresh(quiz_id: int, student_id: int) -> None:
+    """
+    Queue a student's term/session refresh for the quiz's class and term; runs once on commit.
+    Why: many result saves in one transaction collapse into one refresh per (class, term).
+    """
+    with _refresh.collect() as students_by_quiz:
+        students_by_quiz.setdefault(quiz_id, set()).add(student_id)
+
+
+def _refresh_batch(batch: dict[int, set[int]]) -> None:
+    from .models import Quiz
+
+    grouped: dict[tuple[int, int], set[int]] = {}
+    for class_id, term_id, quiz_id in Quiz.objects.filter(pk__in=list(batch)).values_list(
+            "school_class_id", "term_id", "pk"):
+        grouped.setdefault((class_id, term_id), set()).update(batch[quiz_id])
+    for (class_id, term_id), students in grouped.items():
+        refresh_term_totals(class_id, term_id, students=students)
+
+
+_refresh = CommitBatch(dict, _refresh_batch)
@@ -4,3 +4,6 @@ from django.apps import AppConfig
 class MyquizConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'myquiz'
+
+    def ready(self):
+        from myquiz import signals  # noqa: F401
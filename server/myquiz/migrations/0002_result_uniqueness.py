@@ -0,0 +1,47 @@
+# Generated by Django 5.0.7 on 2026-10-18 23:53
+
+from django.db import migrations, models
+from django.db.models import Count, Max
+
+# (model, key fields) of each constraint added below
+RESULT_KEYS = (
+    ('Result', ('student_id', 'quiz_id')),
+    ('TermResult', ('student_id', 'term_id')),
+    ('SessionResult', ('student_id', 'academic_session_id')),
+)
+
+
+def drop_duplicate_results(apps, schema_editor):
+    """Keep the newest row per key: the last write wins, as in the aggregation upserts."""
+    for name, key in RESULT_KEYS:
+        model = apps.get_model('myquiz', name)
+        duplicated = (
+            model._base_manager.order_by().values(*key)
+            .annotate(rows=Count('id'), keep=Max('id')).filter(rows__gt=1)
+        )
+        for group in duplicated.iterator():
+            model._base_manager.filter(**{field: group[field] for field in key}).exclude(
+                pk=group['keep']).delete()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('myquiz', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.RunPython(drop_duplicate_results, migrations.RunPython.noop),
+        migrations.AddConstraint(
+            model_name='result',
+            constraint=models.UniqueConstraint(fields=('student', 'quiz'), name='uniq_result_per_student_quiz'),
+        ),
+        migrations.AddConstraint(
+            model_name='sessionresult',
+            constraint=models.UniqueConstraint(fields=('student', 'academic_session'), name='uniq_session_result_per_student'),
+        ),
+        migrations.AddConstraint(
+            model_name='termresult',
+            constraint=models.UniqueConstraint(fields=('student', 'term'), name='uniq_term_result_per_student'),
+        ),
+    ]
@@ -0,0 +1,29 @@
+# Generated by Django 5.0.7 on 2026-10-19 02:11
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('myquiz', '0002_result_uniqueness'),
+    ]
+
+    operations = [
+        migrations.RemoveConstraint(
+            model_name='sessionresult',
+            name='uniq_session_result_per_student',
+        ),
+        migrations.RemoveConstraint(
+            model_name='termresult',
+            name='uniq_term_result_per_student',
+        ),
+        migrations.AddConstraint(
+            model_name='sessionresult',
+            constraint=models.UniqueConstraint(fields=('student', 'academic_session', 'school_class'), name='uniq_session_result_per_student_class'),
+        ),
+        migrations.AddConstraint(
+            model_name='termresult',
+            constraint=models.UniqueConstraint(fields=('student', 'term', 'school_class'), name='uniq_term_result_per_student_class'),
+        ),
+    ]
@@ -75,16 +75,26 @@ class Result(models.Model):
     quiz = models.ForeignKey(Quiz, on_delete=models.CASCADE)
     score = models.DecimalField(decimal_places=1, default=0.0, max_digits=5)
 
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=["student", "quiz"], name="uniq_result_per_student_quiz"),
+        ]
+
     def __str__(self):
         return f'{self.student} - {self.quiz.title}: {self.score}'
 
+    @property
+    def grade(self):
+        """Letter grade for the score on the school's (or class level's) grading scale."""
+        from main.academics.grading import scale_for
+        school_class = self.quiz.school_class
+        return scale_for(school_class.school_id, school_class.class_level_id).grade(self.score)
+
     def calculate_total_score(self):
-        total_questions = self.quiz.questions.count()
-        correct_answers = sum(
-            1 for answer in self.studentanswer_set.all() if answer.is_correct()
-        )
-        self.score = (correct_answers / total_questions) * 100
-        self.save()
+        """Rescore this student's answers (one aggregate query; see `myquiz.aggregation`)."""
+        from .aggregation import score_quiz
+        score_quiz(self.quiz, students=[self.student_id])
+        self.refresh_from_db(fields=["score"])
 
 
 class TermResult(models.Model):
@@ -96,15 +106,18 @@ class TermResult(models.Model):
         AcademicSession, on_delete=models.CASCADE)
     total_score = models.FloatField()
 
+    class Meta:
+        constraints = [
+            # per class: a student who moves class mid-term keeps one total in each class
+            models.UniqueConstraint(fields=["student", "term", "school_class"],
+                                    name="uniq_term_result_per_student_class"),
+        ]
+
     def calculate_term_total(self):
-        quizzes = Quiz.objects.filter(
-            school_class=self.school_class, term=self.term, academic_session=self.academic_session
-        )
-        total_score = sum(
-            Result.objects.filter(quiz=quiz, student=self.student).first().score for quiz in quizzes
-        )
-        self.total_score = total_score / len(quizzes)  # Average score
-        self.save()
+        """Average of the student's quiz scores in this class and term (missing results count as 0)."""
+        from .aggregation import refresh_term_totals
+        refresh_term_totals(self.school_class_id, self.term_id, students=[self.student_id])
+        self.refresh_from_db(fields=["total_score"])
 
 
 class SessionResult(models.Model):
@@ -115,14 +128,16 @@ class SessionResult(models.Model):
         AcademicSession, on_delete=models.CASCADE)
     total_score = models.FloatField()
 
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=["student", "academic_session", "school_class"],
+                                    name="uniq_session_result_per_student_class"),
+        ]
+
     def calculate_session_total(self):
-        terms = ['1st', '2nd', '3rd']
-        term_results = TermResult.objects.filter(
-            student=self.student, school_class=self.school_class, academic_session=self.academic_session
-        )
-        self.total_score = sum(
-            term.total_score for term in term_results) / len(terms)
-        self.save()
+        from .aggregation import refresh_session_totals
+        refresh_session_totals(self.school_class_id, self.academic_session_id, students=[self.student_id])
+        self.refresh_from_db(fields=["total_score"])
 
 
 # class CardPin(model)
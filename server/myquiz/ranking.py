@@ -0,0 +1,134 @@
+# ==============================================
+# File: myquiz/ranking.py
+# Purpose: Class-wide subject/overall positions from one score matrix (NumPy), cached per (class, term)
+# ==============================================
+from __future__ import annotations
+
+from collections import defaultdict
+
+from django.core.cache import cache
+from django.db.models import Avg
+
+from main.common.oncommit import cache_set, invalidate_on_commit
+
+RANKING_CACHE_KEY = "class_ranking:{class_id}:{term_id}"
+RANKING_CACHE_TIMEOUT = 60 * 60 * 24
+QUIZ_TYPES = ("homework", "ca", "exam")
+
+
+def ordinal(n: int) -> str:
+    """1 → "1st", 2 → "2nd", 11 → "11th", 23 → "23rd"."""
+    suffix = "th" if 10 <= n % 100 <= 20 else {1: "st", 2: "nd", 3: "rd"}.get(n % 10, "th")
+    return f"{n}{suffix}"
+
+
+def rank_column(values):
+    """
+    (competition, dense) ranks for one column, highest score first; NaN (no score) → rank 0.
+    Competition ranking gives ties the same place and skips the next ("1, 2, 2, 4");
+    dense ranking does not skip ("1, 2, 2, 3").
+    """
+    import numpy as np
+
+    values = np.asarray(values, dtype=float)
+    competition = np.zeros(values.shape, dtype=int)
+    dense = np.zeros(values.shape, dtype=int)
+    present = ~np.isnan(values)
+    if present.any():
+        # negate so ascending sort order = descending scores; round so float noise never splits a tie
+        keys = -np.round(values[present], 2)
+        competition[present] = np.searchsorted(np.sort(keys), keys, side="left") + 1
+        dense[present] = np.searchsorted(np.unique(keys), keys, side="left") + 1
+    return competition, dense
+
+
+def compute_ranking(class_id: int, term_id: int) -> dict:
+    """
+    Subject and overall positions for every student with a score in the class/term.
+
+    One GROUP BY reads (student, subject, quiz type) averages; everything else is array work:
+    subject score = mean of the quiz-type averages, overall = mean over the class's subjects with a
+    missing subject counted as 0 (the rule `TermResult` totals use).
+    Returns plain dicts (cache/pickle friendly):
+      {"size": n, "subjects": {subject_id: {name, average, highest, lowest, count}},
+       "students": {student_id: {"average", "position", "dense", "subjects":
+                    {subject_id: {"marks", "score", "position", "dense"}}}}}
+    """
+    import numpy as np
+    from .models import Result
+
+    rows = (
+        Result.objects.filter(quiz__school_class_id=class_id, quiz__term_id=term_id)
+        .order_by()
+        .values("student_id", "quiz__subject_id", "quiz__subject__name", "quiz__quiz_type")
+        .annotate(score=Avg("score"))
+        .values_list("student_id", "quiz__subject_id", "quiz__subject__name", "quiz__quiz_type", "score")
+    )
+    marks: dict[tuple[int, int], dict[str, float]] = defaultdict(dict)
+    names: dict[int, str] = {}
+    for student_id, subject_id, name, quiz_type, score in rows:
+        marks[(student_id, subject_id)][quiz_type] = round(float(score), 1)
+        names[subject_id] = name
+    if not marks:
+        return {"size": 0, "subjects": {}, "students": {}}
+
+    student_ids = sorted({student_id for student_id, _ in marks})
+    subject_ids = sorted(names, key=lambda pk: (names[pk], pk))
+    row_of = {pk: i for i, pk in enumerate(student_ids)}
+    col_of = {pk: j for j, pk in enumerate(subject_ids)}
+
+    # students × subjects score matrix; NaN where a student has no score for a subject
+    matrix = np.full((len(student_ids), len(subject_ids)), np.nan)
+    for (student_id, subject_id), by_type in marks.items():
+        matrix[row_of[student_id], col_of[subject_id]] = round(sum(by_type.values()) / len(by_type), 1)
+
+    overall = np.round(np.nan_to_num(matrix, nan=0.0).mean(axis=1), 2)
+    overall_competition, overall_dense = rank_column(overall)
+    subject_ranks = [rank_column(matrix[:, j]) for j in range(len(subject_ids))]
+    counts = np.sum(~np.isnan(matrix), axis=0)
+
+    subjects = {
+        subject_id: {
+            "name": names[subject_id],
+            "average": round(float(np.nanmean(matrix[:, j])), 1),
+            "highest": float(np.nanmax(matrix[:, j])),
+            "lowest": float(np.nanmin(matrix[:, j])),
+            "count": int(counts[j]),
+        }
+        for j, subject_id in enumerate(subject_ids)
+    }
+    students = {}
+    for i, student_id in enumerate(student_ids):
+        per_subject = {}
+        for j, subject_id in enumerate(subject_ids):
+            if np.isnan(matrix[i, j]):
+                continue
+            by_type = marks[(student_id, subject_id)]
+            per_subject[subject_id] = {
+                "marks": [by_type.get(kind) for kind in QUIZ_TYPES],
+                "score": float(matrix[i, j]),
+                "position": int(subject_ranks[j][0][i]),
+                "dense": int(subject_ranks[j][1][i]),
+            }
+        students[student_id] = {
+            "average": float(overall[i]),
+            "position": int(overall_competition[i]),
+            "dense": int(overall_dense[i]),
+            "subjects": per_subject,
+        }
+    return {"size": len(student_ids), "subjects": subjects, "students": students}
+
+
+def get_ranking(class_id: int, term_id: int) -> dict:
+    """Cached ranking for a (class, term); recomputed lazily after invalidation."""
+    key = RANKING_CACHE_KEY.format(class_id=class_id, term_id=term_id)
+    ranking = cache.get(key)
+    if ranking is None:
+        ranking = compute_ranking(class_id, term_id)
+        cache_set(key, ranking, RANKING_CACHE_TIMEOUT)
+    return ranking
+
+
+def invalidate_ranking(class_id: int, term_id: int) -> None:
+    """Drop the cached ranking once the surrounding transaction commits."""
+    invalidate_on_commit(RANKING_CACHE_KEY.format(class_id=class_id, term_id=term_id))
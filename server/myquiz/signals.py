@@ -0,0 +1,17 @@
+# ==============================================
+# File: myquiz/signals.py
+# Purpose: Keep term/session totals in step with individual quiz results
+# ==============================================
+from __future__ import annotations
+
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
+
+from myquiz.aggregation import schedule_refresh
+
+
+@receiver(post_save, sender="myquiz.Result")
+@receiver(post_delete, sender="myquiz.Result")
+def _refresh_result_totals(sender, instance, **kwargs):
+    """A saved/deleted result re-aggregates that student's term and session totals on commit."""
+    schedule_refresh(instance.quiz_id, instance.student_id)
@@ -1,3 +1,163 @@
+from django.core.cache import cache
 from django.test import TestCase
 
-# Create your tests here.
+from main.models import ClassList, Subject, Term
+from main.tests import create_school_with_class, create_students
+from myquiz.aggregation import refresh_term_totals, score_quiz
+from myquiz.models import Question, Quiz, Result, SessionResult, StudentAnswer, TermResult
+from myquiz.ranking import get_ranking, ordinal, rank_column
+
+
+class ResultAggregationTests(TestCase):
+    """Quiz scores and term/session totals are computed per class in GROUP BY queries and upserted."""
+
+    def setUp(self):
+        self.school, self.session, self.class_list = create_school_with_class()
+        self.students = create_students(self.school, 3, class_list=self.class_list)
+        self.term = Term.default_objects.get(academic_session=self.session, name="1st")
+        subject = Subject.default_objects.create(school=self.school, name="Mathematics")
+        self.quizzes = [
+            Quiz.objects.create(title=kind, quiz_type=kind, school_class=self.class_list,
+                                term=self.term, subject=subject, created_by=self.school.owner)
+            for kind in ("ca", "exam")
+        ]
+        self.questions = Question.objects.bulk_create([
+            Question(quiz=self.quizzes[0], question_text=f"Q{n}", correct_answer="a")
+            for n in range(4)
+        ])
+
+    def _answer(self, student, correct):
+        StudentAnswer.objects.bulk_create([
+            StudentAnswer(student=student, question=question,
+                          selected_option="a" if n < correct else "b")
+            for n, question in enumerate(self.questions)
+        ])
+
+    def _totals(self, model):
+        return dict(model.objects.values_list("student_id", "total_score"))
+
+    def test_score_quiz_rolls_up_term_and_session(self):
+        for student, correct in zip(self.students, (4, 2, 0)):
+            self._answer(student, correct)
+
+        self.assertEqual(score_quiz(self.quizzes[0]), 3)
+        self.assertEqual(dict(Result.objects.values_list("student_id", "score")),
+                         {self.students[0].pk: 100, self.students[1].pk: 50, self.students[2].pk: 0})
+        # two quizzes in the term, the exam has no results yet → counts as 0
+        expected = {self.students[0].pk: 50.0, self.students[1].pk: 25.0, self.students[2].pk: 0.0}
+        self.assertEqual(self._totals(TermResult), expected)
+        self.assertEqual(self._totals(SessionResult),
+                         {pk: total / 3 for pk, total in expected.items()})
+
+        # rescoring upserts instead of duplicating rows
+        score_quiz(self.quizzes[0])
+        self.assertEqual(Result.objects.count(), 3)
+        self.assertEqual(TermResult.objects.count(), 3)
+
+    def test_term_totals_cost_constant_queries(self):
+        Result.objects.bulk_create([
+            Result(student=student, quiz=quiz, score=60)
+            for student in self.students for quiz in self.quizzes
+        ])
+        # quiz count, term → session, term GROUP BY, term upsert, session GROUP BY, session upsert
+        # (plus the savepoint pair from @transaction.atomic)
+        with self.assertNumQueries(8):
+            refresh_term_totals(self.class_list.pk, self.term.pk)
+        self.assertEqual(set(self._totals(TermResult).values()), {60.0})
+
+    def test_saved_result_refreshes_totals_on_commit(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            Result.objects.create(student=self.students[0], quiz=self.quizzes[1], score=80)
+            Result.objects.create(student=self.students[0], quiz=self.quizzes[0], score=40)
+        self.assertEqual(self._totals(TermResult), {self.students[0].pk: 60.0})
+
+        with self.captureOnCommitCallbacks(execute=True):
+            Result.objects.get(student=self.students[0], quiz=self.quizzes[1]).delete()
+        self.assertEqual(self._totals(TermResult), {self.students[0].pk: 20.0})
+
+    def test_mid_term_class_move_keeps_a_total_per_class(self):
+        other_class = ClassList.default_objects.create(
+            school=self.school, academic_session=self.session,
+            class_level=self.class_list.class_level, division="B")
+        other_quiz = Quiz.objects.create(title="ca B", quiz_type="ca", school_class=other_class,
+                                         term=self.term, subject=self.quizzes[0].subject,
+                                         created_by=self.school.owner)
+        student = self.students[0]
+        Result.objects.bulk_create([
+            Result(student=student, quiz=self.quizzes[0], score=80),
+            Result(student=student, quiz=other_quiz, score=30),
+        ])
+        refresh_term_totals(self.class_list.pk, self.term.pk)
+        refresh_term_totals(other_class.pk, self.term.pk)
+        # refreshing the first class again must not take over the second class's row
+        refresh_term_totals(self.class_list.pk, self.term.pk)
+
+        self.assertEqual(
+            dict(TermResult.objects.filter(student=student).values_list("school_class_id", "total_score")),
+            {self.class_list.pk: 40.0, other_class.pk: 30.0})
+        self.assertEqual(SessionResult.objects.filter(student=student).count(), 2)
+
+
+class ClassRankingTests(TestCase):
+    """Positions for a whole class come from one score matrix and are cached per (class, term)."""
+
+    def setUp(self):
+        cache.clear()
+        self.school, self.session, self.class_list = create_school_with_class()
+        self.students = create_students(self.school, 4, class_list=self.class_list)
+        self.term = Term.default_objects.get(academic_session=self.session, name="1st")
+        self.subjects = [Subject.default_objects.create(school=self.school, name=name, code=name[:3])
+                         for name in ("English", "Mathematics")]
+        self.quizzes = {
+            subject.pk: Quiz.objects.create(title="exam", quiz_type="exam", school_class=self.class_list,
+                                            term=self.term, subject=subject, created_by=self.school.owner)
+            for subject in self.subjects
+        }
+        english, maths = (self.quizzes[s.pk] for s in self.subjects)
+        # English 70, 90, 90, 50; Mathematics 60, 60, 80 (last student has no maths score)
+        Result.objects.bulk_create(
+            [Result(student=st, quiz=english, score=score)
+             for st, score in zip(self.students, (70, 90, 90, 50))]
+            + [Result(student=st, quiz=maths, score=score)
+               for st, score in zip(self.students[:3], (60, 60, 80))]
+        )
+
+    def test_rank_column_competition_and_dense(self):
+        competition, dense = rank_column([70, 90, 90, 50, float("nan")])
+        self.assertEqual(list(competition), [3, 1, 1, 4, 0])
+        self.assertEqual(list(dense), [2, 1, 1, 3, 0])
+        self.assertEqual([ordinal(n) for n in (1, 2, 3, 4, 11, 12, 13, 21, 22, 101)],
+                         ["1st", "2nd", "3rd", "4th", "11th", "12th", "13th", "21st", "22nd", "101st"])
+
+    def test_class_ranking(self):
+        with self.assertNumQueries(1):
+            ranking = get_ranking(self.class_list.pk, self.term.pk)
+        english, maths = (s.pk for s in self.subjects)
+        self.assertEqual(ranking["size"], 4)
+        self.assertEqual(ranking["subjects"][english],
+                         {"name": "English", "average": 75.0, "highest": 90.0, "lowest": 50.0, "count": 4})
+        self.assertEqual(ranking["subjects"][maths]["count"], 3)
+
+        by_student = [ranking["students"][st.pk] for st in self.students]
+        self.assertEqual([s["subjects"][english]["position"] for s in by_student], [3, 1, 1, 4])
+        self.assertEqual([s["subjects"][english]["dense"] for s in by_student], [2, 1, 1, 3])
+        self.assertNotIn(maths, by_student[3]["subjects"])
+        # overall = mean over both subjects, the missing maths score counting as 0: 65, 75, 85, 25
+        self.assertEqual([s["average"] for s in by_student], [65.0, 75.0, 85.0, 25.0])
+        self.assertEqual([s["position"] for s in by_student], [3, 2, 1, 4])
+
+        with self.assertNumQueries(0):
+            get_ranking(self.class_list.pk, self.term.pk)
+        # one quiz per subject here, so the term totals agree with the overall average
+        refresh_term_totals(self.class_list.pk, self.term.pk)
+        totals = dict(TermResult.objects.values_list("student_id", "total_score"))
+        self.assertEqual([totals[st.pk] for st in self.students], [s["average"] for s in by_student])
+
+    def test_score_change_invalidates_cached_ranking(self):
+        get_ranking(self.class_list.pk, self.term.pk)
+        result = Result.objects.get(student=self.students[3], quiz=self.quizzes[self.subjects[0].pk])
+        result.score = 100
+        with self.captureOnCommitCallbacks(execute=True):
+            result.save()
+        ranking = get_ranking(self.class_list.pk, self.term.pk)
+        self.assertEqual(ranking["students"][self.students[3].pk]["subjects"][self.subjects[0].pk]["position"], 1)
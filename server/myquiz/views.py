@@ -9,7 +9,7 @@ from main.models import Student
 
 from .forms import QuizForm, QuestionForm
 from .models import Quiz, Question, QuestionBank, StudentAnswer, Result
-from django.db import models
+from .aggregation import score_quiz
 
 from django.http import JsonResponse, HttpResponse
 
@@ -141,20 +141,8 @@ def take_quiz(request, quiz_id):
         student_answer.selected_option = selected_option
         student_answer.save()
 
-        # Calculate and update result for the student
-        total_questions = quiz.questions.count()
-        correct_answers = StudentAnswer.objects.filter(
-            student=student, question__quiz=quiz, selected_option=models.F(
-                'question__correct_answer')
-        ).count()
-        score = (correct_answers / total_questions) * 100
-
-        result, created = Result.objects.get_or_create(
-            student=student,
-            quiz=quiz
-        )
-        result.score = score
-        result.save()
+        # Rescore the student and roll the result up into term/session totals
+        score_quiz(quiz, students=[student.pk])
 
         # Redirect to next question or result page
         next_question = questions.exclude(id=question.id).first()
@@ -172,7 +160,9 @@ def take_quiz(request, quiz_id):
 @mydecorators.teacher_is_authenticated
 def quiz_result(request, quiz_id):
     quiz = get_object_or_404(Quiz, id=quiz_id)
-    results = Result.objects.filter(quiz=quiz)
+    # `Result.grade` reads quiz.school_class; load it with the rows
+    results = Result.objects.filter(quiz=quiz).select_related(
+        'quiz__school_class', 'student__user')
 
     return render(request, 'quiz/quiz_result.html', {
         'quiz': quiz,